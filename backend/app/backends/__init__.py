@@ -0,0 +1,24 @@
+import os
+from .base import StorageBackend
+from .memory import MemoryBackend
+
+
+# "memory" (default, per process), "sqlite" (shared file, survives restarts)
+# or "redis" (shared across hosts, REDIS_URL)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "memory")
+
+
+def create_backend(kind: str = STORAGE_BACKEND) -> StorageBackend:
+    """Instantiate the configured storage backend"""
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "sqlite":
+        from .sqlite import SQLiteBackend
+        return SQLiteBackend()
+    if kind == "redis":
+        from .redis import RedisBackend
+        return RedisBackend()
+    raise ValueError(f"Unknown STORAGE_BACKEND '{kind}'. Available: memory, sqlite, redis")
+
+
+__all__ = ["StorageBackend", "MemoryBackend", "create_backend"]
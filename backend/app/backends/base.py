@@ -0,0 +1,75 @@
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+from ..records import Session, Plan
+
+
+# Sort key of a listed item; pages continue strictly past the last key returned
+PageKey = Tuple[Any, ...]
+
+
+class StorageBackend(Protocol):
+    """
+    Where sessions and plans live.
+    Backends attach a listener to every session they hand out so that
+    append_message/update_entities are persisted without callers saving
+    explicitly. Entities are stored as Session.stored_entities() returns
+    them, task versions included, and handed back to Session.from_state.
+
+    The page_* methods read secondary indexes that the backend keeps up to
+    date on every write, so each costs O(limit) whatever the store size.
+    They return (key, item) pairs; passing the last key back continues the
+    listing.
+    """
+
+    def load_session(self, session_id: str) -> Optional[Session]:
+        """Return a stored session (listener attached) or None"""
+        ...
+
+    def add_session(self, session: Session) -> None:
+        """Persist a new session and attach the listener"""
+        ...
+
+    def save_plan(self, plan: Plan) -> None:
+        ...
+
+    def load_plan(self, plan_id: str) -> Optional[Plan]:
+        ...
+
+    def session_ids(self) -> List[str]:
+        ...
+
+    def plan_ids(self) -> List[str]:
+        ...
+
+    def count_sessions(self) -> int:
+        """Number of stored sessions, without loading their ids"""
+        ...
+
+    def count_plans(self) -> int:
+        ...
+
+    def page_sessions(self, before: Optional[PageKey], limit: int) -> List[Tuple[PageKey, Dict[str, Any]]]:
+        """Sessions newest first: {"session_id", "created_at"}"""
+        ...
+
+    def page_plans(self, before: Optional[PageKey], limit: int, session_id: Optional[str] = None) -> List[Tuple[PageKey, Dict[str, Any]]]:
+        """Plan summaries (Plan.summary()) newest first, optionally for one session"""
+        ...
+
+    def page_projects(self, prefix: str, after: Optional[PageKey], limit: int) -> List[Tuple[PageKey, Dict[str, Any]]]:
+        """Plan summaries whose project name starts with prefix (case-insensitive), by name, then creation time"""
+        ...
+
+    def page_owner_tasks(self, owner: str, before: Optional[PageKey], limit: int) -> List[Tuple[PageKey, Dict[str, Any]]]:
+        """Tasks of one owner across plans, newest plan first: {"plan_id", "project_name", "task"}"""
+        ...
+
+    def sweep(self) -> int:
+        """Drop expired entries; returns how many were removed"""
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        ...
+
+    def close(self) -> None:
+        """Flush pending writes and release resources"""
+        ...
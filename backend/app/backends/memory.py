@@ -0,0 +1,215 @@
+import gc
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from ..indexes import StoreIndex
+from ..journal import Journal
+from ..records import Session, Plan
+from ..store import BoundedStore, MemoryBudget
+
+
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "10000"))
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "86400"))
+PLAN_MAX_ENTRIES = int(os.getenv("PLAN_MAX_ENTRIES", "10000"))
+PLAN_TTL_SECONDS = float(os.getenv("PLAN_TTL_SECONDS", "604800"))
+STORE_MAX_BYTES = int(os.getenv("STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Set to a directory to journal every mutation and recover it on start-up
+JOURNAL_DIR = os.getenv("JOURNAL_DIR")
+# Snapshot once the current journal segment grows past this many bytes
+JOURNAL_COMPACT_BYTES = int(os.getenv("JOURNAL_COMPACT_BYTES", str(64 * 1024 * 1024)))
+JOURNAL_COMPACT_INTERVAL = float(os.getenv("JOURNAL_COMPACT_INTERVAL", "30"))
+
+
+def _sizeof(value) -> int:
+    return value.approx_bytes
+
+
+class MemoryBackend:
+    """
+    Process-local bounded stores (LRU + idle TTL + shared byte budget).
+    With a journal directory, every mutation and eviction is journaled and
+    the stores are rebuilt from the latest snapshot plus the journal tail
+    when the backend starts.
+
+    Journal records are lists: ["s", id, created_at] new session,
+    ["m", id, seq, role, content] message, ["e", id, entities],
+    ["p", plan dict], ["x", "session" | "plan", id] eviction, and in
+    snapshots ["S", id, created_at, messages, entities].
+    """
+
+    name = "memory"
+
+    def __init__(self, journal_dir: Optional[str] = JOURNAL_DIR, compact_bytes: int = JOURNAL_COMPACT_BYTES, compact_interval: float = JOURNAL_COMPACT_INTERVAL):
+        self.index = StoreIndex()
+        self.budget = MemoryBudget(STORE_MAX_BYTES)
+        self.sessions = BoundedStore("sessions", SESSION_MAX_ENTRIES, SESSION_TTL_SECONDS, _sizeof, self.budget, on_evict=self._evict_session)
+        self.plans = BoundedStore("plans", PLAN_MAX_ENTRIES, PLAN_TTL_SECONDS, _sizeof, self.budget, on_evict=self._evict_plan)
+        self.journal: Optional[Journal] = None
+        self.compact_bytes = compact_bytes
+        self.compactions = 0
+        if journal_dir:
+            self.journal = Journal(journal_dir)
+            # Loading creates millions of objects that all stay alive; without
+            # this the cyclic GC keeps rescanning them
+            gc.disable()
+            try:
+                self._replay(self.journal.recover())
+            finally:
+                gc.enable()
+            self.journal.open()
+            self._stop = threading.Event()
+            self._compactor = threading.Thread(target=self._compact_loop, args=(compact_interval,), name="journal-compactor", daemon=True)
+            self._compactor.start()
+
+    def _evict_session(self, session_id: str, session: Session):
+        session._listener = None
+        self.index.remove_session(session_id)
+        if self.journal:
+            self.journal.append(["x", "session", session_id])
+
+    def _evict_plan(self, plan_id: str, plan: Plan):
+        self.index.remove_plan(plan_id)
+        if self.journal:
+            self.journal.append(["x", "plan", plan_id])
+
+    def _on_change(self, event: str, session: Session, payload: Any):
+        if self.journal:
+            if event == "message":
+                self.journal.append(["m", session.id, session.message_count - 1, payload["role"], payload["content"]])
+            else:
+                self.journal.append(["e", session.id, payload])
+        self.sessions.resize(session.id)
+
+    def _replay(self, records):
+        """Rebuild the stores; every record kind is idempotent"""
+        sessions: Dict[str, list] = {}  # id -> [created_at, messages, entities, entities size]
+        plans: Dict[str, Dict[str, Any]] = {}
+        for record, size in records:
+            kind = record[0]
+            if kind == "m":
+                state = sessions.get(record[1])
+                if state is not None and record[2] == len(state[1]):
+                    state[1].append({"role": record[3], "content": record[4]})
+            elif kind == "e":
+                state = sessions.get(record[1])
+                if state is not None:
+                    state[2], state[3] = record[2], size
+            elif kind == "s":
+                if record[1] not in sessions:
+                    sessions[record[1]] = [record[2], [], {"project_name": None, "tasks": []}, None]
+            elif kind == "S":
+                # The record size stands in for the entities' encoded size
+                sessions[record[1]] = [record[2], record[3], record[4], size]
+            elif kind == "p":
+                plans[record[1]["plan_id"]] = record[1]
+            elif kind == "x":
+                (sessions if record[1] == "session" else plans).pop(record[2], None)
+
+        journal, self.journal = self.journal, None  # Don't journal evictions caused by loading
+        for session_id, (created_at, messages, entities, entities_bytes) in sessions.items():
+            session = Session.from_state(session_id, created_at, messages, entities, entities_bytes)
+            self.sessions[session_id] = session
+            session._listener = self._on_change
+            self.index.add_session(session)
+        for plan_id, state in plans.items():
+            plan = self.plans[plan_id] = Plan.from_state(state)
+            self.index.add_plan(plan)
+        self.journal = journal
+
+    def _capture(self):
+        """References to the current state; messages lists only grow, so a length pins them"""
+        sessions = [(s, s.message_count, s.stored_entities()) for s in self.sessions.values()]
+        plans = self.plans.values()
+
+        def records():
+            for session, count, entities in sessions:
+                messages = [{"role": role, "content": content} for role, content in session.iter_messages(count)]
+                yield ["S", session.id, session.created_at.isoformat(), messages, entities]
+            for plan in plans:
+                yield ["p", plan.to_dict()]
+        return records()
+
+    def compact(self):
+        """Write a snapshot and drop the journal segments it covers"""
+        self.journal.compact(self._capture)
+        self.compactions += 1
+
+    def _compact_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            if self.journal.segment_bytes > self.compact_bytes:
+                self.compact()
+
+    def load_session(self, session_id: str) -> Optional[Session]:
+        return self.sessions.get(session_id)
+
+    def add_session(self, session: Session):
+        self.sessions[session.id] = session
+        session._listener = self._on_change
+        self.index.add_session(session)
+        if self.journal:
+            self.journal.append(["s", session.id, session.created_at.isoformat()])
+            for seq, (role, content) in enumerate(session.iter_messages()):
+                self.journal.append(["m", session.id, seq, role, content])
+            self.journal.append(["e", session.id, session.stored_entities()])
+
+    def save_plan(self, plan: Plan):
+        # Index first: storing may evict, and the eviction unindexes
+        self.index.add_plan(plan)
+        self.plans[plan.id] = plan
+        if self.journal:
+            self.journal.append(["p", plan.to_dict()])
+
+    def load_plan(self, plan_id: str) -> Optional[Plan]:
+        return self.plans.get(plan_id)
+
+    def session_ids(self) -> List[str]:
+        return list(self.sessions.keys())
+
+    def plan_ids(self) -> List[str]:
+        return list(self.plans.keys())
+
+    def count_sessions(self) -> int:
+        return len(self.sessions)
+
+    def count_plans(self) -> int:
+        return len(self.plans)
+
+    def page_sessions(self, before, limit: int) -> List[Tuple[tuple, Dict[str, Any]]]:
+        return [(key, {"session_id": key[1], "created_at": key[0]}) for key in self.index.sessions(before, limit)]
+
+    def page_plans(self, before, limit: int, session_id: Optional[str] = None) -> List[Tuple[tuple, Dict[str, Any]]]:
+        return [(key, plan.summary()) for key, plan in self.index.plans(before, limit, session_id)]
+
+    def page_projects(self, prefix: str, after, limit: int) -> List[Tuple[tuple, Dict[str, Any]]]:
+        return [(key, plan.summary()) for key, plan in self.index.projects(prefix, after, limit)]
+
+    def page_owner_tasks(self, owner: str, before, limit: int) -> List[Tuple[tuple, Dict[str, Any]]]:
+        return [
+            (key, {"plan_id": plan.id, "project_name": plan.project_name, "task": task.to_dict()})
+            for key, plan, task in self.index.owner_tasks(owner, before, limit)
+        ]
+
+    def sweep(self) -> int:
+        return self.sessions.sweep() + self.plans.sweep()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "backend": self.name,
+            "sessions": self.sessions.stats(),
+            "plans": self.plans.stats(),
+            "memory": self.budget.stats(),
+        }
+        if self.journal:
+            stats["journal"] = {
+                "segment_bytes": self.journal.segment_bytes,
+                "records": self.journal.records,
+                "commits": self.journal.commits,
+                "compactions": self.compactions,
+            }
+        return stats
+
+    def close(self):
+        if self.journal:
+            self._stop.set()
+            self.journal.close()
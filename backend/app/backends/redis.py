@@ -0,0 +1,327 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from ..indexes import HIGH, owner_key, project_key
+from ..records import Session, Plan
+
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+REDIS_PREFIX = os.getenv("REDIS_PREFIX", "planapi:")
+SESSION_TTL_SECONDS = int(float(os.getenv("SESSION_TTL_SECONDS", "86400")))
+PLAN_TTL_SECONDS = int(float(os.getenv("PLAN_TTL_SECONDS", "604800")))
+# Sessions kept locally and revalidated with a version check instead of a full fetch
+REDIS_CACHE_SIZE = int(os.getenv("REDIS_CACHE_SIZE", "1024"))
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+class RedisBackend:
+    """
+    Sessions and plans in Redis (or anything speaking its protocol).
+
+    A session is a hash (created_at, entities, version) plus a stream of
+    messages; a plan is one JSON blob. Every mutation is one pipelined
+    transaction that also bumps the version and refreshes the keys' expiry,
+    so TTLs are enforced by the server. A session that expired while still
+    in use is written back whole by its next mutation.
+
+    Hot sessions are served from a small local cache: a lookup fetches only
+    the version field and reuses the cached session if it has not moved.
+
+    Listings use sorted sets scored 0 and ordered by member, where members
+    are sort keys joined with NUL ("created_at\0plan_id", ...). They are
+    written in the same transaction as the entry they index; entries that
+    expired since are skipped and removed when a listing reaches them.
+    """
+
+    name = "redis"
+
+    def __init__(self, client=None, prefix: str = REDIS_PREFIX, session_ttl: int = SESSION_TTL_SECONDS, plan_ttl: int = PLAN_TTL_SECONDS, cache_size: int = REDIS_CACHE_SIZE):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+        self.client = client
+        self.prefix = prefix
+        self.session_ttl = session_ttl
+        self.plan_ttl = plan_ttl
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[int, Session]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _session_key(self, session_id: str) -> str:
+        return f"{self.prefix}session:{session_id}"
+
+    def _messages_key(self, session_id: str) -> str:
+        return f"{self.prefix}messages:{session_id}"
+
+    def _plan_key(self, plan_id: str) -> str:
+        return f"{self.prefix}plan:{plan_id}"
+
+    def _index_key(self, name: str) -> str:
+        return f"{self.prefix}idx:{name}"
+
+    def _cache_put(self, session: Session, version: int):
+        with self._lock:
+            self._cache[session.id] = (version, session)
+            self._cache.move_to_end(session.id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _cache_bump(self, session: Session, version: int):
+        """Record our own write; drop the entry if another writer got in between"""
+        with self._lock:
+            cached = self._cache.get(session.id)
+            if cached and cached[1] is session and cached[0] == version - 1:
+                self._cache[session.id] = (version, session)
+            else:
+                self._cache.pop(session.id, None)
+
+    def _write_session(self, pipe, session: Session):
+        """Queue the whole session (hash, listing entry, messages) on a transaction"""
+        key, messages_key = self._session_key(session.id), self._messages_key(session.id)
+        pipe.hset(key, mapping={"created_at": session.created_at.isoformat(), "entities": _dumps(session.stored_entities()), "version": 0})
+        pipe.zadd(self._index_key("sessions"), {f"{session.created_at.isoformat()}\0{session.id}": 0})
+        for role, content in session.iter_messages():
+            pipe.xadd(messages_key, {"role": role, "content": content})
+        if self.session_ttl > 0:
+            pipe.expire(key, self.session_ttl)
+            if session.message_count:
+                pipe.expire(messages_key, self.session_ttl)
+
+    def _persist(self, event: str, session: Session, payload: Any):
+        key, messages_key = self._session_key(session.id), self._messages_key(session.id)
+        rewritten = False
+
+        def write(pipe):
+            nonlocal rewritten
+            # Watched, so the key cannot expire between this check and EXEC
+            rewritten = not pipe.exists(key)
+            pipe.multi()
+            if rewritten:
+                # Expired since it was loaded: bumping the version alone would
+                # leave a hash with no created_at, so write the session back whole
+                pipe.delete(messages_key)
+                self._write_session(pipe, session)
+                return
+            if event == "message":
+                pipe.xadd(messages_key, {"role": payload["role"], "content": payload["content"]})
+            else:
+                pipe.hset(key, "entities", _dumps(payload))
+            pipe.hincrby(key, "version", 1)
+            if self.session_ttl > 0:
+                pipe.expire(key, self.session_ttl)
+                pipe.expire(messages_key, self.session_ttl)
+
+        results = self.client.transaction(write, key)
+        if rewritten:
+            self._cache_put(session, 0)
+        else:
+            self._cache_bump(session, int(results[1]))
+
+    def load_session(self, session_id: str) -> Optional[Session]:
+        key = self._session_key(session_id)
+        with self._lock:
+            cached = self._cache.get(session_id)
+        if cached:
+            version = self.client.hget(key, "version")
+            if version is not None and int(version) == cached[0]:
+                with self._lock:
+                    self._cache.move_to_end(session_id)
+                self.cache_hits += 1
+                return cached[1]
+        self.cache_misses += 1
+
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hgetall(key)
+        pipe.xrange(self._messages_key(session_id))
+        fields, entries = pipe.execute()
+        if not fields:
+            with self._lock:
+                self._cache.pop(session_id, None)
+            return None
+
+        messages = [{"role": entry["role"], "content": entry["content"]} for _, entry in entries]
+        session = Session.from_state(session_id, fields["created_at"], messages, json.loads(fields["entities"]))
+        session._listener = self._persist
+        self._cache_put(session, int(fields["version"]))
+        return session
+
+    def add_session(self, session: Session):
+        pipe = self.client.pipeline(transaction=True)
+        self._write_session(pipe, session)
+        pipe.execute()
+        session._listener = self._persist
+        self._cache_put(session, 0)
+
+    def save_plan(self, plan: Plan):
+        state = plan.to_dict()
+        created = state["created_at"]
+        pipe = self.client.pipeline(transaction=True)
+        pipe.set(self._plan_key(plan.id), _dumps(state), ex=self.plan_ttl or None)
+        buckets = [self._index_key("plans"), self._index_key("projects")]
+        pipe.zadd(buckets[0], {f"{created}\0{plan.id}": 0})
+        pipe.zadd(buckets[1], {f"{project_key(plan.project_name)}\0{created}\0{plan.id}": 0})
+        if plan.session_id:
+            buckets.append(self._index_key(f"session_plans:{plan.session_id}"))
+            pipe.zadd(buckets[-1], {f"{created}\0{plan.id}": 0})
+        owners: Dict[str, Dict[str, int]] = {}
+        for position, task in enumerate(plan.tasks):
+            owner = owner_key(task.owner)
+            if owner:
+                # Zero-padded so members sort by position
+                owners.setdefault(owner, {})[f"{created}\0{plan.id}\0{position:06d}"] = 0
+        for owner, members in owners.items():
+            buckets.append(self._index_key(f"owner:{owner}"))
+            pipe.zadd(buckets[-1], members)
+        if self.plan_ttl > 0:
+            # Per-session and per-owner sets outlive their newest plan by at most one TTL
+            for bucket in buckets[2:]:
+                pipe.expire(bucket, self.plan_ttl)
+        pipe.execute()
+
+    def load_plan(self, plan_id: str) -> Optional[Plan]:
+        blob = self.client.get(self._plan_key(plan_id))
+        return Plan.from_state(json.loads(blob)) if blob else None
+
+    def _scan_ids(self, kind: str) -> List[str]:
+        start = len(self.prefix) + len(kind) + 1
+        return [key[start:] for key in self.client.scan_iter(match=f"{self.prefix}{kind}:*", count=1000)]
+
+    def session_ids(self) -> List[str]:
+        return self._scan_ids("session")
+
+    def plan_ids(self) -> List[str]:
+        return self._scan_ids("plan")
+
+    # Listing index sizes: an expired entry still counts until a listing (or, for plans, sweep) drops it
+    def count_sessions(self) -> int:
+        return self.client.zcard(self._index_key("sessions"))
+
+    def count_plans(self) -> int:
+        return self.client.zcard(self._index_key("plans"))
+
+    def _page(self, index: str, start: Optional[str], limit: int, resolve: Callable[[List[str]], List[Optional[Any]]], reverse: bool = True, stop: Optional[str] = None) -> List[Tuple[List[str], Any]]:
+        """
+        Walk a lex-ordered index from just past `start`, resolving members to
+        items; members whose entry expired are dropped from the index and
+        skipped, so a page is short only when the index runs out.
+        """
+        result: List[Tuple[List[str], Any]] = []
+        while len(result) < limit:
+            want = limit - len(result)
+            if reverse:
+                members = self.client.zrevrangebylex(index, "+" if start is None else f"({start}", "-", start=0, num=want)
+            else:
+                members = self.client.zrangebylex(index, "-" if start is None else f"({start}", stop or "+", start=0, num=want)
+            if not members:
+                break
+            stale = []
+            for member, item in zip(members, resolve(members)):
+                if item is None:
+                    stale.append(member)
+                else:
+                    result.append((member.split("\0"), item))
+            if stale:
+                self.client.zrem(index, *stale)
+            if len(members) < want:
+                break
+            start = members[-1]
+        return result
+
+    def _load_plans(self, plan_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        unique = list(dict.fromkeys(plan_ids))
+        blobs = self.client.mget([self._plan_key(plan_id) for plan_id in unique]) if unique else []
+        return {plan_id: json.loads(blob) for plan_id, blob in zip(unique, blobs) if blob}
+
+    def _plan_summaries(self, plan_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        states = self._load_plans(plan_ids)
+        summaries = []
+        for plan_id in plan_ids:
+            state = states.get(plan_id)
+            if state is None:
+                summaries.append(None)
+                continue
+            summary = {name: state.get(name) for name in ("plan_id", "session_id", "project_name", "start_date", "end_date", "created_at")}
+            summary["task_count"] = len(state["tasks"])
+            summaries.append(summary)
+        return summaries
+
+    def page_sessions(self, before, limit: int) -> List[Tuple[tuple, Dict[str, Any]]]:
+        def resolve(members):
+            keys = [member.split("\0") for member in members]
+            pipe = self.client.pipeline(transaction=False)
+            for _, session_id in keys:
+                pipe.exists(self._session_key(session_id))
+            return [{"session_id": session_id, "created_at": created} if found else None
+                    for (created, session_id), found in zip(keys, pipe.execute())]
+        start = "\0".join(before) if before else None
+        return [(tuple(key), item) for key, item in self._page(self._index_key("sessions"), start, limit, resolve)]
+
+    def page_plans(self, before, limit: int, session_id: Optional[str] = None) -> List[Tuple[tuple, Dict[str, Any]]]:
+        index = self._index_key("plans" if session_id is None else f"session_plans:{session_id}")
+        start = "\0".join(before) if before else None
+        rows = self._page(index, start, limit, lambda members: self._plan_summaries([m.split("\0")[1] for m in members]))
+        return [(tuple(key), item) for key, item in rows]
+
+    def _project_resolver(self, members: List[str]) -> List[Optional[Dict[str, Any]]]:
+        return self._plan_summaries([member.split("\0")[2] for member in members])
+
+    def page_projects(self, prefix: str, after, limit: int) -> List[Tuple[tuple, Dict[str, Any]]]:
+        prefix = project_key(prefix)
+        # Members are "key\0...", so starting just past the bare prefix includes every match
+        start = "\0".join(after) if after else (prefix or None)
+        rows = self._page(self._index_key("projects"), start, limit, self._project_resolver, reverse=False, stop=f"({prefix}{HIGH}")
+        return [(tuple(key), item) for key, item in rows]
+
+    def page_owner_tasks(self, owner: str, before, limit: int) -> List[Tuple[tuple, Dict[str, Any]]]:
+        owner = owner_key(owner)
+        if owner is None:
+            # Unassigned tasks are not indexed
+            return []
+
+        def resolve(members):
+            keys = [member.split("\0") for member in members]
+            states = self._load_plans([plan_id for _, plan_id, _ in keys])
+            items = []
+            for _, plan_id, position in keys:
+                state = states.get(plan_id)
+                tasks = state["tasks"] if state else []
+                task = tasks[int(position)] if int(position) < len(tasks) else None
+                if task is None or owner_key(task.get("owner")) != owner:
+                    # Plan expired or was replaced
+                    items.append(None)
+                else:
+                    items.append({"plan_id": plan_id, "project_name": state["project_name"], "task": task})
+            return items
+
+        start = f"{before[0]}\0{before[1]}\0{before[2]:06d}" if before else None
+        rows = self._page(self._index_key(f"owner:{owner}"), start, limit, resolve)
+        return [((created, plan_id, int(position)), item) for (created, plan_id, position), item in rows]
+
+    def sweep(self) -> int:
+        """
+        Expiry is native; this only trims the global plan index of plans
+        created more than one TTL ago (other index entries go lazily)
+        """
+        if self.plan_ttl > 0:
+            cutoff = (datetime.utcnow() - timedelta(seconds=self.plan_ttl)).isoformat()
+            self.client.zremrangebylex(self._index_key("plans"), "-", f"({cutoff}")
+        return 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "cached_sessions": len(self._cache),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+    def close(self):
+        self.client.close()
@@ -0,0 +1,378 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Tuple
+from ..indexes import HIGH, owner_key, project_key
+from ..records import Session, Plan
+
+
+SQLITE_PATH = os.getenv("SQLITE_PATH", "plan.db")
+# Pending writes are committed together once this many are queued or after FLUSH_INTERVAL
+SQLITE_BATCH_SIZE = int(os.getenv("SQLITE_BATCH_SIZE", "256"))
+SQLITE_FLUSH_INTERVAL = float(os.getenv("SQLITE_FLUSH_INTERVAL", "0.005"))
+# Longest pause between retries of a batch that failed to commit
+SQLITE_RETRY_MAX_SECONDS = float(os.getenv("SQLITE_RETRY_MAX_SECONDS", "1"))
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "86400"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    entities TEXT NOT NULL CHECK (json_valid(entities))
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS plans (
+    id TEXT PRIMARY KEY,
+    project_name TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    calendar TEXT CHECK (calendar IS NULL OR json_valid(calendar)),
+    tasks TEXT NOT NULL CHECK (json_valid(tasks))
+);
+CREATE TABLE IF NOT EXISTS plan_owners (
+    owner_key TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    plan_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    task TEXT NOT NULL CHECK (json_valid(task)),
+    PRIMARY KEY (owner_key, created_at, plan_id, position)
+) WITHOUT ROWID;
+"""
+
+# Columns added to plans after the first release, with how to fill them for existing rows
+PLAN_COLUMNS = [
+    ("session_id", "TEXT", None),
+    ("project_key", "TEXT NOT NULL DEFAULT ''", "UPDATE plans SET project_key = casefold(project_name)"),
+    ("task_count", "INTEGER NOT NULL DEFAULT 0", "UPDATE plans SET task_count = json_array_length(tasks)"),
+]
+
+# Secondary indexes; listing queries walk them in key order, so a page costs O(limit)
+INDEXES = """
+CREATE INDEX IF NOT EXISTS sessions_created ON sessions (created_at, id);
+CREATE INDEX IF NOT EXISTS plans_created ON plans (created_at, id);
+CREATE INDEX IF NOT EXISTS plans_session ON plans (session_id, created_at, id);
+CREATE INDEX IF NOT EXISTS plans_project ON plans (project_key, created_at, id);
+CREATE INDEX IF NOT EXISTS plan_owners_plan ON plan_owners (plan_id);
+"""
+
+# Statements are constant strings so sqlite3's statement cache reuses the prepared form
+INSERT_SESSION = "INSERT OR IGNORE INTO sessions (id, created_at, updated_at, entities) VALUES (?, ?, ?, ?)"
+UPDATE_ENTITIES = "UPDATE sessions SET entities = ?, updated_at = ? WHERE id = ?"
+TOUCH_SESSION = "UPDATE sessions SET updated_at = ? WHERE id = ?"
+# seq is assigned inside the write transaction, so workers appending to one session never collide
+APPEND_MESSAGE = "INSERT INTO messages (session_id, seq, role, content) SELECT ?1, COALESCE(MAX(seq), -1) + 1, ?2, ?3 FROM messages WHERE session_id = ?1"
+UPSERT_PLAN = "INSERT OR REPLACE INTO plans (id, project_name, start_date, end_date, created_at, calendar, tasks, session_id, project_key, task_count) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+DELETE_PLAN_OWNERS = "DELETE FROM plan_owners WHERE plan_id = ?"
+INSERT_PLAN_OWNER = "INSERT OR REPLACE INTO plan_owners (owner_key, created_at, plan_id, position, task) VALUES (?, ?, ?, ?, ?)"
+SELECT_SESSION = "SELECT created_at, entities FROM sessions WHERE id = ?"
+SELECT_MESSAGES = "SELECT role, content FROM messages WHERE session_id = ? ORDER BY seq"
+SELECT_PLAN = "SELECT project_name, start_date, end_date, created_at, calendar, tasks, session_id FROM plans WHERE id = ?"
+SELECT_EXPIRED = "SELECT id FROM sessions WHERE updated_at < ?"
+DELETE_SESSION = "DELETE FROM sessions WHERE id = ?"
+DELETE_MESSAGES = "DELETE FROM messages WHERE session_id = ?"
+
+# Keyset pagination: each listing has a first-page form and a "continue past key" form
+PLAN_SUMMARY = "SELECT created_at, id, session_id, project_name, start_date, end_date, task_count FROM plans"
+PAGE_SESSIONS = "SELECT created_at, id FROM sessions ORDER BY created_at DESC, id DESC LIMIT ?"
+PAGE_SESSIONS_BEFORE = "SELECT created_at, id FROM sessions WHERE (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC LIMIT ?"
+PAGE_PLANS = PLAN_SUMMARY + " ORDER BY created_at DESC, id DESC LIMIT ?"
+PAGE_PLANS_BEFORE = PLAN_SUMMARY + " WHERE (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC LIMIT ?"
+PAGE_SESSION_PLANS = PLAN_SUMMARY + " WHERE session_id = ? ORDER BY created_at DESC, id DESC LIMIT ?"
+PAGE_SESSION_PLANS_BEFORE = PLAN_SUMMARY + " WHERE session_id = ? AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC LIMIT ?"
+PAGE_PROJECTS = "SELECT project_key, " + PLAN_SUMMARY[7:] + " WHERE project_key >= ? AND project_key < ? ORDER BY project_key, created_at, id LIMIT ?"
+PAGE_PROJECTS_AFTER = "SELECT project_key, " + PLAN_SUMMARY[7:] + " WHERE (project_key, created_at, id) > (?, ?, ?) AND project_key < ? ORDER BY project_key, created_at, id LIMIT ?"
+OWNER_TASKS = "SELECT o.created_at, o.plan_id, o.position, p.project_name, o.task FROM plan_owners o JOIN plans p ON p.id = o.plan_id"
+PAGE_OWNER_TASKS = OWNER_TASKS + " WHERE o.owner_key = ? ORDER BY o.created_at DESC, o.plan_id DESC, o.position DESC LIMIT ?"
+PAGE_OWNER_TASKS_BEFORE = OWNER_TASKS + " WHERE o.owner_key = ? AND (o.created_at, o.plan_id, o.position) < (?, ?, ?) ORDER BY o.created_at DESC, o.plan_id DESC, o.position DESC LIMIT ?"
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+class SQLiteBackend:
+    """
+    Sessions and plans in a SQLite database in WAL mode, shared by every
+    worker process pointing at the same file.
+    Writes are queued and committed in batches by a flusher thread; a read
+    flushes pending writes first, so a process always sees its own writes.
+    Each thread reads through its own connection, which WAL lets run
+    alongside the writer.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str = SQLITE_PATH, batch_size: int = SQLITE_BATCH_SIZE, flush_interval: float = SQLITE_FLUSH_INTERVAL, ttl_seconds: float = SESSION_TTL_SECONDS):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.ttl_seconds = ttl_seconds
+        self._writer = self._connect()
+        self._writer.executescript(SCHEMA)
+        self._migrate()
+        self._writer.executescript(INDEXES)
+        self._local = threading.local()
+        self._pending: List[Tuple[str, tuple]] = []
+        self._write_lock = threading.Lock()
+        self._wake = threading.Condition(threading.Lock())
+        self._closed = False
+        self.commits = 0
+        self.writes = 0
+        self.failed_commits = 0
+        self._flusher = threading.Thread(target=self._flush_loop, name="sqlite-flusher", daemon=True)
+        self._flusher.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _migrate(self):
+        """Add columns and owner rows missing from databases created by older versions"""
+        columns = {row[1] for row in self._writer.execute("PRAGMA table_info(plans)")}
+        missing = [column for column in PLAN_COLUMNS if column[0] not in columns]
+        if not missing:
+            return
+        self._writer.create_function("casefold", 1, project_key, deterministic=True)
+        self._writer.execute("BEGIN")
+        for name, definition, backfill in missing:
+            self._writer.execute(f"ALTER TABLE plans ADD COLUMN {name} {definition}")
+            if backfill:
+                self._writer.execute(backfill)
+        for plan_id, created_at, tasks in self._writer.execute("SELECT id, created_at, tasks FROM plans").fetchall():
+            self._writer.executemany(INSERT_PLAN_OWNER, self._owner_rows(plan_id, created_at, json.loads(tasks)))
+        self._writer.execute("COMMIT")
+
+    @staticmethod
+    def _owner_rows(plan_id: str, created_at: str, tasks: List[Dict[str, Any]]) -> List[tuple]:
+        rows = []
+        for position, task in enumerate(tasks):
+            owner = owner_key(task.get("owner"))
+            if owner:
+                rows.append((owner, created_at, plan_id, position, _dumps(task)))
+        return rows
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _queue(self, sql: str, params: tuple):
+        with self._wake:
+            self._pending.append((sql, params))
+            if len(self._pending) in (1, self.batch_size):
+                self._wake.notify()
+
+    def _flush_loop(self):
+        delay = self.flush_interval
+        while True:
+            with self._wake:
+                while not self._pending and not self._closed:
+                    self._wake.wait()
+                if self._closed:
+                    return
+                if len(self._pending) < self.batch_size:
+                    # Give concurrent writers a moment to join this batch
+                    self._wake.wait(self.flush_interval)
+            try:
+                self.flush()
+                delay = self.flush_interval
+            except Exception as e:
+                # The batch is back on the queue; retry it after a growing pause
+                print(f"Warning: SQLite batch commit failed, retrying in {delay:.3f}s: {e}")
+                with self._wake:
+                    self._wake.wait(delay)
+                delay = min(delay * 2, SQLITE_RETRY_MAX_SECONDS)
+
+    def flush(self):
+        """Commit every queued write in one transaction; on failure the writes stay queued"""
+        with self._write_lock:
+            with self._wake:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return
+            try:
+                cursor = self._writer.cursor()
+                cursor.execute("BEGIN")
+                # Consecutive writes of the same kind go through one executemany
+                for sql, group in groupby(pending, key=lambda item: item[0]):
+                    cursor.executemany(sql, [params for _, params in group])
+                cursor.execute("COMMIT")
+            except Exception:
+                if self._writer.in_transaction:
+                    self._writer.execute("ROLLBACK")
+                with self._wake:
+                    # Ahead of anything queued since, so writes keep their order
+                    self._pending[:0] = pending
+                self.failed_commits += 1
+                raise
+            self.commits += 1
+            self.writes += len(pending)
+
+    def _read(self, sql: str, params: tuple) -> List[tuple]:
+        # Always flush: it waits on _write_lock for a batch another thread has taken but not yet committed
+        self.flush()
+        return self._reader().execute(sql, params).fetchall()
+
+    def _persist(self, event: str, session: Session, payload: Any):
+        now = time.time()
+        if event == "message":
+            self._queue(APPEND_MESSAGE, (session.id, payload["role"], payload["content"]))
+            self._queue(TOUCH_SESSION, (now, session.id))
+        else:
+            self._queue(UPDATE_ENTITIES, (_dumps(payload), now, session.id))
+
+    def load_session(self, session_id: str) -> Optional[Session]:
+        rows = self._read(SELECT_SESSION, (session_id,))
+        if not rows:
+            return None
+        created_at, entities = rows[0]
+        messages = [{"role": role, "content": content} for role, content in self._reader().execute(SELECT_MESSAGES, (session_id,))]
+        session = Session.from_state(session_id, created_at, messages, json.loads(entities))
+        session._listener = self._persist
+        return session
+
+    def add_session(self, session: Session):
+        self._queue(INSERT_SESSION, (session.id, session.created_at.isoformat(), time.time(), _dumps(session.stored_entities())))
+        for role, content in session.iter_messages():
+            self._queue(APPEND_MESSAGE, (session.id, role, content))
+        session._listener = self._persist
+
+    def save_plan(self, plan: Plan):
+        state = plan.to_dict()
+        self._queue(UPSERT_PLAN, (
+            plan.id, plan.project_name, plan.start_date, plan.end_date, state["created_at"],
+            _dumps(state["calendar"]) if state["calendar"] else None, _dumps(state["tasks"]),
+            plan.session_id, project_key(plan.project_name), len(plan.tasks),
+        ))
+        # Owner rows go in the same batch, so the index commits with the plan
+        self._queue(DELETE_PLAN_OWNERS, (plan.id,))
+        for row in self._owner_rows(plan.id, state["created_at"], state["tasks"]):
+            self._queue(INSERT_PLAN_OWNER, row)
+
+    def load_plan(self, plan_id: str) -> Optional[Plan]:
+        rows = self._read(SELECT_PLAN, (plan_id,))
+        if not rows:
+            return None
+        project_name, start_date, end_date, created_at, calendar, tasks, session_id = rows[0]
+        return Plan.from_state({
+            "plan_id": plan_id,
+            "project_name": project_name,
+            "tasks": json.loads(tasks),
+            "start_date": start_date,
+            "end_date": end_date,
+            "calendar": json.loads(calendar) if calendar else None,
+            "created_at": created_at,
+            "session_id": session_id,
+        })
+
+    def session_ids(self) -> List[str]:
+        return [row[0] for row in self._read("SELECT id FROM sessions", ())]
+
+    def plan_ids(self) -> List[str]:
+        return [row[0] for row in self._read("SELECT id FROM plans", ())]
+
+    def count_sessions(self) -> int:
+        return self._read("SELECT COUNT(*) FROM sessions", ())[0][0]
+
+    def count_plans(self) -> int:
+        return self._read("SELECT COUNT(*) FROM plans", ())[0][0]
+
+    @staticmethod
+    def _summary(row: tuple) -> Tuple[tuple, Dict[str, Any]]:
+        created_at, plan_id, session_id, project_name, start_date, end_date, task_count = row
+        return (created_at, plan_id), {
+            "plan_id": plan_id,
+            "session_id": session_id,
+            "project_name": project_name,
+            "start_date": start_date,
+            "end_date": end_date,
+            "created_at": created_at,
+            "task_count": task_count,
+        }
+
+    def page_sessions(self, before, limit: int) -> List[Tuple[tuple, Dict[str, Any]]]:
+        rows = self._read(PAGE_SESSIONS, (limit,)) if before is None else self._read(PAGE_SESSIONS_BEFORE, (*before, limit))
+        return [((created_at, session_id), {"session_id": session_id, "created_at": created_at}) for created_at, session_id in rows]
+
+    def page_plans(self, before, limit: int, session_id: Optional[str] = None) -> List[Tuple[tuple, Dict[str, Any]]]:
+        if session_id is None:
+            rows = self._read(PAGE_PLANS, (limit,)) if before is None else self._read(PAGE_PLANS_BEFORE, (*before, limit))
+        elif before is None:
+            rows = self._read(PAGE_SESSION_PLANS, (session_id, limit))
+        else:
+            rows = self._read(PAGE_SESSION_PLANS_BEFORE, (session_id, *before, limit))
+        return [self._summary(row) for row in rows]
+
+    def page_projects(self, prefix: str, after, limit: int) -> List[Tuple[tuple, Dict[str, Any]]]:
+        prefix = project_key(prefix)
+        if after is None:
+            rows = self._read(PAGE_PROJECTS, (prefix, prefix + HIGH, limit))
+        else:
+            rows = self._read(PAGE_PROJECTS_AFTER, (*after, prefix + HIGH, limit))
+        result = []
+        for row in rows:
+            key, item = self._summary(row[1:])
+            result.append(((row[0], *key), item))
+        return result
+
+    def page_owner_tasks(self, owner: str, before, limit: int) -> List[Tuple[tuple, Dict[str, Any]]]:
+        owner = owner_key(owner)
+        if owner is None:
+            # Unassigned tasks are not indexed
+            return []
+        if before is None:
+            rows = self._read(PAGE_OWNER_TASKS, (owner, limit))
+        else:
+            rows = self._read(PAGE_OWNER_TASKS_BEFORE, (owner, *before, limit))
+        return [
+            ((created_at, plan_id, position), {"plan_id": plan_id, "project_name": project_name, "task": json.loads(task)})
+            for created_at, plan_id, position, project_name, task in rows
+        ]
+
+    def sweep(self) -> int:
+        """Delete sessions not written to within the TTL (plans are kept)"""
+        if self.ttl_seconds <= 0:
+            return 0
+        expired = self._read(SELECT_EXPIRED, (time.time() - self.ttl_seconds,))
+        for (session_id,) in expired:
+            self._queue(DELETE_MESSAGES, (session_id,))
+            self._queue(DELETE_SESSION, (session_id,))
+        self.flush()
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        reader = self._reader()
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "sessions": reader.execute("SELECT count(*) FROM sessions").fetchone()[0],
+            "plans": reader.execute("SELECT count(*) FROM plans").fetchone()[0],
+            "pending_writes": len(self._pending),
+            "commits": self.commits,
+            "writes": self.writes,
+            "failed_commits": self.failed_commits,
+        }
+
+    def close(self):
+        self._closed = True
+        with self._wake:
+            self._wake.notify()
+        self._flusher.join(timeout=1)
+        self.flush()
+        self._writer.close()
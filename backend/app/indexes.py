@@ -0,0 +1,179 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, List, Optional, Tuple
+from .records import Session, Plan
+
+
+# Greater than any character, so (prefix + HIGH) bounds every key starting with prefix
+HIGH = "\U0010ffff"
+
+Key = Tuple[str, ...]
+
+UNASSIGNED_OWNERS = {"", "unassigned", "tbd", "none"}
+
+
+def owner_key(owner: Optional[str]) -> Optional[str]:
+    """Owner name as matched across plans (trimmed, case-insensitive); None if unassigned"""
+    if not owner:
+        return None
+    key = owner.strip().casefold()
+    return None if key in UNASSIGNED_OWNERS else key
+
+
+def project_key(project_name: Optional[str]) -> str:
+    return (project_name or "").strip().casefold()
+
+
+class SortedIndex:
+    """
+    Keys kept sorted in a list.
+    Keys are mostly created in increasing order (they start with a timestamp),
+    so inserts land at the end; pages are two bisects and a slice.
+    """
+
+    __slots__ = ("_keys",)
+
+    def __init__(self):
+        self._keys: List[Key] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: Key):
+        keys = self._keys
+        if not keys or keys[-1] < key:
+            keys.append(key)
+        else:
+            i = bisect_left(keys, key)
+            if i == len(keys) or keys[i] != key:
+                keys.insert(i, key)
+
+    def remove(self, key: Key):
+        keys = self._keys
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            del keys[i]
+
+    def newest(self, before: Optional[Key], limit: int) -> List[Key]:
+        """Up to `limit` keys below `before` (or from the end), largest first"""
+        end = len(self._keys) if before is None else bisect_left(self._keys, before)
+        return self._keys[max(0, end - limit):end][::-1]
+
+    def prefixed(self, prefix: str, after: Optional[Key], limit: int) -> List[Key]:
+        """Up to `limit` keys whose first element starts with `prefix`, above `after`, smallest first"""
+        keys = self._keys
+        start = bisect_left(keys, (prefix,)) if after is None else bisect_right(keys, after)
+        end = bisect_left(keys, (prefix + HIGH,), lo=start)
+        return keys[start:min(end, start + limit)]
+
+
+class StoreIndex:
+    """
+    Secondary indexes over the sessions and plans of one in-memory backend:
+    sessions and plans by creation time, plans by session, plans by project
+    name and tasks by owner. The backend calls add/remove on every write and
+    eviction, so an index never lists something the store has dropped.
+
+    Keys: sessions (created_at, id); plans (created_at, plan_id);
+    projects (project key, created_at, plan_id); owners
+    (created_at, plan_id, task position).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = SortedIndex()
+        self._plans = SortedIndex()
+        self._projects = SortedIndex()
+        self._by_session: Dict[str, SortedIndex] = {}
+        self._by_owner: Dict[str, SortedIndex] = {}
+        # Indexed plans, to resolve keys and to find a plan's keys when it goes away
+        self._plan_objects: Dict[str, Plan] = {}
+        self._session_keys: Dict[str, Key] = {}
+
+    def add_session(self, session: Session):
+        key = (session.created_at.isoformat(), session.id)
+        with self._lock:
+            self._session_keys[session.id] = key
+            self._sessions.add(key)
+
+    def remove_session(self, session_id: str):
+        with self._lock:
+            key = self._session_keys.pop(session_id, None)
+            if key:
+                self._sessions.remove(key)
+
+    def add_plan(self, plan: Plan):
+        with self._lock:
+            old = self._plan_objects.get(plan.id)
+            if old is not None:
+                self._unindex(old)
+            self._plan_objects[plan.id] = plan
+            created = plan.created_at.isoformat()
+            self._plans.add((created, plan.id))
+            self._projects.add((project_key(plan.project_name), created, plan.id))
+            if plan.session_id:
+                self._bucket(self._by_session, plan.session_id).add((created, plan.id))
+            for position, task in enumerate(plan.tasks):
+                owner = owner_key(task.owner)
+                if owner:
+                    self._bucket(self._by_owner, owner).add((created, plan.id, position))
+
+    def remove_plan(self, plan_id: str):
+        with self._lock:
+            plan = self._plan_objects.pop(plan_id, None)
+            if plan is not None:
+                self._unindex(plan)
+
+    @staticmethod
+    def _bucket(buckets: Dict[str, SortedIndex], name: str) -> SortedIndex:
+        index = buckets.get(name)
+        if index is None:
+            index = buckets[name] = SortedIndex()
+        return index
+
+    @staticmethod
+    def _discard(buckets: Dict[str, SortedIndex], name: str, key: Key):
+        index = buckets.get(name)
+        if index is not None:
+            index.remove(key)
+            if not index:
+                del buckets[name]
+
+    def _unindex(self, plan: Plan):
+        created = plan.created_at.isoformat()
+        self._plans.remove((created, plan.id))
+        self._projects.remove((project_key(plan.project_name), created, plan.id))
+        if plan.session_id:
+            self._discard(self._by_session, plan.session_id, (created, plan.id))
+        for position, task in enumerate(plan.tasks):
+            owner = owner_key(task.owner)
+            if owner:
+                self._discard(self._by_owner, owner, (created, plan.id, position))
+
+    def sessions(self, before: Optional[Key], limit: int) -> List[Key]:
+        with self._lock:
+            return self._sessions.newest(before, limit)
+
+    def plans(self, before: Optional[Key], limit: int, session_id: Optional[str] = None) -> List[Tuple[Key, Plan]]:
+        with self._lock:
+            if session_id is None:
+                keys = self._plans.newest(before, limit)
+            else:
+                index = self._by_session.get(session_id)
+                keys = index.newest(before, limit) if index else []
+            return [(key, self._plan_objects[key[1]]) for key in keys]
+
+    def projects(self, prefix: str, after: Optional[Key], limit: int) -> List[Tuple[Key, Plan]]:
+        with self._lock:
+            keys = self._projects.prefixed(project_key(prefix), after, limit)
+            return [(key, self._plan_objects[key[2]]) for key in keys]
+
+    def owner_tasks(self, owner: str, before: Optional[Key], limit: int) -> List[Tuple[Key, Plan, Any]]:
+        with self._lock:
+            index = self._by_owner.get(owner_key(owner))
+            keys = index.newest(before, limit) if index else []
+            result = []
+            for key in keys:
+                plan = self._plan_objects[key[1]]
+                result.append((key, plan, plan.tasks[key[2]]))
+            return result
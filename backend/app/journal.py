@@ -0,0 +1,195 @@
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import zlib
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+
+# Every record is: payload length (uint32) + crc32 of payload (uint32) + JSON payload
+HEADER = struct.Struct(">II")
+
+JOURNAL_FILE = re.compile(r"^journal-(\d+)\.log$")
+SNAPSHOT_FILE = re.compile(r"^snapshot-(\d+)\.bin$")
+
+
+def encode_record(record: Any) -> bytes:
+    payload = json.dumps(record, separators=(",", ":"), default=str).encode()
+    return HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def iter_records(buffer) -> Iterator[Tuple[Any, int]]:
+    """
+    Yield (record, end offset) from a bytes-like buffer.
+    Stops quietly at a torn or corrupt record, which is what a crash
+    in the middle of a write leaves behind.
+    """
+    offset, size = 0, len(buffer)
+    while offset + HEADER.size <= size:
+        length, crc = HEADER.unpack_from(buffer, offset)
+        start, end = offset + HEADER.size, offset + HEADER.size + length
+        if end > size:
+            return
+        payload = buffer[start:end]
+        if zlib.crc32(payload) != crc:
+            return
+        yield json.loads(payload), end
+        offset = end
+
+
+def read_file(path: str) -> Iterator[Tuple[Any, int]]:
+    """iter_records over a memory-mapped file"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield from iter_records(mm)
+
+
+class Journal:
+    """
+    Append-only journal split into numbered segments, plus snapshots.
+
+    append() only queues the encoded record; a writer thread writes whatever
+    has queued up and fsyncs once for the whole batch (group commit), so a
+    burst of mutations costs one fsync. Records are durable within one
+    commit cycle of being appended.
+
+    compact() starts a new segment and writes a snapshot numbered like it, so
+    recovery is: latest snapshot, then every segment from that number on.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Condition(threading.Lock())
+        self._io_lock = threading.Lock()
+        self._pending: List[bytes] = []
+        self._closed = False
+        self.commits = 0
+        self.records = 0
+        self.segment_bytes = 0
+        self._segment = 0
+        self._file = None
+        self._writer: Optional[threading.Thread] = None
+
+    def _path(self, kind: str, number: int) -> str:
+        suffix = "log" if kind == "journal" else "bin"
+        return os.path.join(self.directory, f"{kind}-{number:08d}.{suffix}")
+
+    def _numbers(self, pattern) -> List[int]:
+        return sorted(int(m.group(1)) for m in (pattern.match(name) for name in os.listdir(self.directory)) if m)
+
+    def recover(self) -> Iterator[Tuple[Any, int]]:
+        """
+        Yield (record, encoded size) from the snapshot, then the journal, in order.
+        A torn tail is cut off so new appends start on a clean boundary.
+        """
+        snapshots = self._numbers(SNAPSHOT_FILE)
+        base = snapshots[-1] if snapshots else 0
+        if snapshots:
+            end = 0
+            for record, offset in read_file(self._path("snapshot", base)):
+                yield record, offset - end
+                end = offset
+
+        segments = [n for n in self._numbers(JOURNAL_FILE) if n >= base]
+        for number in segments:
+            path = self._path("journal", number)
+            end = 0
+            for record, offset in read_file(path):
+                yield record, offset - end
+                end = offset
+            if end < os.path.getsize(path):
+                with open(path, "r+b") as f:
+                    f.truncate(end)
+        self._segment = segments[-1] if segments else base
+
+    def open(self):
+        """Start appending to the newest segment (call after recover())"""
+        path = self._path("journal", self._segment)
+        self._file = open(path, "ab")
+        self.segment_bytes = self._file.tell()
+        self._writer = threading.Thread(target=self._write_loop, name="journal-writer", daemon=True)
+        self._writer.start()
+
+    def append(self, record: Any):
+        data = encode_record(record)
+        with self._lock:
+            self._pending.append(data)
+            if len(self._pending) == 1:
+                self._lock.notify()
+
+    def _write_loop(self):
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._lock.wait()
+                if self._closed and not self._pending:
+                    return
+            self._commit()
+
+    def _commit(self):
+        with self._io_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            data = b"".join(batch)
+            self._file.write(data)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.segment_bytes += len(data)
+            self.commits += 1
+            self.records += len(batch)
+
+    def compact(self, capture: Callable[[], Iterable[Any]]):
+        """
+        Rotate to a new segment and write a snapshot of the state returned by
+        capture(). capture() runs just after the rotation and should only
+        collect references; the snapshot is serialized afterwards. Callers
+        mutate state before journaling it, so everything in the old segments
+        is in the capture; records that race with the rotation may be in both,
+        so replay must be idempotent.
+        """
+        with self._io_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                number = self._segment + 1
+            if batch:
+                self._file.write(b"".join(batch))
+                self.records += len(batch)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._segment = number
+            self._file = open(self._path("journal", number), "ab")
+            self.segment_bytes = 0
+            records = capture()
+
+        tmp = self._path("snapshot", number) + ".tmp"
+        with open(tmp, "wb") as f:
+            for record in records:
+                f.write(encode_record(record))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._path("snapshot", number))
+
+        for old in self._numbers(SNAPSHOT_FILE):
+            if old < number:
+                os.remove(self._path("snapshot", old))
+        for old in self._numbers(JOURNAL_FILE):
+            if old < number:
+                os.remove(self._path("journal", old))
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._lock.notify()
+        if self._writer:
+            self._writer.join(timeout=5)
+        self._commit()
+        if self._file:
+            self._file.close()
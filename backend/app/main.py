@@ -4,9 +4,12 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from dotenv import load_dotenv
+import asyncio
 import os
 
-from .routers import chat_router, generate_router, export_router
+from .services.dispatch import shutdown_executor
+from .storage import run_sweeper, close_storage
+from .routers import chat_router, generate_router, export_router, simulate_router, scenarios_router, portfolio_router, stats_router, history_router, listing_router, sync_router, ws_router, imports_router
 
 # Load environment variables
 load_dotenv()
@@ -32,8 +35,8 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
-    allow_methods=["GET", "POST"],
-    allow_headers=["Content-Type", "Accept"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE"],
+    allow_headers=["Content-Type", "Accept", "Last-Event-ID", "Idempotency-Key"],
     max_age=3600,
 )
 
@@ -41,6 +44,15 @@ app.add_middleware(
 app.include_router(chat_router)
 app.include_router(generate_router)
 app.include_router(export_router)
+app.include_router(simulate_router)
+app.include_router(scenarios_router)
+app.include_router(portfolio_router)
+app.include_router(stats_router)
+app.include_router(history_router)
+app.include_router(listing_router)
+app.include_router(sync_router)
+app.include_router(ws_router)
+app.include_router(imports_router)
 
 
 @app.get("/")
@@ -69,9 +81,15 @@ async def startup_event():
         print("⚠️  WARNING: LLM_API_KEY not set in environment")
     else:
         print(f" LLM configured: {llm_base_url}")
+    
+    # Evict idle sessions and plans in the background
+    app.state.sweeper = asyncio.create_task(run_sweeper())
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Shutdown event handler"""
     print("👋 PLAN API shutting down...")
+    app.state.sweeper.cancel()
+    shutdown_executor()
+    close_storage()
@@ -1,3 +1,3 @@
-from .schemas import ChatRequest, ChatResponse, GenerateReportRequest, GenerateReportResponse, Task, GanttItem
+from .schemas import ChatRequest, ChatResponse, GenerateReportRequest, GenerateReportResponse, ImportResponse, Task, GanttItem, SimulationRequest, SimulationResponse, TaskRisk, Scenario, ScenarioRequest, ScenarioResponse, PortfolioRequest, PortfolioPlanUpdate, PortfolioResponse, PlanHistoryResponse, PlanDiffResponse, SessionPage, PlanPage, OwnerTaskPage, TaskPatchRequest, TaskChangesResponse
 
-__all__ = ["ChatRequest", "ChatResponse", "GenerateReportRequest", "GenerateReportResponse", "Task", "GanttItem"]
+__all__ = ["ChatRequest", "ChatResponse", "GenerateReportRequest", "GenerateReportResponse", "ImportResponse", "Task", "GanttItem", "SimulationRequest", "SimulationResponse", "TaskRisk", "Scenario", "ScenarioRequest", "ScenarioResponse", "PortfolioRequest", "PortfolioPlanUpdate", "PortfolioResponse", "PlanHistoryResponse", "PlanDiffResponse", "SessionPage", "PlanPage", "OwnerTaskPage", "TaskPatchRequest", "TaskChangesResponse"]
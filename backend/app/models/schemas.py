@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 
 
@@ -7,6 +7,7 @@ class ChatRequest(BaseModel):
     session_id: Optional[str] = None
     text: str = Field(..., min_length=1, max_length=10000)
     current_tasks: Optional[List[dict]] = None  # Current table state with manual edits
+    base_version: Optional[int] = None  # Task table version the client holds; modify the server's tasks and reply with changes only
 
 
 class Task(BaseModel):
@@ -20,18 +21,49 @@ class Task(BaseModel):
     actual_start: Optional[str] = None  # Actual start (from Kanban)
     actual_end: Optional[str] = None    # Actual end (from Kanban)
     status: Optional[str] = "todo"  # todo, in-progress, done
+    optimistic_days: Optional[float] = None   # Three-point estimate for risk simulation
+    likely_days: Optional[float] = None       # Defaults to duration_days
+    pessimistic_days: Optional[float] = None
+
+
+class DateRange(BaseModel):
+    start_date: str
+    end_date: str  # Inclusive
+
+
+class OwnerAvailability(BaseModel):
+    time_off: List[DateRange] = Field(default_factory=list)
+    capacity: float = Field(1.0, gt=0, le=1)  # Share of a working day (0.5 = half-time)
+    working_days: Optional[List[int]] = None  # Overrides the plan's working week
+
+
+class CalendarSpec(BaseModel):
+    region: Optional[str] = None  # Built-in holiday set: US, UK, IN, DE, FR
+    working_days: List[int] = Field(default_factory=lambda: [0, 1, 2, 3, 4])  # Monday=0
+    holidays: List[str] = Field(default_factory=list)  # Extra non-working dates
+    owners: Dict[str, OwnerAvailability] = Field(default_factory=dict)
+
+
+class TaskChanges(BaseModel):
+    version: int
+    full: bool = False  # True when tasks is the whole table (the client was too far behind)
+    tasks: List[dict]  # Tasks added or changed after the requested version
+    deleted: List[str] = Field(default_factory=list)
 
 
 class ChatResponse(BaseModel):
     session_id: str
-    entities: dict
+    entities: dict  # Without "tasks" when the request had base_version; see changes
     message: str = "Message processed"
+    version: Optional[int] = None  # Task table version after this turn
+    changes: Optional[TaskChanges] = None
 
 
 class GenerateReportRequest(BaseModel):
     session_id: str
     start_date: Optional[str] = None
     tasks: Optional[List[dict]] = None  # Optional: use these tasks instead of session tasks
+    calendar: Optional[CalendarSpec] = None  # Defaults to Monday-Friday, no holidays
 
 
 class GenerateReportResponse(BaseModel):
@@ -40,6 +72,12 @@ class GenerateReportResponse(BaseModel):
     tasks: List[Task]
     start_date: str
     end_date: str
+    version: Optional[int] = None  # Position in the session's plan history
+
+
+class ImportResponse(GenerateReportResponse):
+    session_id: str
+    imported: int  # Tasks read from the file
 
 
 class GanttItem(BaseModel):
@@ -48,3 +86,214 @@ class GanttItem(BaseModel):
     start: str
     end: str
     group: str = "Unassigned"
+    # Aggregated (?zoom=week|month) bars only
+    task_count: Optional[int] = None
+
+
+class SimulationRequest(BaseModel):
+    iterations: int = Field(10000, ge=100, le=100000)
+    seed: Optional[int] = None  # Fix for reproducible results
+
+
+class TaskRisk(BaseModel):
+    id: str
+    title: str
+    p50: str
+    p80: str
+    p95: str
+    criticality: float  # Share of runs where the task was on the critical path
+
+
+class SimulationResponse(BaseModel):
+    plan_id: str
+    iterations: int
+    planned_end_date: str
+    on_time_probability: float  # Share of runs finishing by planned_end_date
+    p50: str
+    p80: str
+    p95: str
+    tasks: List[TaskRisk]
+
+
+class OwnerAbsence(BaseModel):
+    owner: str
+    start_date: str
+    end_date: str  # Inclusive
+
+
+class Scenario(BaseModel):
+    name: str
+    start_date: Optional[str] = None  # Defaults to the base plan start
+    duration_changes: Dict[str, int] = Field(default_factory=dict)  # task_id -> days added (negative shortens)
+    absences: List[OwnerAbsence] = Field(default_factory=list)
+
+
+class ScenarioRequest(BaseModel):
+    plan_id: Optional[str] = None  # Base plan; or pass tasks + start_date directly
+    tasks: Optional[List[Task]] = None
+    start_date: Optional[str] = None
+    calendar: Optional[CalendarSpec] = None  # Used with tasks; plans keep their own calendar
+    scenarios: List[Scenario] = Field(..., min_length=1, max_length=50)
+
+
+class TaskDelta(BaseModel):
+    id: str
+    start_date: str
+    end_date: str
+    start_shift: int  # Working days relative to the base plan
+    end_shift: int
+
+
+class ScenarioResult(BaseModel):
+    name: str
+    end_date: str
+    end_shift: int
+    changed_tasks: List[TaskDelta]
+
+
+class ScenarioResponse(BaseModel):
+    start_date: str
+    end_date: str
+    scenarios: List[ScenarioResult]
+
+
+class PortfolioPlanRef(BaseModel):
+    plan_id: str
+    priority: int = 0  # Higher priority plans claim shared owners first
+
+
+class PortfolioRequest(BaseModel):
+    plans: List[PortfolioPlanRef] = Field(..., min_length=1)
+
+
+class PortfolioPlanUpdate(BaseModel):
+    priority: int = 0
+    replaces: Optional[str] = None  # Plan id this plan supersedes in the portfolio
+
+
+class LeveledTask(BaseModel):
+    id: str
+    title: str
+    owner: Optional[str] = None
+    start_date: str
+    end_date: str
+
+
+class LeveledPlan(BaseModel):
+    plan_id: str
+    project_name: str
+    priority: int
+    start_date: str
+    end_date: str
+    original_end_date: str  # End date when the plan is scheduled alone
+    tasks: List[LeveledTask]
+
+
+class PortfolioResponse(BaseModel):
+    portfolio_id: str
+    plans: List[LeveledPlan]
+    rescheduled: List[str] = Field(default_factory=list)  # Plans re-levelled by this request
+
+
+class PlanVersionInfo(BaseModel):
+    version: int
+    plan_id: str
+    created_at: str
+    start_date: str
+    end_date: str
+    task_count: int
+
+
+class PlanHistoryResponse(BaseModel):
+    session_id: str
+    versions: List[PlanVersionInfo]
+
+
+class TaskMove(BaseModel):
+    id: str
+    title: str
+    old_start_date: Optional[str] = None
+    old_end_date: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    start_shift: Optional[int] = None  # Calendar days
+    end_shift: Optional[int] = None
+
+
+class TaskUpdate(BaseModel):
+    id: str
+    changes: Dict[str, Any]  # Changed fields other than dates, with their new values
+
+
+class PlanDiffResponse(BaseModel):
+    session_id: str
+    from_version: int
+    to_version: int
+    added: List[Task]
+    removed: List[Task]
+    moved: List[TaskMove]
+    updated: List[TaskUpdate]
+
+
+class SessionSummary(BaseModel):
+    session_id: str
+    created_at: str
+
+
+class PlanSummary(BaseModel):
+    plan_id: str
+    session_id: Optional[str] = None
+    project_name: str
+    start_date: str
+    end_date: str
+    created_at: str
+    task_count: int
+
+
+class OwnerTask(BaseModel):
+    plan_id: str
+    project_name: str
+    task: Task
+
+
+class SessionPage(BaseModel):
+    items: List[SessionSummary]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= for the next page; None on the last page
+
+
+class PlanPage(BaseModel):
+    items: List[PlanSummary]
+    next_cursor: Optional[str] = None
+
+
+class OwnerTaskPage(BaseModel):
+    items: List[OwnerTask]
+    next_cursor: Optional[str] = None
+
+
+class TaskFieldUpdate(BaseModel):
+    """Task id plus only the fields to change (unset fields are left alone)"""
+    id: str
+    title: Optional[str] = None
+    duration_days: Optional[int] = None
+    owner: Optional[str] = None
+    dependencies: Optional[List[str]] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    actual_start: Optional[str] = None
+    actual_end: Optional[str] = None
+    status: Optional[str] = None
+    optimistic_days: Optional[float] = None
+    likely_days: Optional[float] = None
+    pessimistic_days: Optional[float] = None
+
+
+class TaskPatchRequest(BaseModel):
+    base_version: int
+    add: List[Task] = Field(default_factory=list)
+    update: List[TaskFieldUpdate] = Field(default_factory=list)
+    delete: List[str] = Field(default_factory=list)
+
+
+class TaskChangesResponse(TaskChanges):
+    session_id: str
@@ -0,0 +1,313 @@
+import hashlib
+import json
+import os
+import sys
+import time
+from array import array
+from typing import Dict, Iterator, List, Optional, Any, Callable, Tuple
+from datetime import datetime
+from .models.schemas import Task, CalendarSpec
+
+
+# Rough per-object overheads used for byte accounting (CPython, 64-bit)
+SESSION_OVERHEAD = 600
+MESSAGE_OVERHEAD = 60
+PLAN_OVERHEAD = 600
+TASK_OVERHEAD = 150
+
+# Deleted task ids remembered per session; clients further behind get a full resync
+SYNC_TOMBSTONES = int(os.getenv("SYNC_TOMBSTONES", "1000"))
+# Key under which a session's TaskVersions are stored with its entities
+SYNC_KEY = "_sync"
+
+# Listener signature: (event, session, payload) with event "message" or "entities"
+SessionListener = Callable[[str, "Session", Any], None]
+
+# Roles are stored as one byte per message; new roles get the next code
+ROLES: List[str] = ["user", "assistant", "system"]
+_ROLE_CODES: Dict[str, int] = {role: code for code, role in enumerate(ROLES)}
+
+
+def _role_code(role: str) -> int:
+    code = _ROLE_CODES.get(role)
+    if code is None:
+        if len(ROLES) >= 256:
+            raise ValueError(f"Too many distinct message roles to store '{role}'")
+        code = _ROLE_CODES[role] = len(ROLES)
+        ROLES.append(sys.intern(role))
+    return code
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else value
+
+
+def _task_digest(task: Dict[str, Any]) -> str:
+    return hashlib.blake2b(json.dumps(task, sort_keys=True, separators=(",", ":"), default=str).encode(), digest_size=8).hexdigest()
+
+
+class TaskVersions:
+    """
+    Version counter for a session's task table.
+
+    Every update_entities that changes the tasks bumps the version once;
+    each task records the version that last changed it with a digest of its
+    content, and deleted ids are kept as tombstones. It is stored with the
+    entities (under SYNC_KEY), so every worker sees the same versions.
+    """
+
+    __slots__ = ("version", "horizon", "tasks", "tombstones")
+
+    def __init__(self, version: Optional[int] = None, horizon: Optional[int] = None, tasks: Optional[Dict[str, List]] = None, tombstones: Optional[Dict[str, int]] = None):
+        # Counting starts from the clock, so versions rebuilt for a session
+        # stored without them are never below one a client may already hold
+        self.version = int(time.time() * 1000) if version is None else version
+        # Clients below this version may have missed a dropped tombstone
+        self.horizon = self.version if horizon is None else horizon
+        self.tasks: Dict[str, List] = tasks or {}  # id -> [version, digest]
+        self.tombstones: Dict[str, int] = tombstones or {}  # id -> version, oldest first
+
+    def observe(self, tasks: Optional[List[Dict[str, Any]]], tombstone_limit: int = SYNC_TOMBSTONES) -> bool:
+        """Bump the version if the tasks differ from the last ones observed; True if they did"""
+        current = {task["id"]: _task_digest(task) for task in tasks or [] if task.get("id")}
+        changed = [task_id for task_id, digest in current.items() if task_id not in self.tasks or self.tasks[task_id][1] != digest]
+        removed = [task_id for task_id in self.tasks if task_id not in current]
+        if not changed and not removed:
+            return False
+        self.version += 1
+        for task_id in changed:
+            self.tasks[task_id] = [self.version, current[task_id]]
+            self.tombstones.pop(task_id, None)
+        for task_id in removed:
+            del self.tasks[task_id]
+            self.tombstones[task_id] = self.version
+        while len(self.tombstones) > tombstone_limit:
+            dropped = self.tombstones.pop(next(iter(self.tombstones)))
+            self.horizon = max(self.horizon, dropped)
+        return True
+
+    def changed_since(self, task_id: str, since: int) -> bool:
+        entry = self.tasks.get(task_id)
+        return (entry[0] if entry else self.tombstones.get(task_id, 0)) > since
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Copies: observe() updates the dicts in place
+        return {"version": self.version, "horizon": self.horizon, "tasks": dict(self.tasks), "tombstones": dict(self.tombstones)}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "TaskVersions":
+        return cls(state["version"], state["horizon"], state["tasks"], state["tombstones"])
+
+
+class Session:
+    """
+    Chat session: messages plus the entities extracted from them.
+    Messages are kept as a byte array of role codes and a list of contents;
+    the list-of-dicts shape is only built when `messages` is read.
+    """
+
+    __slots__ = ("id", "_roles", "_contents", "entities", "task_versions", "created_at", "approx_bytes", "_entities_bytes", "_listener")
+
+    def __init__(self, session_id: str, created_at: Optional[datetime] = None):
+        self.id = session_id
+        self._roles = array("B")
+        self._contents: List[str] = []
+        self.entities: Dict = {"project_name": None, "tasks": []}
+        self.task_versions = TaskVersions()
+        self.created_at = created_at or datetime.utcnow()
+        self.approx_bytes = SESSION_OVERHEAD
+        self._entities_bytes = 0
+        self._listener: Optional[SessionListener] = None
+
+    @property
+    def messages(self) -> List[Dict[str, str]]:
+        """Messages as [{"role": ..., "content": ...}] (a fresh list on every read)"""
+        return [{"role": ROLES[code], "content": content} for code, content in zip(self._roles, self._contents)]
+
+    @property
+    def message_count(self) -> int:
+        return len(self._contents)
+
+    def iter_messages(self, count: Optional[int] = None) -> Iterator[Tuple[str, str]]:
+        """(role, content) pairs, optionally only the first `count`"""
+        count = len(self._contents) if count is None else count
+        for i in range(count):
+            yield ROLES[self._roles[i]], self._contents[i]
+
+    def append_message(self, text: str, role: str = "user"):
+        """Add a message to the session"""
+        self._roles.append(_role_code(role))
+        self._contents.append(text)
+        self.approx_bytes += MESSAGE_OVERHEAD + len(text)
+        if self._listener:
+            self._listener("message", self, {"role": role, "content": text})
+
+    def update_entities(self, entities: Dict):
+        """Update extracted entities; the listener gets them with the task versions (stored_entities())"""
+        self.entities = entities
+        self.task_versions.observe(entities.get("tasks"))
+        stored = self.stored_entities()
+        size = len(json.dumps(stored, default=str))
+        self.approx_bytes += size - self._entities_bytes
+        self._entities_bytes = size
+        if self._listener:
+            self._listener("entities", self, stored)
+
+    def stored_entities(self) -> Dict:
+        """Entities as backends store them: with the task versions under SYNC_KEY"""
+        return {**self.entities, SYNC_KEY: self.task_versions.to_dict()}
+
+    def to_dict(self):
+        """Convert session to dictionary"""
+        return {
+            "id": self.id,
+            "messages": self.messages,
+            "entities": self.entities,
+            "created_at": self.created_at.isoformat()
+        }
+
+    @classmethod
+    def from_state(cls, session_id: str, created_at: str, messages: List[Dict[str, str]], entities: Dict, entities_bytes: Optional[int] = None) -> "Session":
+        """
+        Rebuild a session loaded from a persistent backend, from entities as
+        stored_entities() returned them. entities_bytes skips re-serializing
+        the entities when the caller already knows their encoded size.
+        """
+        session = cls(session_id, datetime.fromisoformat(created_at))
+        session._roles = array("B", [_role_code(m["role"]) for m in messages])
+        session._contents = [m["content"] for m in messages]
+        session.approx_bytes += sum(MESSAGE_OVERHEAD + len(content) for content in session._contents)
+        versions = entities.get(SYNC_KEY)
+        if versions is None:
+            # Stored before task versions were kept with the session
+            session.task_versions.observe(entities.get("tasks"))
+        else:
+            entities = {key: value for key, value in entities.items() if key != SYNC_KEY}
+            session.task_versions = TaskVersions.from_dict(versions)
+        session.entities = entities
+        session._entities_bytes = len(json.dumps(entities, default=str)) if entities_bytes is None else entities_bytes
+        session.approx_bytes += session._entities_bytes
+        return session
+
+
+TASK_FIELDS: Tuple[str, ...] = tuple(Task.model_fields)
+_TASK_DEFAULTS = {name: field.get_default(call_default_factory=True) for name, field in Task.model_fields.items() if not field.is_required()}
+# Strings that repeat across tasks and plans (people, statuses, dates)
+_INTERNED_FIELDS = ("owner", "status", "start_date", "end_date", "actual_start", "actual_end")
+
+
+class PlanTask:
+    """
+    Slotted copy of a scheduled Task.
+    Has the same attributes as Task (dependencies as a tuple), with repeated
+    strings interned; to_task() builds the pydantic model when one is needed.
+    """
+
+    __slots__ = TASK_FIELDS
+
+    def __init__(self, values: Dict[str, Any]):
+        for name in TASK_FIELDS:
+            setattr(self, name, values[name] if name in values else _TASK_DEFAULTS[name])
+        self.id = sys.intern(self.id)
+        for name in _INTERNED_FIELDS:
+            setattr(self, name, _intern(getattr(self, name)))
+        self.dependencies = tuple(sys.intern(dep) for dep in self.dependencies)
+
+    @classmethod
+    def from_task(cls, task) -> "PlanTask":
+        if isinstance(task, cls):
+            return task
+        if isinstance(task, dict):
+            return cls(task)
+        return cls({name: getattr(task, name) for name in TASK_FIELDS})
+
+    def astuple(self) -> Tuple[Any, ...]:
+        """Field values in TASK_FIELDS order, for cheap equality checks"""
+        return tuple(getattr(self, name) for name in TASK_FIELDS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        values = {name: getattr(self, name) for name in TASK_FIELDS}
+        values["dependencies"] = list(self.dependencies)
+        return values
+
+    model_dump = to_dict
+
+    def to_task(self) -> Task:
+        return Task.model_construct(**self.to_dict())
+
+
+class Plan:
+    """Stored plan/report"""
+
+    __slots__ = ("id", "project_name", "tasks", "start_date", "end_date", "calendar", "created_at", "session_id", "approx_bytes", "_etag")
+
+    def __init__(self, plan_id: str, project_name: str, tasks: List, start_date: str, end_date: str, calendar: Optional[CalendarSpec] = None, created_at: Optional[datetime] = None, session_id: Optional[str] = None):
+        self.id = plan_id
+        self.project_name = project_name
+        # Task, dict or PlanTask in; PlanTask stored
+        self.tasks: Tuple[PlanTask, ...] = tuple(PlanTask.from_task(task) for task in tasks)
+        self.start_date = start_date
+        self.end_date = end_date
+        self.calendar = calendar
+        self.created_at = created_at or datetime.utcnow()
+        self.session_id = session_id  # Session the plan was generated for
+        self.approx_bytes = PLAN_OVERHEAD + sum(
+            TASK_OVERHEAD + len(task.title) + 8 * len(task.dependencies)
+            for task in self.tasks
+        )
+        self._etag: Optional[str] = None
+
+    @property
+    def etag(self) -> str:
+        """
+        Hash of the plan's content. Plans never change once stored, so it is
+        computed once; it depends only on the content, so every worker (and
+        a plan reloaded from the store) gets the same value.
+        """
+        if self._etag is None:
+            canonical = json.dumps(self.to_dict(), sort_keys=True, separators=(",", ":"), default=str)
+            self._etag = hashlib.sha256(canonical.encode()).hexdigest()[:32]
+        return self._etag
+
+    def task_models(self) -> List[Task]:
+        """Tasks as pydantic models, for response schemas"""
+        return [task.to_task() for task in self.tasks]
+
+    def to_dict(self):
+        """Convert plan to dictionary"""
+        return {
+            "plan_id": self.id,
+            "project_name": self.project_name,
+            "tasks": [task.to_dict() for task in self.tasks],
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "calendar": self.calendar.model_dump() if self.calendar else None,
+            "created_at": self.created_at.isoformat(),
+            "session_id": self.session_id
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """Listing fields, without the tasks"""
+        return {
+            "plan_id": self.id,
+            "session_id": self.session_id,
+            "project_name": self.project_name,
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "created_at": self.created_at.isoformat(),
+            "task_count": len(self.tasks)
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "Plan":
+        """Rebuild a plan from to_dict() output without re-validating the tasks"""
+        return cls(
+            state["plan_id"],
+            state["project_name"],
+            state["tasks"],
+            state["start_date"],
+            state["end_date"],
+            CalendarSpec(**state["calendar"]) if state.get("calendar") else None,
+            datetime.fromisoformat(state["created_at"]),
+            state.get("session_id"),
+        )
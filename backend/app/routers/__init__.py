@@ -1,5 +1,14 @@
 from .chat import router as chat_router
 from .generate import router as generate_router
 from .export import router as export_router
+from .simulate import router as simulate_router
+from .scenarios import router as scenarios_router
+from .portfolio import router as portfolio_router
+from .stats import router as stats_router
+from .history import router as history_router
+from .listing import router as listing_router
+from .sync import router as sync_router
+from .ws import router as ws_router
+from .imports import router as imports_router
 
-__all__ = ["chat_router", "generate_router", "export_router"]
+__all__ = ["chat_router", "generate_router", "export_router", "simulate_router", "scenarios_router", "portfolio_router", "stats_router", "history_router", "listing_router", "sync_router", "ws_router", "imports_router"]
@@ -1,48 +1,156 @@
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Header, HTTPException, Request
 from fastapi.responses import StreamingResponse, Response
 from ..models.schemas import ChatRequest, ChatResponse
 from ..storage import get_session
 from ..services.parser import extract_entities_from_messages, merge_entities
+from ..services.coordinator import session_coordinator, SessionBusyError
+from ..services.sync import task_sync
+from ..services.sse import SSEWriter
+from ..services.replay import session_stream, find_stream, StreamGone
+from ..services.cancellation import cancel_on_disconnect, ClientDisconnected
+from ..services.push import push_hub
+from ..services.idempotency import idempotency_cache
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
 import json
 
 router = APIRouter(prefix="/api", tags=["chat"])
 
 
+async def _extract(session_id: str) -> Tuple[Dict, Dict]:
+    """
+    Extract entities from all of the session's messages and merge them in.
+    Returns (LLM output, session entities after the merge).
+    Runs coalesced, so it reloads the session to see every queued message.
+    """
+    session = get_session(session_id)
+    new_entities = await extract_entities_from_messages(session.messages)
+    
+    print(f"[DEBUG] AI Response: {new_entities}")
+    print(f"[DEBUG] Has clarification_needed: {new_entities.get('clarification_needed')}")
+    print(f"[DEBUG] AI Message: {new_entities.get('message')}")
+    
+    # Clarification requests leave the entities unchanged
+    if new_entities.get("clarification_needed"):
+        return new_entities, session.entities
+    
+    # Check for extraction errors
+    if "error" in new_entities:
+        print(f"Warning: Entity extraction had issues: {new_entities.get('error')}")
+        new_entities.pop("error", None)
+        new_entities.pop("raw_content", None)
+    
+    # Merge with existing entities
+    merged_entities = merge_entities(session.entities, new_entities)
+    session.update_entities(merged_entities)
+    push_hub.publish(session_id, "changes")
+    return new_entities, merged_entities
+
+
+async def _modify(session_id: str, current_tasks: Optional[List], text: str) -> Dict:
+    """Apply a modification request to the client's current tasks (None: the session's own tasks)"""
+    from ..services.parser import modify_tasks
+    
+    session = get_session(session_id)
+    if current_tasks is None:
+        current_tasks = session.entities.get("tasks") or []
+    new_entities = await modify_tasks(current_tasks, text, session.entities.get("project_name"))
+    session.update_entities(new_entities)
+    push_hub.publish(session_id, "changes")
+    return new_entities
+
+
+async def _reply(session, request: ChatRequest) -> Tuple[str, Dict]:
+    """Run one chat turn whose message is already stored; returns (reply text, entities)"""
+    # Check if modification or initial extraction
+    if _wants_modify(request, session):
+        # Modification request
+        new_entities = await session_coordinator.run(
+            session.id, lambda: _modify(session.id, request.current_tasks or None, request.text)
+        )
+        return new_entities.get("message", "Tasks updated!"), new_entities
+    
+    # Initial extraction (coalesced with other queued messages)
+    new_entities, entities = await session_coordinator.run(
+        session.id, lambda: _extract(session.id), coalesce=True
+    )
+    if new_entities.get("clarification_needed"):
+        return new_entities.get("message", "I need more information."), entities
+    return new_entities.get("message", "I'm ready to help!"), entities
+
+
+def _wants_modify(request: ChatRequest, session) -> bool:
+    """Modify existing tasks rather than extract: the client sent its table, or refers to the server's by version"""
+    if request.current_tasks:
+        return True
+    return request.base_version is not None and bool(session.entities.get("tasks"))
+
+
+def _sync_fields(session_id: str, entities: Dict, base_version: Optional[int]) -> Dict[str, Any]:
+    """
+    Entities plus the task table version. Clients that sent base_version get
+    the tasks that changed since then instead of the whole table.
+    """
+    sync, version = task_sync(get_session(session_id))
+    if base_version is None:
+        return {"entities": entities, "version": version}
+    return {
+        "entities": {key: value for key, value in entities.items() if key != "tasks"},
+        "version": version,
+        "changes": sync.changes(base_version),
+    }
+
+
+def _entities_event(session_id: str, entities: Dict, base_version: Optional[int]) -> Dict[str, Any]:
+    fields = _sync_fields(session_id, entities, base_version)
+    event = {"type": "entities", "data": fields.pop("entities"), "session_id": session_id}
+    event.update(fields)
+    return event
+
+
 @router.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, raw_request: Request, idempotency_key: Optional[str] = Header(None)):
     """
     Accept chat message, store it, and extract project entities using LLM.
     If current_tasks are provided, modify them instead of re-extracting.
+    If the client disconnects first, the LLM call is cancelled (499).
+    With an Idempotency-Key, a retried request gets the first one's response
+    instead of storing the message again; such requests are not cancelled.
     """
+    if idempotency_key is not None:
+        return await idempotency_cache.respond("chat", request.session_id, idempotency_key, request, lambda: _chat(request, None))
+    return await _chat(request, raw_request)
+
+
+async def _chat(request: ChatRequest, raw_request: Optional[Request]) -> ChatResponse:
+    """The chat turn behind /api/chat; cancelled on disconnect when raw_request is given"""
+    def guard(work):
+        return cancel_on_disconnect(raw_request, work) if raw_request is not None else work
+    
     try:
         # Get or create session
         session = get_session(request.session_id)
         
+        # Turn the request away before storing its message if the session is swamped
+        session_coordinator.check(session.id)
+        
         # Append user message
         session.append_message(request.text)
         
-        # Determine if this is a modification request or initial extraction
-        if request.current_tasks is not None and len(request.current_tasks) > 0:
+        # Determine if this is a modification request or initial extraction.
+        # LLM work is serialized per session; extractions that queue up behind
+        # a running one are merged into a single follow-up call.
+        if _wants_modify(request, session):
             # This is a modification request - preserve manual edits
-            from ..services.parser import modify_tasks
-            
-            current_project_name = session.entities.get("project_name")
-            new_entities = await modify_tasks(
-                request.current_tasks,
-                request.text,
-                current_project_name
-            )
-            
-            # Update session with modified entities
-            session.update_entities(new_entities)
+            new_entities = await guard(session_coordinator.run(
+                session.id, lambda: _modify(session.id, request.current_tasks or None, request.text)
+            ))
             merged_entities = new_entities
         else:
             # This is initial extraction or no tasks exist yet
-            new_entities = await extract_entities_from_messages(session.messages)
-            
-            print(f"[DEBUG] AI Response: {new_entities}")
-            print(f"[DEBUG] Has clarification_needed: {new_entities.get('clarification_needed')}")
-            print(f"[DEBUG] AI Message: {new_entities.get('message')}")
+            new_entities, merged_entities = await guard(session_coordinator.run(
+                session.id, lambda: _extract(session.id), coalesce=True
+            ))
             
             # Check if AI needs clarification
             if new_entities.get("clarification_needed"):
@@ -51,19 +159,9 @@ async def chat(request: ChatRequest):
                 print(f"[DEBUG] Returning clarification: {clarification_message}")
                 return ChatResponse(
                     session_id=session.id,
-                    entities=session.entities,  # Return existing entities, don't change them
-                    message=clarification_message
+                    message=clarification_message,
+                    **_sync_fields(session.id, merged_entities, request.base_version)  # Existing entities, unchanged
                 )
-            
-            # Check for extraction errors
-            if "error" in new_entities:
-                print(f"Warning: Entity extraction had issues: {new_entities.get('error')}")
-                new_entities.pop("error", None)
-                new_entities.pop("raw_content", None)
-            
-            # Merge with existing entities
-            merged_entities = merge_entities(session.entities, new_entities)
-            session.update_entities(merged_entities)
         
         #  ALWAYS use the AI's message - NO hardcoded messages!
         # The AI provides context-aware messages for all scenarios:
@@ -74,10 +172,15 @@ async def chat(request: ChatRequest):
         
         return ChatResponse(
             session_id=session.id,
-            entities=merged_entities,
-            message=message
+            message=message,
+            **_sync_fields(session.id, merged_entities, request.base_version)
         )
     
+    except SessionBusyError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ClientDisconnected as e:
+        # Nobody reads this; it keeps the access log honest (nginx's "client closed request")
+        raise HTTPException(status_code=499, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
 
@@ -90,93 +193,107 @@ async def chat_stream_options():
         headers={
             "Access-Control-Allow-Origin": "*",
             "Access-Control-Allow-Methods": "POST, OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type, Accept",
+            "Access-Control-Allow-Headers": "Content-Type, Accept, Last-Event-ID",
+        }
+    )
+
+
+def _sse_response(frames) -> StreamingResponse:
+    return StreamingResponse(
+        frames,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
         }
     )
 
 
+def _resume(session_id: str, last_event_id: str) -> StreamingResponse:
+    """Replay a reply after the given event id, then follow it live if it is still running"""
+    try:
+        after_id = int(last_event_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Last-Event-ID must be an event id")
+    stream = find_stream(session_id)
+    try:
+        if stream is None:
+            raise StreamGone(f"Event {after_id} is no longer available")
+        generation = stream.resume(after_id)
+    except StreamGone as e:
+        # The client has to send its message again
+        raise HTTPException(status_code=410, detail=str(e))
+    return _sse_response(stream.follow(generation, after_id))
+
+
 @router.post("/chat/stream")
-async def chat_stream(request: ChatRequest):
+async def chat_stream(request: ChatRequest, last_event_id: Optional[str] = Header(None)):
     """
     Streaming version of chat endpoint.
     Returns Server-Sent Events (SSE) for real-time streaming.
+    Every event has an id; repeating the request with a Last-Event-ID header
+    resumes that reply instead of sending the message again.
     """
+    if last_event_id is not None:
+        if not request.session_id:
+            raise HTTPException(status_code=400, detail="Resuming needs the session_id")
+        return _resume(request.session_id, last_event_id)
+    
     try:
         # Get or create session
         session = get_session(request.session_id)
         
+        # Turn the request away before storing its message if the session is swamped
+        session_coordinator.check(session.id)
+        
         # Append user message
         session.append_message(request.text)
         
-        async def generate():
+        # The reply is generated in the background into the session's replay
+        # buffer; this response (and any reconnect) follows the buffer
+        stream = session_stream(session.id)
+        generation = stream.start()
+        # Message text goes out in a few coalesced frames rather than one per character
+        writer = SSEWriter(
+            with_ids=True,
+            next_id=stream.next_id,
+            on_frame=lambda event_id, frame: stream.publish(generation, event_id, frame)
+        )
+        # Sent straight away, so a client that drops early still has an id to resume from
+        writer.event({'type': 'start', 'session_id': session.id})
+        
+        async def produce():
             try:
-                # For now, we'll extract entities first (non-streaming)
-                # Then stream the message response
-                from ..services.llm_client import LLMClient
-                from ..services.parser import ENTITY_EXTRACTION_PROMPT
-                
-                llm = LLMClient()
-                
-                # Check if modification or initial extraction
-                if request.current_tasks is not None and len(request.current_tasks) > 0:
-                    # Modification request
-                    from ..services.parser import modify_tasks
-                    current_project_name = session.entities.get("project_name")
-                    new_entities = await modify_tasks(
-                        request.current_tasks,
-                        request.text,
-                        current_project_name
-                    )
-                    session.update_entities(new_entities)
-                    message = new_entities.get("message", "Tasks updated!")
-                    
-                    # Stream the response
-                    for char in message:
-                        yield f"data: {json.dumps({'type': 'message', 'content': char})}\n\n"
-                    
-                    # Send final entities
-                    yield f"data: {json.dumps({'type': 'entities', 'data': new_entities, 'session_id': session.id})}\n\n"
-                    yield f"data: {json.dumps({'type': 'done'})}\n\n"
-                    
-                else:
-                    # Initial extraction
-                    new_entities = await extract_entities_from_messages(session.messages)
-                    
-                    # Check for clarification
-                    if new_entities.get("clarification_needed"):
-                        message = new_entities.get("message", "I need more information.")
-                        for char in message:
-                            yield f"data: {json.dumps({'type': 'message', 'content': char})}\n\n"
-                        yield f"data: {json.dumps({'type': 'entities', 'data': session.entities, 'session_id': session.id})}\n\n"
-                        yield f"data: {json.dumps({'type': 'done'})}\n\n"
-                    else:
-                        # Merge entities
-                        merged_entities = merge_entities(session.entities, new_entities)
-                        session.update_entities(merged_entities)
-                        
-                        # Stream message
-                        message = new_entities.get("message", "I'm ready to help!")
-                        for char in message:
-                            yield f"data: {json.dumps({'type': 'message', 'content': char})}\n\n"
-                        
-                        # Send final entities
-                        yield f"data: {json.dumps({'type': 'entities', 'data': merged_entities, 'session_id': session.id})}\n\n"
-                        yield f"data: {json.dumps({'type': 'done'})}\n\n"
-                
-                await llm.close()
+                message, entities = await _reply(session, request)
+                writer.message(message)
+                writer.event(_entities_event(session.id, entities, request.base_version))
+                writer.done()
                 
+            except asyncio.CancelledError:
+                # Abandoned; anyone resuming later sees why the reply stops here
+                writer.event({'type': 'error', 'message': 'Reply cancelled: the client disconnected'})
+                raise
             except Exception as e:
-                yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+                writer.event({'type': 'error', 'message': str(e)})
         
-        return StreamingResponse(
-            generate(),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no"
-            }
-        )
+        stream.run(generation, produce())
+        return _sse_response(stream.follow(generation))
     
+    except SessionBusyError as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing chat stream: {str(e)}")
+
+
+@router.get("/chat/stream/{session_id}")
+async def resume_chat_stream(session_id: str, last_event_id: Optional[str] = Header(None), from_id: Optional[str] = None):
+    """
+    Reconnect to a streamed reply: replays events after Last-Event-ID (or
+    ?from_id=, for clients that cannot set headers) and follows the reply
+    live if it is still being generated. 410 if those events are gone.
+    """
+    event_id = last_event_id if last_event_id is not None else from_id
+    if event_id is None:
+        raise HTTPException(status_code=400, detail="Last-Event-ID header or from_id is required")
+    return _resume(session_id, event_id)
@@ -1,86 +1,219 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import Response
-from typing import List
-import csv
-import io
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from functools import partial
+from typing import Callable, Dict, Iterator, List, Optional
+import hashlib
+import os
 from ..models.schemas import GanttItem
-from ..storage import get_plan
+from ..storage import get_plan, page_plans, Plan
+from ..services.plan_bodies import plan_bodies
+from ..services.exporters import csv_chunks, report_chunks, gantt_chunks, json_array_chunks, jsonl_chunks, ics_chunks, gzip_chunks, zip_chunks, tar_chunks, Member
+from ..services.gantt import gantt_indexes, parse_window
+from ..indexes import owner_key
 
 router = APIRouter(prefix="/api", tags=["export"])
 
+# Stored plans never change, so their representations can be cached for good
+PLAN_CACHE_CONTROL = os.getenv("PLAN_CACHE_CONTROL", "public, max-age=31536000, immutable")
+# Plans one bulk export may contain
+EXPORT_BULK_MAX_PLANS = int(os.getenv("EXPORT_BULK_MAX_PLANS", "1000"))
 
-@router.get("/gantt_data/{plan_id}", response_model=List[GanttItem])
-async def get_gantt_data(plan_id: str):
+# Bulk export member formats (also the file extension) and their renderers
+BULK_FORMATS = {"csv": csv_chunks, "json": report_chunks, "jsonl": jsonl_chunks, "ics": ics_chunks}
+ARCHIVES = {
+    "zip": ("application/zip", zip_chunks),
+    "tar": ("application/x-tar", tar_chunks),
+    "tar.gz": ("application/gzip", lambda members: gzip_chunks(tar_chunks(members))),
+}
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def _accepts_gzip(request: Request) -> bool:
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() == "gzip":
+            quality = params.strip().removeprefix("q=")
+            try:
+                return not params.strip() or float(quality) > 0
+            except ValueError:
+                return False
+    return False
+
+
+def _plan_response(request: Request, plan_id: str, kind: str, render: Callable[[Plan], Iterator[bytes]], media_type: str,
+                   headers: Optional[Dict[str, str]] = None, memoize: bool = True) -> Response:
     """
-    Return timeline items suitable for Gantt chart rendering.
+    A plan representation with a strong ETag (the plan's content hash),
+    gzip-encoded when the client accepts it. Matching If-None-Match gets
+    304 without a body. Otherwise the body is rendered once per plan and
+    served from memory afterwards, or streamed chunk by chunk for plans
+    too large to keep (or with memoize=False, for one-off views).
     """
     plan = get_plan(plan_id)
-    
+
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
-    
-    gantt_items = []
-    
-    for task in plan.tasks:
-        gantt_items.append(GanttItem(
-            id=task.id,
-            content=task.title,
-            start=task.start_date,
-            end=task.end_date,
-            group=task.owner or "Unassigned"
-        ))
-    
-    return gantt_items
+
+    gzipped = _accepts_gzip(request)
+    variant = f"{kind}-gzip" if gzipped else kind
+    cache_headers = {"ETag": f'"{plan.etag}-{variant}"', "Cache-Control": PLAN_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if _etag_matches(request.headers.get("if-none-match"), cache_headers["ETag"]):
+        return Response(status_code=304, headers=cache_headers)
+
+    headers = {**cache_headers, **(headers or {})}
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+
+    def chunks(plan: Plan) -> Iterator[bytes]:
+        return gzip_chunks(render(plan)) if gzipped else render(plan)
+
+    if memoize and plan_bodies.memoizable(plan):
+        body = plan_bodies.get(plan, variant, lambda plan: b"".join(chunks(plan)))
+        return Response(content=body, media_type=media_type, headers=headers)
+    return StreamingResponse(chunks(plan), media_type=media_type, headers=headers)
+
+
+@router.get("/gantt_data/{plan_id}", response_model=List[GanttItem])
+async def get_gantt_data(
+    plan_id: str,
+    request: Request,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    zoom: str = "task",
+):
+    """
+    Return timeline items suitable for Gantt chart rendering.
+
+    ?start=&end= (YYYY-MM-DD, end exclusive) limit the items to those
+    overlapping the window. ?zoom=week or ?zoom=month returns one bar per
+    owner and week or month instead of one item per task, with task_count.
+    """
+    if start is None and end is None and zoom == "task":
+        return _plan_response(request, plan_id, "gantt", gantt_chunks, "application/json")
+    try:
+        window = parse_window(zoom, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _plan_response(
+        request, plan_id, f"gantt-{zoom}-{start or ''}-{end or ''}",
+        lambda plan: json_array_chunks(gantt_indexes.window(plan, zoom, *window)), "application/json",
+        memoize=False
+    )
 
 
 @router.get("/report/{plan_id}")
-async def get_report(plan_id: str):
+async def get_report(plan_id: str, request: Request):
     """
     Get full report/plan by ID.
     """
-    plan = get_plan(plan_id)
-    
-    if not plan:
-        raise HTTPException(status_code=404, detail="Plan not found")
-    
-    return plan.to_dict()
+    return _plan_response(request, plan_id, "report", report_chunks, "application/json")
 
 
 @router.get("/report/{plan_id}/csv")
-async def export_csv(plan_id: str):
+async def export_csv(plan_id: str, request: Request):
     """
-    Export plan as CSV file.
+    Export plan as CSV file (streamed for large plans; gzip if accepted).
     """
-    plan = get_plan(plan_id)
-    
-    if not plan:
-        raise HTTPException(status_code=404, detail="Plan not found")
-    
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow(["Task ID", "Title", "Duration (days)", "Owner", "Start Date", "End Date", "Dependencies"])
-    
-    # Write tasks
-    for task in plan.tasks:
-        writer.writerow([
-            task.id,
-            task.title,
-            task.duration_days,
-            task.owner or "",
-            task.start_date or "",
-            task.end_date or "",
-            ", ".join(task.dependencies)
-        ])
-    
-    # Return CSV response
-    csv_content = output.getvalue()
-    output.close()
-    
-    return Response(
-        content=csv_content,
-        media_type="text/csv",
+    return _plan_response(
+        request, plan_id, "csv", csv_chunks, "text/csv",
         headers={"Content-Disposition": f"attachment; filename=plan_{plan_id}.csv"}
     )
+
+
+@router.get("/report/{plan_id}/ics")
+async def export_ics(plan_id: str, request: Request, owner: Optional[str] = None):
+    """
+    Export scheduled tasks as an iCalendar file (all-day events), optionally
+    only those of one owner.
+    """
+    kind = "ics"
+    if owner is not None:
+        # One cached body and ETag per owner; the name itself may not be ETag-safe
+        kind += "-" + hashlib.sha256((owner_key(owner) or "").encode()).hexdigest()[:12]
+    return _plan_response(
+        request, plan_id, kind, partial(ics_chunks, owner=owner), "text/calendar",
+        headers={"Content-Disposition": f"attachment; filename=plan_{plan_id}.ics"}
+    )
+
+
+@router.get("/report/{plan_id}/jsonl")
+async def export_jsonl(plan_id: str, request: Request):
+    """
+    Export tasks as JSON Lines, one task object (with plan_id) per line.
+    """
+    return _plan_response(
+        request, plan_id, "jsonl", jsonl_chunks, "application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename=plan_{plan_id}.jsonl"}
+    )
+
+
+def _bulk_plan_ids(plan_ids: List[str], session_id: Optional[str]) -> List[str]:
+    """Requested ids plus the session's plans (newest first), without duplicates"""
+    ids = list(dict.fromkeys(plan_ids))
+    if session_id:
+        cursor = None
+        while len(ids) <= EXPORT_BULK_MAX_PLANS:
+            summaries, cursor = page_plans(cursor, 200, session_id)
+            ids.extend(summary["plan_id"] for summary in summaries if summary["plan_id"] not in ids)
+            if cursor is None:
+                break
+    return ids
+
+
+def _bulk_members(plan_ids: List[str], formats: List[str]) -> Iterator[Member]:
+    # One plan is loaded at a time, as the archive reaches it
+    for plan_id in plan_ids:
+        plan = get_plan(plan_id)
+        if plan is None:
+            # Expired after the request was checked
+            continue
+        for name in formats:
+            yield f"plan_{plan_id}.{name}", plan.created_at, partial(BULK_FORMATS[name], plan)
+
+
+@router.get("/export/bulk")
+async def bulk_export(
+    plan_id: List[str] = Query([]),
+    session_id: Optional[str] = None,
+    archive: str = "zip",
+    include: List[str] = Query(["csv"]),
+):
+    """
+    Download many plans as one archive (zip, tar or tar.gz) holding each
+    plan's CSV and/or JSON report (?include=csv&include=json). Plans are
+    given as repeated ?plan_id= and/or all plans of ?session_id=. The
+    archive is streamed, so memory use does not grow with its size.
+    """
+    if archive not in ARCHIVES:
+        raise HTTPException(status_code=400, detail=f"archive must be one of: {', '.join(ARCHIVES)}")
+    formats = list(dict.fromkeys(include))
+    unknown = [name for name in formats if name not in BULK_FORMATS]
+    if unknown or not formats:
+        raise HTTPException(status_code=400, detail=f"include must be among: {', '.join(BULK_FORMATS)}")
+
+    try:
+        plan_ids = _bulk_plan_ids(plan_id, session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not plan_ids:
+        raise HTTPException(status_code=400, detail="No plans to export: pass plan_id or session_id")
+    if len(plan_ids) > EXPORT_BULK_MAX_PLANS:
+        raise HTTPException(status_code=400, detail=f"At most {EXPORT_BULK_MAX_PLANS} plans per export")
+    missing = [pid for pid in plan_ids if get_plan(pid) is None]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Plans not found: {', '.join(missing)}")
+
+    media_type, write_archive = ARCHIVES[archive]
+    return StreamingResponse(
+        write_archive(_bulk_members(plan_ids, formats)),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=plans.{archive}"}
+    )
@@ -1,20 +1,33 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException
 from datetime import datetime
+from typing import List, Optional
 import uuid
-from ..models.schemas import GenerateReportRequest, GenerateReportResponse, Task
-from ..storage import get_session, store_plan, Plan
-from ..services.scheduler import schedule_tasks
+from ..models.schemas import GenerateReportRequest, GenerateReportResponse, CalendarSpec
+from ..storage import get_session, get_plan, store_plan, Plan, Session
+from ..services.dispatch import schedule_plan
+from ..services.schedule_cache import schedule_cache, schedule_fingerprint
+from ..services.history import record_plan_version, get_plan_history
+from ..services.push import push_hub
+from ..services.idempotency import idempotency_cache
 
 router = APIRouter(prefix="/api", tags=["generate"])
 
 
 @router.post("/generate_report", response_model=GenerateReportResponse)
-async def generate_report(request: GenerateReportRequest):
+async def generate_report(request: GenerateReportRequest, idempotency_key: Optional[str] = Header(None)):
     """
     Finalize plan, schedule tasks with dependencies, and return structured report.
     If tasks are provided in the request, use those (edited tasks from frontend).
     Otherwise, use tasks from the session.
+    With an Idempotency-Key, a retried request gets the first one's response
+    rather than creating another plan.
     """
+    if idempotency_key is not None:
+        return await idempotency_cache.respond("generate_report", request.session_id, idempotency_key, request, lambda: _generate_report(request))
+    return await _generate_report(request)
+
+
+async def _generate_report(request: GenerateReportRequest) -> GenerateReportResponse:
     try:
         # Get session
         session = get_session(request.session_id)
@@ -35,41 +48,78 @@ async def generate_report(request: GenerateReportRequest):
             tasks_data = entities["tasks"]
             project_name = entities.get("project_name") or "Untitled Project"
         
-        # Convert to Task objects
-        tasks = [Task(**task) for task in tasks_data]
-        
         # Determine start date
         start_date = request.start_date or datetime.utcnow().strftime("%Y-%m-%d")
-        
-        # Schedule tasks
-        scheduled_tasks = schedule_tasks(tasks, start_date)
-        
-        # Find overall end date
-        end_dates = [datetime.strptime(task.end_date, "%Y-%m-%d") for task in scheduled_tasks if task.end_date]
-        end_date = max(end_dates).strftime("%Y-%m-%d") if end_dates else start_date
-        
-        # Create and store plan
-        plan_id = str(uuid.uuid4())
-        
-        plan = Plan(
-            plan_id=plan_id,
-            project_name=project_name,
-            tasks=scheduled_tasks,
-            start_date=start_date,
-            end_date=end_date
-        )
-        
-        store_plan(plan)
-        
-        return GenerateReportResponse(
-            plan_id=plan_id,
-            project_name=project_name,
-            tasks=scheduled_tasks,
-            start_date=start_date,
-            end_date=end_date
-        )
+        return await create_plan(session, project_name, tasks_data, start_date, request.calendar)
     
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
+
+
+async def create_plan(session: Session, project_name: str, tasks_data: List[dict], start_date: str,
+                      calendar: Optional[CalendarSpec] = None) -> GenerateReportResponse:
+    """
+    Schedule tasks into a new plan, recorded as the session's next version.
+    Identical inputs reuse the plan they produced last time.
+    Raises HTTPException(400) for invalid tasks or dependency cycles.
+    """
+    # Identical requests reuse the plan they produced last time
+    fingerprint = schedule_fingerprint(session.id, project_name, tasks_data, start_date, calendar)
+    cached_plan_id = schedule_cache.get(fingerprint)
+    cached_plan = get_plan(cached_plan_id) if cached_plan_id else None
+    if cached_plan:
+        history = get_plan_history(session.id)
+        return GenerateReportResponse(
+            plan_id=cached_plan.id,
+            project_name=cached_plan.project_name,
+            tasks=cached_plan.task_models(),
+            start_date=cached_plan.start_date,
+            end_date=cached_plan.end_date,
+            version=history.version_of(cached_plan.id) if history else None
+        )
+    if cached_plan_id:
+        schedule_cache.discard(fingerprint)
+
+    # Validate and schedule tasks (large plans run off the event loop)
+    try:
+        scheduled_tasks = await schedule_plan(tasks_data, start_date, calendar)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Find overall end date
+    end_dates = [datetime.strptime(task.end_date, "%Y-%m-%d") for task in scheduled_tasks if task.end_date]
+    end_date = max(end_dates).strftime("%Y-%m-%d") if end_dates else start_date
+
+    # Create and store plan
+    plan_id = str(uuid.uuid4())
+
+    plan = Plan(
+        plan_id=plan_id,
+        project_name=project_name,
+        tasks=scheduled_tasks,
+        start_date=start_date,
+        end_date=end_date,
+        calendar=calendar,
+        session_id=session.id
+    )
+
+    # Record as the session's next plan version (shares unchanged tasks with the last one)
+    version = record_plan_version(session.id, plan)
+    store_plan(plan)
+    schedule_cache.put(fingerprint, plan_id)
+    push_hub.publish(session.id, "schedule", {
+        **plan.summary(),
+        "version": version.version,
+        "tasks": [{"id": task.id, "start_date": task.start_date, "end_date": task.end_date} for task in scheduled_tasks]
+    })
+
+    return GenerateReportResponse(
+        plan_id=plan_id,
+        project_name=project_name,
+        tasks=scheduled_tasks,
+        start_date=start_date,
+        end_date=end_date,
+        version=version.version
+    )
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, HTTPException
+from typing import Optional
+from ..models.schemas import PlanHistoryResponse, PlanDiffResponse
+from ..services.history import get_plan_history
+
+router = APIRouter(prefix="/api", tags=["history"])
+
+
+def _load_history(session_id: str):
+    history = get_plan_history(session_id)
+    if not history or not history.versions:
+        raise HTTPException(status_code=404, detail="No plan history for this session")
+    return history
+
+
+@router.get("/sessions/{session_id}/plans", response_model=PlanHistoryResponse)
+async def list_plan_versions(session_id: str):
+    """
+    Plan versions generated for a session, oldest first.
+    """
+    history = _load_history(session_id)
+    return {"session_id": session_id, "versions": [version.to_dict() for version in history.versions]}
+
+
+@router.get("/sessions/{session_id}/plans/diff", response_model=PlanDiffResponse)
+async def diff_plan_versions(session_id: str, from_version: Optional[int] = None, to_version: Optional[int] = None):
+    """
+    Task-level changes between two plan versions: added, removed, moved dates
+    and other field updates. Defaults to the latest version against the one before it.
+    """
+    history = _load_history(session_id)
+    new = history.get(to_version) if to_version is not None else history.versions[-1]
+    if new is None:
+        raise HTTPException(status_code=404, detail=f"Plan version not found: {to_version}")
+    old_number = from_version if from_version is not None else new.version - 1
+    old = history.get(old_number)
+    if old is None:
+        raise HTTPException(status_code=404, detail=f"Plan version not found: {old_number}")
+    return history.diff(old, new)
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, HTTPException, Request
+from datetime import datetime
+from typing import AsyncIterator, Callable, Optional
+from ..models.schemas import ImportResponse
+from ..storage import get_session, find_session
+from ..services.coordinator import session_coordinator, SessionBusyError
+from ..services.importers import csv_rows, json_rows, import_tasks, ImportRejected, ImportTooLarge, IMPORT_MAX_BYTES, Row
+from ..services.push import push_hub
+from .generate import create_plan
+
+router = APIRouter(prefix="/api", tags=["import"])
+
+
+@router.post("/import/csv", response_model=ImportResponse)
+async def import_csv(request: Request, session_id: Optional[str] = None, project_name: Optional[str] = None, start_date: Optional[str] = None):
+    """
+    Import tasks from a CSV body with export_csv's columns (Task ID, Title,
+    Duration (days), Owner, Dependencies; dates are recomputed) and schedule
+    them, without the LLM.
+    """
+    return await _import(request, csv_rows, session_id, project_name, start_date)
+
+
+@router.post("/import/json", response_model=ImportResponse)
+async def import_json(request: Request, session_id: Optional[str] = None, project_name: Optional[str] = None, start_date: Optional[str] = None):
+    """
+    Import tasks from a JSON array of tasks, JSON Lines, or a report export
+    and schedule them, without the LLM.
+    """
+    return await _import(request, json_rows, session_id, project_name, start_date)
+
+
+async def _import(
+    request: Request,
+    parse: Callable[[AsyncIterator[bytes]], AsyncIterator[Row]],
+    session_id: Optional[str],
+    project_name: Optional[str],
+    start_date: Optional[str],
+) -> ImportResponse:
+    """
+    Parse the body as it arrives, validate every row and resolve
+    dependencies, then schedule the tasks into a new plan and make them the
+    session's tasks (creating the session if needed). Any invalid row
+    rejects the import with 422 listing the problems by row.
+    """
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > IMPORT_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Import body is larger than {IMPORT_MAX_BYTES} bytes")
+    try:
+        tasks = await import_tasks(parse(request.stream()))
+    except ImportTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ImportRejected as e:
+        raise HTTPException(status_code=422, detail={"message": str(e), "errors": e.errors, "error_count": e.error_count})
+
+    # Dates come from the scheduler
+    tasks_data = [task.model_dump(exclude={"start_date", "end_date"}, exclude_none=True) for task in tasks]
+    session = get_session(session_id)
+    project_name = project_name or session.entities.get("project_name") or "Untitled Project"
+
+    start_date = start_date or datetime.utcnow().strftime("%Y-%m-%d")
+    # Scheduled first, so a dependency cycle (400) leaves the session as it was
+    report = await create_plan(session, project_name, tasks_data, start_date)
+
+    async def replace_tasks():
+        # Reload: a queued chat turn may have changed the entities meanwhile
+        current = find_session(session.id) or session
+        current.update_entities({**current.entities, "project_name": project_name, "tasks": tasks_data})
+
+    try:
+        await session_coordinator.run(session.id, replace_tasks)
+    except SessionBusyError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    push_hub.publish(session.id, "changes")
+    return ImportResponse(**dict(report), session_id=session.id, imported=len(tasks))
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from ..models.schemas import SessionPage, PlanPage, OwnerTaskPage
+from ..storage import page_sessions, page_plans, page_projects, page_owner_tasks
+
+router = APIRouter(prefix="/api", tags=["listing"])
+
+PAGE_LIMIT = Query(20, ge=1, le=200)
+
+
+@router.get("/sessions", response_model=SessionPage)
+async def list_sessions(limit: int = PAGE_LIMIT, cursor: Optional[str] = None):
+    """
+    Sessions, newest first. Follow next_cursor for further pages.
+    """
+    try:
+        items, next_cursor = page_sessions(cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/plans", response_model=PlanPage)
+async def list_plans(limit: int = PAGE_LIMIT, cursor: Optional[str] = None, session_id: Optional[str] = None, project: Optional[str] = None):
+    """
+    Plan summaries, newest first, optionally for one session.
+    With `project`, plans whose project name starts with it (case-insensitive), in name order.
+    """
+    if session_id and project is not None:
+        raise HTTPException(status_code=400, detail="Filter by session_id or project, not both")
+    try:
+        if project is not None:
+            items, next_cursor = page_projects(project, cursor, limit)
+        else:
+            items, next_cursor = page_plans(cursor, limit, session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/owners/{owner}/tasks", response_model=OwnerTaskPage)
+async def list_owner_tasks(owner: str, limit: int = PAGE_LIMIT, cursor: Optional[str] = None):
+    """
+    Tasks assigned to an owner across all plans, newest plan first.
+    """
+    try:
+        items, next_cursor = page_owner_tasks(owner, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,84 @@
+from fastapi import APIRouter, HTTPException
+import uuid
+from ..models.schemas import PortfolioRequest, PortfolioPlanUpdate, PortfolioResponse
+from ..storage import get_plan, store_portfolio, get_portfolio
+from ..services.portfolio import Portfolio
+
+router = APIRouter(prefix="/api", tags=["portfolio"])
+
+
+def _load_portfolio(portfolio_id: str) -> Portfolio:
+    portfolio = get_portfolio(portfolio_id)
+    if not portfolio:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+    return portfolio
+
+
+def _load_plan(plan_id: str):
+    plan = get_plan(plan_id)
+    if not plan:
+        raise HTTPException(status_code=404, detail=f"Plan not found: {plan_id}")
+    return plan
+
+
+@router.post("/portfolios", response_model=PortfolioResponse)
+def create_portfolio(request: PortfolioRequest):
+    """
+    Level several plans together so owners shared between them are not double-booked.
+    Handlers are sync so levelling runs in the threadpool, off the event loop.
+    """
+    plans = [(_load_plan(ref.plan_id), ref.priority) for ref in request.plans]
+    
+    portfolio = Portfolio(str(uuid.uuid4()))
+    try:
+        portfolio.add_plans(plans)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    store_portfolio(portfolio)
+    with portfolio.lock:
+        return PortfolioResponse(**portfolio.to_dict(), rescheduled=[plan.id for plan, _ in plans])
+
+
+@router.get("/portfolios/{portfolio_id}", response_model=PortfolioResponse)
+def get_portfolio_schedule(portfolio_id: str):
+    """Current levelled schedule of every plan in the portfolio"""
+    portfolio = _load_portfolio(portfolio_id)
+    with portfolio.lock:
+        return PortfolioResponse(**portfolio.to_dict())
+
+
+@router.put("/portfolios/{portfolio_id}/plans/{plan_id}", response_model=PortfolioResponse)
+def put_portfolio_plan(portfolio_id: str, plan_id: str, update: PortfolioPlanUpdate):
+    """
+    Add a plan, change its priority, or swap in a new version of a plan (`replaces`).
+    Only plans affected through shared owners are rescheduled.
+    """
+    portfolio = _load_portfolio(portfolio_id)
+    plan = _load_plan(plan_id)
+    
+    with portfolio.lock:
+        if update.replaces and update.replaces not in portfolio:
+            raise HTTPException(status_code=404, detail=f"Plan {update.replaces} is not in this portfolio")
+        
+        try:
+            rescheduled = portfolio.set_plan(plan, update.priority, update.replaces)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        store_portfolio(portfolio)
+        return PortfolioResponse(**portfolio.to_dict(), rescheduled=rescheduled)
+
+
+@router.delete("/portfolios/{portfolio_id}/plans/{plan_id}", response_model=PortfolioResponse)
+def delete_portfolio_plan(portfolio_id: str, plan_id: str):
+    """Remove a plan from the portfolio and release its owners"""
+    portfolio = _load_portfolio(portfolio_id)
+    
+    with portfolio.lock:
+        if plan_id not in portfolio:
+            raise HTTPException(status_code=404, detail="Plan is not in this portfolio")
+        
+        rescheduled = portfolio.remove_plan(plan_id)
+        store_portfolio(portfolio)
+        return PortfolioResponse(**portfolio.to_dict(), rescheduled=rescheduled)
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, HTTPException
+from datetime import datetime
+from ..models.schemas import ScenarioRequest, ScenarioResponse
+from ..storage import get_plan
+from ..services.scenarios import evaluate_scenarios
+
+router = APIRouter(prefix="/api", tags=["scenarios"])
+
+
+@router.post("/scenarios", response_model=ScenarioResponse)
+def compare_scenarios(request: ScenarioRequest):
+    """
+    Evaluate what-if scenarios (start date, duration changes, owner absences)
+    against a base plan. Nothing is stored; only per-scenario deltas are returned.
+    """
+    if request.plan_id:
+        plan = get_plan(request.plan_id)
+        if not plan:
+            raise HTTPException(status_code=404, detail="Plan not found")
+        tasks = plan.tasks
+        start_date = request.start_date or plan.start_date
+        calendar = plan.calendar
+    elif request.tasks:
+        tasks = request.tasks
+        start_date = request.start_date or datetime.utcnow().strftime("%Y-%m-%d")
+        calendar = request.calendar
+    else:
+        raise HTTPException(status_code=400, detail="Provide either plan_id or tasks")
+    
+    try:
+        result = evaluate_scenarios(tasks, start_date, request.scenarios, calendar)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return ScenarioResponse(**result)
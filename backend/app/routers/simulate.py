@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException
+from ..models.schemas import SimulationRequest, SimulationResponse
+from ..storage import get_plan
+from ..services.simulation import simulate_schedule
+
+router = APIRouter(prefix="/api", tags=["simulate"])
+
+
+@router.post("/simulate/{plan_id}", response_model=SimulationResponse)
+def simulate_plan(plan_id: str, request: SimulationRequest):
+    """
+    Run a Monte Carlo schedule-risk simulation for a stored plan.
+    Declared sync so FastAPI runs the CPU-bound work in its threadpool.
+    """
+    plan = get_plan(plan_id)
+    
+    if not plan:
+        raise HTTPException(status_code=404, detail="Plan not found")
+    
+    try:
+        result = simulate_schedule(plan.tasks, plan.start_date, request.iterations, request.seed, plan.calendar)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return SimulationResponse(plan_id=plan_id, **result)
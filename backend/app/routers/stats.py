@@ -0,0 +1,39 @@
+from fastapi import APIRouter
+from ..storage import count_sessions, count_plans, store_stats
+from ..services.schedule_cache import schedule_cache
+from ..services.calendar import calendar_cache_info
+from ..services.coordinator import session_coordinator
+from ..services.cancellation import cancellations
+from ..services.push import push_hub
+from ..services.idempotency import idempotency_cache
+from ..services.plan_bodies import plan_bodies
+from ..services.gantt import gantt_indexes
+
+router = APIRouter(prefix="/api", tags=["stats"])
+
+
+@router.get("/stats")
+async def get_stats():
+    """
+    Operational counters: cache hit rates and store sizes.
+    """
+    calendar_info = calendar_cache_info()
+    
+    return {
+        "sessions": count_sessions(),
+        "plans": count_plans(),
+        "store": store_stats(),
+        "schedule_cache": schedule_cache.stats(),
+        "session_coordinator": session_coordinator.stats(),
+        "cancellations": cancellations.stats(),
+        "websocket": push_hub.stats(),
+        "idempotency": idempotency_cache.stats(),
+        "plan_bodies": plan_bodies.stats(),
+        "gantt_indexes": gantt_indexes.stats(),
+        "calendar_cache": {
+            "size": calendar_info.currsize,
+            "maxsize": calendar_info.maxsize,
+            "hits": calendar_info.hits,
+            "misses": calendar_info.misses,
+        },
+    }
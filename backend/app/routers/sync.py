@@ -0,0 +1,63 @@
+from fastapi import APIRouter, HTTPException
+from ..models.schemas import TaskPatchRequest, TaskChangesResponse
+from ..storage import find_session
+from ..services.coordinator import session_coordinator, SessionBusyError
+from ..services.sync import task_sync, SyncConflict, InvalidTaskUpdate
+from ..services.push import push_hub
+
+router = APIRouter(prefix="/api", tags=["sync"])
+
+
+def _load_session(session_id: str):
+    session = find_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session
+
+
+@router.get("/sessions/{session_id}/changes", response_model=TaskChangesResponse)
+async def get_task_changes(session_id: str, since: int = 0):
+    """
+    Tasks added or changed and ids deleted after version `since`.
+    full=true means the server no longer knows what changed since then and
+    `tasks` is the whole table.
+    """
+    sync, _ = task_sync(_load_session(session_id))
+    return {"session_id": session_id, **sync.changes(since)}
+
+
+@router.patch("/sessions/{session_id}/tasks", response_model=TaskChangesResponse)
+async def patch_tasks(session_id: str, request: TaskPatchRequest):
+    """
+    Add, update and delete tasks against base_version.
+    Edits to tasks that nobody else changed since base_version are merged;
+    otherwise 409 lists the conflicting task ids. Updates that would leave
+    a task invalid (e.g. a null title) get 422 and change nothing. The response holds every
+    change since base_version, including this patch.
+    """
+    session = _load_session(session_id)
+
+    async def apply():
+        # Reload: a queued LLM modification may have replaced the session's tasks meanwhile
+        current = find_session(session_id) or session
+        sync, _ = task_sync(current)
+        sync.apply(
+            request.base_version,
+            [task.model_dump() for task in request.add],
+            [task.model_dump(exclude_unset=True) for task in request.update],
+            request.delete,
+        )
+        return sync.changes(request.base_version)
+
+    try:
+        changes = await session_coordinator.run(session.id, apply)
+    except SyncConflict as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "version": e.version, "conflicts": e.task_ids})
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except InvalidTaskUpdate as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except SessionBusyError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    push_hub.publish(session_id, "changes")
+    return {"session_id": session_id, **changes}
@@ -0,0 +1,209 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from ..models.schemas import ChatRequest
+from ..storage import get_session, find_session
+from ..services.coordinator import session_coordinator, SessionBusyError
+from ..services.sync import task_sync
+from ..services.push import push_hub, Subscriber
+from ..services.cancellation import cancellations
+from .chat import _reply, _entities_event
+from typing import Any, Dict, Optional, Set
+import asyncio
+import json
+import os
+import time
+
+router = APIRouter(prefix="/api", tags=["websocket"])
+
+# An app-level ping goes out after this long without hearing from the client;
+# the connection is closed after WS_IDLE_TIMEOUT of silence
+WS_PING_INTERVAL = float(os.getenv("WS_PING_INTERVAL", "20"))
+WS_IDLE_TIMEOUT = float(os.getenv("WS_IDLE_TIMEOUT", "60"))
+# Sessions one connection may chat on or subscribe to
+WS_MAX_SESSIONS = int(os.getenv("WS_MAX_SESSIONS", "32"))
+# Browsers do not apply CORS to WebSockets, so check Origin against the same list
+WS_ORIGINS = os.getenv("CORS_ORIGINS", "https://plan.rupinajay.me,http://localhost:3000").split(",")
+
+
+def _render(subscriber: Subscriber, session_id: str, kind: str, payload: Any) -> Optional[Dict[str, Any]]:
+    """The frame for a pushed update, built when it is sent so merged updates go out once"""
+    if kind != "changes":
+        return {"type": kind, "session_id": session_id, **payload}
+    if session_id in subscriber.replying:
+        # Pushed again once the reply is out, if anything is left over
+        return None
+    session = find_session(session_id)
+    if session is None:
+        return None
+    sync, version = task_sync(session)
+    since = subscriber.versions.get(session_id, 0)
+    if version <= since:
+        # Already delivered, e.g. with the reply that made the change
+        return None
+    subscriber.versions[session_id] = version
+    return {"type": "changes", "session_id": session_id, **sync.changes(since)}
+
+
+class _Connection:
+    """One client's socket: many sessions, concurrent chat turns, pushed updates"""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.subscriber = Subscriber(websocket.send_text, _render)
+        self.sessions: Set[str] = set()
+        self.turns: Set[asyncio.Task] = set()
+        self.last_seen = time.monotonic()
+
+    async def serve(self):
+        tasks = [asyncio.create_task(self._receive()), asyncio.create_task(self.subscriber.run()), asyncio.create_task(self._keepalive())]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            if tasks[2] in done:
+                await self.websocket.close(code=1001, reason="Idle timeout")
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Nobody is left to read these replies
+            for turn in list(self.turns):
+                turn.cancel()
+                cancellations.requests += 1
+            for session_id in self.sessions:
+                push_hub.unsubscribe(session_id, self.subscriber)
+            push_hub.coalesced += self.subscriber.coalesced
+
+    async def _receive(self):
+        try:
+            while True:
+                text = await self.websocket.receive_text()
+                self.last_seen = time.monotonic()
+                await self._handle(text)
+        except WebSocketDisconnect:
+            return
+
+    async def _keepalive(self):
+        while True:
+            await asyncio.sleep(min(WS_PING_INTERVAL, WS_IDLE_TIMEOUT))
+            idle = time.monotonic() - self.last_seen
+            if idle >= WS_IDLE_TIMEOUT:
+                return
+            if idle >= WS_PING_INTERVAL:
+                # A full queue means frames are flowing anyway
+                self.subscriber.try_send({"type": "ping"})
+
+    async def _error(self, status: int, message: str, request_id: Any = None, session_id: Optional[str] = None):
+        await self.subscriber.send({"type": "error", "id": request_id, "session_id": session_id, "status": status, "message": message})
+
+    def _join(self, session_id: str, since: Optional[int] = None) -> int:
+        """
+        Subscribe to the session's updates; returns its task version. Changes
+        are pushed from `since`, or from now for a new subscription.
+        """
+        _, version = task_sync(get_session(session_id))
+        if session_id not in self.sessions:
+            if len(self.sessions) >= WS_MAX_SESSIONS:
+                raise SessionBusyError(f"At most {WS_MAX_SESSIONS} sessions per connection")
+            self.sessions.add(session_id)
+            push_hub.subscribe(session_id, self.subscriber)
+            self.subscriber.versions[session_id] = version
+        if since is not None:
+            self.subscriber.versions[session_id] = since
+        return version
+
+    async def _handle(self, text: str):
+        try:
+            frame = json.loads(text)
+            kind = frame["type"]
+        except (ValueError, TypeError, KeyError):
+            await self._error(400, "Frames are JSON objects with a type")
+            return
+        request_id = frame.get("id")
+
+        if kind == "ping":
+            await self.subscriber.send({"type": "pong"})
+        elif kind == "pong":
+            pass
+        elif kind == "chat":
+            await self._chat(request_id, frame)
+        elif kind == "subscribe":
+            session_id = frame.get("session_id")
+            if not isinstance(session_id, str) or find_session(session_id) is None:
+                await self._error(404, "Session not found", request_id, session_id)
+                return
+            since = frame.get("since")
+            try:
+                version = self._join(session_id, since if isinstance(since, int) else None)
+            except SessionBusyError as e:
+                await self._error(429, str(e), request_id, session_id)
+                return
+            await self.subscriber.send({"type": "subscribed", "id": request_id, "session_id": session_id, "version": version})
+            if isinstance(since, int) and since < version:
+                self.subscriber.push(session_id, "changes")
+        elif kind == "unsubscribe":
+            session_id = frame.get("session_id")
+            self.sessions.discard(session_id)
+            push_hub.unsubscribe(session_id, self.subscriber)
+        else:
+            await self._error(400, f"Unknown frame type: {kind}", request_id)
+
+    async def _chat(self, request_id: Any, frame: Dict[str, Any]):
+        try:
+            request = ChatRequest(**{key: value for key, value in frame.items() if key not in ("type", "id")})
+        except (ValidationError, TypeError) as e:
+            await self._error(422, str(e), request_id, frame.get("session_id"))
+            return
+        session = get_session(request.session_id)
+        try:
+            # Turn the request away before storing its message if the session is swamped
+            session_coordinator.check(session.id)
+            self._join(session.id)
+        except SessionBusyError as e:
+            await self._error(429, str(e), request_id, session.id)
+            return
+        session.append_message(request.text)
+        # Turns run concurrently, so one slow session does not hold up the others
+        turn = asyncio.create_task(self._turn(request_id, session, request))
+        self.turns.add(turn)
+        turn.add_done_callback(self.turns.discard)
+
+    async def _turn(self, request_id: Any, session, request: ChatRequest):
+        send = self.subscriber.send
+        replying = self.subscriber.replying
+        replying[session.id] = replying.get(session.id, 0) + 1
+        try:
+            await send({"type": "start", "id": request_id, "session_id": session.id})
+            message, entities = await _reply(session, request)
+            await send({"type": "message", "id": request_id, "session_id": session.id, "content": message})
+            event = _entities_event(session.id, entities, request.base_version)
+            self.subscriber.versions[session.id] = max(self.subscriber.versions.get(session.id, 0), event["version"])
+            await send({**event, "id": request_id})
+            await send({"type": "done", "id": request_id, "session_id": session.id})
+        except SessionBusyError as e:
+            await self._error(429, str(e), request_id, session.id)
+        except Exception as e:
+            await self._error(500, f"Error processing chat: {str(e)}", request_id, session.id)
+        finally:
+            replying[session.id] -= 1
+            if not replying[session.id]:
+                del replying[session.id]
+                # Changes made by others meanwhile (skipped if the reply covered them)
+                self.subscriber.push(session.id, "changes")
+
+
+@router.websocket("/ws")
+async def chat_socket(websocket: WebSocket):
+    """
+    Chat over one long-lived connection. Frames are JSON text; see the
+    README for the protocol. Many sessions can share a connection, their
+    turns run concurrently, and subscribed sessions get task changes and
+    new schedules pushed as they happen.
+    """
+    origin = websocket.headers.get("origin")
+    if origin is not None and origin not in WS_ORIGINS:
+        await websocket.close(code=1008, reason="Origin not allowed")
+        return
+    await websocket.accept()
+    push_hub.connections += 1
+    try:
+        await _Connection(websocket).serve()
+    finally:
+        push_hub.connections -= 1
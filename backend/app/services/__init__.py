@@ -1,5 +1,9 @@
 from .llm_client import LLMClient
 from .parser import extract_entities_from_messages, merge_entities
 from .scheduler import schedule_tasks
+from .graph import TaskGraph
+from .simulation import simulate_schedule
+from .scenarios import evaluate_scenarios
+from .portfolio import Portfolio
 
-__all__ = ["LLMClient", "extract_entities_from_messages", "merge_entities", "schedule_tasks"]
+__all__ = ["LLMClient", "extract_entities_from_messages", "merge_entities", "schedule_tasks", "TaskGraph", "simulate_schedule", "evaluate_scenarios", "Portfolio"]
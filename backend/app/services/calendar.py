@@ -0,0 +1,173 @@
+import math
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Optional, Tuple, FrozenSet, Union
+from ..models.schemas import CalendarSpec
+
+
+# Fixed-date public holidays per region as (month, day)
+HOLIDAY_SETS = {
+    "US": [(1, 1), (6, 19), (7, 4), (11, 11), (12, 25)],
+    "UK": [(1, 1), (12, 25), (12, 26)],
+    "IN": [(1, 26), (8, 15), (10, 2)],
+    "DE": [(1, 1), (5, 1), (10, 3), (12, 25), (12, 26)],
+    "FR": [(1, 1), (5, 1), (5, 8), (7, 14), (8, 15), (11, 1), (11, 11), (12, 25)],
+}
+
+DEFAULT_WORKING_DAYS = (0, 1, 2, 3, 4)  # Monday-Friday
+
+# Calendars cover this many years around the plan start year
+YEARS_BEFORE = 1
+YEARS_AFTER = 10
+
+CALENDAR_CACHE_SIZE = int(os.getenv("CALENDAR_CACHE_SIZE", "256"))
+
+DateLike = Union[date, datetime]
+
+
+def _parse_day(value: str) -> date:
+    return datetime.strptime(value[:10], "%Y-%m-%d").date()
+
+
+class WorkCalendar:
+    """
+    Working-day calendar over a fixed span of years.
+    Precomputes the ordinal of every working day plus a cumulative workday
+    count per calendar day, so "add N working days" is a binary search and
+    "working days between" is two array reads.
+    """
+
+    def __init__(self, working_days: Tuple[int, ...], holidays: FrozenSet[int], first_year: int, last_year: int):
+        self.first_year = first_year
+        self.last_year = last_year
+        self._origin = date(first_year, 1, 1).toordinal()
+        end = date(last_year + 1, 1, 1).toordinal()
+
+        self._workdays = array("l")
+        self._cumulative = array("l", [0])  # _cumulative[k] = working days in [origin, origin + k)
+        working = frozenset(working_days)
+        count = 0
+        for ordinal in range(self._origin, end):
+            # date.fromordinal(1) is a Monday
+            if (ordinal - 1) % 7 in working and ordinal not in holidays:
+                self._workdays.append(ordinal)
+                count += 1
+            self._cumulative.append(count)
+
+        if not self._workdays:
+            raise ValueError("Calendar has no working days")
+
+    def __len__(self) -> int:
+        return len(self._workdays)
+
+    def _ordinal(self, day: DateLike) -> int:
+        ordinal = day.toordinal()
+        if not self._origin <= ordinal < self._origin + len(self._cumulative) - 1:
+            raise ValueError(f"Date {day:%Y-%m-%d} is outside the calendar range {self.first_year}-{self.last_year}")
+        return ordinal
+
+    def is_working_day(self, day: DateLike) -> bool:
+        ordinal = self._ordinal(day)
+        offset = ordinal - self._origin
+        return self._cumulative[offset + 1] > self._cumulative[offset]
+
+    def index(self, day: DateLike) -> int:
+        """Position of the first working day on or after `day`"""
+        return bisect_left(self._workdays, self._ordinal(day))
+
+    def workday(self, index: int) -> datetime:
+        """Working day at a position returned by index()"""
+        if not 0 <= index < len(self._workdays):
+            raise ValueError(f"Schedule runs past the calendar range {self.first_year}-{self.last_year}")
+        return datetime.fromordinal(self._workdays[index])
+
+    def index_of_ordinal(self, ordinal: int) -> int:
+        """index() for a date given as an ordinal"""
+        return bisect_left(self._workdays, ordinal)
+
+    def ordinal_at(self, index: int) -> int:
+        """workday() as an ordinal, for callers that keep dates as integers"""
+        if not 0 <= index < len(self._workdays):
+            raise ValueError(f"Schedule runs past the calendar range {self.first_year}-{self.last_year}")
+        return self._workdays[index]
+
+    def next_working_day(self, day: DateLike) -> datetime:
+        """First working day on or after `day`"""
+        return self.workday(self.index(day))
+
+    def add_working_days(self, day: DateLike, days: int) -> datetime:
+        """The `days`-th working day after `day` (same rule as add_business_days)"""
+        if days <= 0:
+            return datetime.fromordinal(self._ordinal(day))
+        return self.workday(bisect_right(self._workdays, self._ordinal(day)) + days - 1)
+
+    def working_days_between(self, start: DateLike, end: DateLike) -> int:
+        """Number of working days in [start, end)"""
+        return self._cumulative[self._ordinal(end) - self._origin] - self._cumulative[self._ordinal(start) - self._origin]
+
+
+@lru_cache(maxsize=CALENDAR_CACHE_SIZE)
+def _build_calendar(working_days: Tuple[int, ...], region: Optional[str], holidays: Tuple[str, ...], first_year: int, last_year: int) -> WorkCalendar:
+    ordinals = {_parse_day(day).toordinal() for day in holidays}
+    if region:
+        for year in range(first_year, last_year + 1):
+            ordinals.update(date(year, month, day).toordinal() for month, day in HOLIDAY_SETS[region])
+    return WorkCalendar(working_days, frozenset(ordinals), first_year, last_year)
+
+
+def _check_weekdays(working_days: Tuple[int, ...]) -> Tuple[int, ...]:
+    if not working_days or any(day < 0 or day > 6 for day in working_days):
+        raise ValueError("working_days must be weekday numbers 0 (Monday) to 6 (Sunday)")
+    return working_days
+
+
+def get_calendar(spec: Optional[CalendarSpec], year: int, owner: Optional[str] = None) -> WorkCalendar:
+    """
+    Return the (cached) calendar for a plan, or for one owner in it.
+    Owner calendars add the owner's time off and may override the working week.
+    """
+    first_year, last_year = year - YEARS_BEFORE, year + YEARS_AFTER
+    if spec is None:
+        return _build_calendar(DEFAULT_WORKING_DAYS, None, (), first_year, last_year)
+
+    region = spec.region.upper() if spec.region else None
+    if region and region not in HOLIDAY_SETS:
+        raise ValueError(f"Unknown holiday region '{spec.region}'. Available: {', '.join(sorted(HOLIDAY_SETS))}")
+
+    working_days = tuple(sorted(set(spec.working_days)))
+    holidays = set(spec.holidays)
+
+    availability = spec.owners.get(owner) if owner else None
+    if availability:
+        if availability.working_days is not None:
+            working_days = tuple(sorted(set(availability.working_days)))
+        for period in availability.time_off:
+            day = _parse_day(period.start_date)
+            last = _parse_day(period.end_date)
+            while day <= last:
+                holidays.add(day.isoformat())
+                day += timedelta(days=1)
+
+    return _build_calendar(_check_weekdays(working_days), region, tuple(sorted(holidays)), first_year, last_year)
+
+
+def owner_capacity(spec: Optional[CalendarSpec], owner: Optional[str]) -> float:
+    """Share of each working day the owner is available (1.0 = full time)"""
+    availability = spec.owners.get(owner) if spec and owner else None
+    return availability.capacity if availability else 1.0
+
+
+def working_duration(spec: Optional[CalendarSpec], owner: Optional[str], duration_days: int) -> int:
+    """Working days a task occupies once the owner's part-time capacity is applied"""
+    capacity = owner_capacity(spec, owner)
+    if capacity >= 1:
+        return duration_days
+    return math.ceil(duration_days / capacity)
+
+
+def calendar_cache_info():
+    """Hit/miss counters of the parsed calendar cache"""
+    return _build_calendar.cache_info()
@@ -0,0 +1,60 @@
+import asyncio
+from typing import Any, Awaitable, Dict
+from starlette.requests import Request
+from .llm_client import LLMClient
+
+
+class ClientDisconnected(Exception):
+    """The client went away before its request finished"""
+
+
+class CancellationStats:
+    """Counts work abandoned because nobody was waiting for it any more"""
+
+    def __init__(self):
+        self.requests = 0
+        self.streams = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "streams": self.streams,
+            "llm_calls": LLMClient.cancelled_calls,
+        }
+
+
+cancellations = CancellationStats()
+
+
+async def _disconnected(request: Request):
+    # The body has already been read, so the next message is the disconnect
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def cancel_on_disconnect(request: Request, work: Awaitable[Any]) -> Any:
+    """
+    Await `work`, cancelling it if the client disconnects first (raising
+    ClientDisconnected). Cancellation reaches the LLM call being awaited,
+    which closes its upstream connection.
+    """
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(_disconnected(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    finally:
+        watcher.cancel()
+    if not task.done():
+        task.cancel()
+        cancellations.requests += 1
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        raise ClientDisconnected("Client closed the request")
+    return task.result()
@@ -0,0 +1,117 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+# Requests allowed to wait on one session before new ones are turned away
+SESSION_QUEUE_LIMIT = int(os.getenv("SESSION_QUEUE_LIMIT", "8"))
+
+
+class SessionBusyError(Exception):
+    """Too many requests already waiting on this session"""
+
+
+class _Batch:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+
+
+class _SessionState:
+    __slots__ = ("lock", "waiting", "batch")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.waiting = 0
+        # Follow-up run that has not started yet; coalescing requests join it
+        self.batch: Optional[_Batch] = None
+
+
+class SessionCoordinator:
+    """
+    Serializes LLM work per session (within this worker).
+
+    run(..., coalesce=True) is for work that only depends on the session's
+    current state, like re-extracting entities from all messages: requests
+    arriving while a run is in progress share one follow-up run and all get
+    its result, so a burst of messages costs two LLM calls instead of one per
+    message. Other work runs one request at a time in arrival order.
+    """
+
+    def __init__(self, queue_limit: int = SESSION_QUEUE_LIMIT):
+        self.queue_limit = queue_limit
+        self._states: Dict[str, _SessionState] = {}
+        self.runs = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    def check(self, session_id: str):
+        """Raise SessionBusyError now if run() would reject this session"""
+        state = self._states.get(session_id)
+        if state is not None and state.waiting >= self.queue_limit:
+            self.rejected += 1
+            raise SessionBusyError(f"Too many requests in progress for session {session_id}")
+
+    def _enter(self, session_id: str) -> _SessionState:
+        self.check(session_id)
+        state = self._states.get(session_id)
+        if state is None:
+            state = self._states[session_id] = _SessionState()
+        state.waiting += 1
+        return state
+
+    def _leave(self, session_id: str, state: _SessionState):
+        state.waiting -= 1
+        if state.waiting == 0 and not state.lock.locked():
+            self._states.pop(session_id, None)
+
+    async def run(self, session_id: str, work: Callable[[], Awaitable[Any]], coalesce: bool = False) -> Any:
+        """Run `work` under the session's lock; raises SessionBusyError when the queue is full"""
+        state = self._enter(session_id)
+        try:
+            if not coalesce:
+                async with state.lock:
+                    self.runs += 1
+                    return await work()
+
+            batch = state.batch
+            if batch is None:
+                batch = state.batch = _Batch()
+                batch.task = asyncio.create_task(self._run_batch(state, batch, work))
+            else:
+                self.coalesced += 1
+            batch.waiters += 1
+            try:
+                # The run belongs to the whole batch, so one caller going away
+                # does not cancel it for the others
+                return await asyncio.shield(batch.task)
+            except asyncio.CancelledError:
+                batch.waiters -= 1
+                if batch.waiters == 0:
+                    if state.batch is batch:
+                        state.batch = None
+                    batch.task.cancel()
+                raise
+        finally:
+            self._leave(session_id, state)
+
+    async def _run_batch(self, state: _SessionState, batch: _Batch, work: Callable[[], Awaitable[Any]]) -> Any:
+        async with state.lock:
+            if state.batch is batch:
+                # Later arrivals start a new batch behind this run
+                state.batch = None
+            self.runs += 1
+            return await work()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "active_sessions": len(self._states),
+            "runs": self.runs,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+        }
+
+
+session_coordinator = SessionCoordinator()
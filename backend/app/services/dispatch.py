@@ -0,0 +1,88 @@
+import asyncio
+import json
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+from pydantic import TypeAdapter
+from ..models.schemas import Task, CalendarSpec
+from .scheduler import schedule_tasks
+
+
+# Plans with more tasks than this are scheduled off the event loop
+INLINE_MAX_TASKS = int(os.getenv("SCHEDULE_INLINE_MAX_TASKS", "200"))
+
+# "process" for true parallelism, "thread" to avoid worker start-up and pickling
+EXECUTOR_KIND = os.getenv("SCHEDULE_EXECUTOR", "process")
+MAX_WORKERS = int(os.getenv("SCHEDULE_WORKERS", "0")) or None
+
+_task_list = TypeAdapter(List[Task])
+_executor: Optional[Executor] = None
+
+
+def _get_executor() -> Executor:
+    """Lazily create the shared scheduling pool"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=MAX_WORKERS) if EXECUTOR_KIND == "process" else ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    return _executor
+
+
+def shutdown_executor():
+    """Stop the scheduling pool (called on app shutdown)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def encode_schedule_input(tasks_data: List[Dict[str, Any]], start_date: str, calendar: Optional[CalendarSpec]) -> bytes:
+    """Compact JSON payload handed to a worker: raw task dicts are validated there, not here"""
+    return json.dumps(
+        [tasks_data, start_date, calendar.model_dump() if calendar else None],
+        separators=(",", ":"),
+    ).encode()
+
+
+def run_encoded_schedule(payload: bytes) -> bytes:
+    """
+    Worker entry point: validate, schedule and serialize in one go.
+    Errors come back as {"error": ...} so nothing unpicklable crosses the boundary.
+    """
+    try:
+        tasks_data, start_date, calendar = json.loads(payload)
+        tasks = _task_list.validate_python(tasks_data)
+        scheduled = schedule_tasks(tasks, start_date, CalendarSpec(**calendar) if calendar else None)
+        return _task_list.dump_json(scheduled)
+    except ValueError as e:
+        return json.dumps({"error": str(e)}).encode()
+
+
+def decode_schedule_output(raw: bytes) -> List[Task]:
+    """Rebuild Task objects from worker output without validating them a second time"""
+    data = json.loads(raw)
+    if isinstance(data, dict):
+        raise ValueError(data["error"])
+    return [Task.model_construct(**task) for task in data]
+
+
+def _schedule_raw(tasks_data: List[Dict[str, Any]], start_date: str, calendar: Optional[CalendarSpec]) -> List[Task]:
+    return schedule_tasks([Task(**task) for task in tasks_data], start_date, calendar)
+
+
+async def schedule_plan(tasks_data: List[Dict[str, Any]], start_date: str, calendar: Optional[CalendarSpec] = None) -> List[Task]:
+    """
+    Validate and schedule raw task dicts.
+    Small plans run inline; larger ones go to the executor so a big plan does
+    not stall other requests (and chat streams) on this worker's event loop.
+    Raises ValueError for invalid tasks or dependency cycles.
+    """
+    if len(tasks_data) <= INLINE_MAX_TASKS:
+        return _schedule_raw(tasks_data, start_date, calendar)
+
+    loop = asyncio.get_running_loop()
+    if EXECUTOR_KIND == "thread":
+        # Same memory space: skip the serialization round trip
+        return await loop.run_in_executor(_get_executor(), _schedule_raw, tasks_data, start_date, calendar)
+
+    raw = await loop.run_in_executor(_get_executor(), run_encoded_schedule, encode_schedule_input(tasks_data, start_date, calendar))
+    return decode_schedule_output(raw)
@@ -0,0 +1,256 @@
+import csv
+import io
+import json
+import os
+import tarfile
+import zipfile
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from ..indexes import owner_key
+from ..records import Plan
+from .gantt import gantt_item
+
+
+# Exporters yield pieces of about this size
+EXPORT_CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_BYTES", str(64 * 1024)))
+EXPORT_GZIP_LEVEL = int(os.getenv("EXPORT_GZIP_LEVEL", "6"))
+
+CSV_BATCH_ROWS = 256
+CSV_HEADER = ["Task ID", "Title", "Duration (days)", "Owner", "Start Date", "End Date", "Dependencies"]
+
+# An archive member: file name, modification time, and a function returning its chunks
+Member = Tuple[str, datetime, Callable[[], Iterator[bytes]]]
+
+
+# Same encoding as FastAPI's JSONResponse; one encoder, since json.dumps
+# with options builds a new one per call
+_dumps = json.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode
+
+
+def _chunked(pieces: Iterable[str], chunk_bytes: int = EXPORT_CHUNK_BYTES) -> Iterator[bytes]:
+    """Join small text pieces into encoded chunks of about chunk_bytes"""
+    parts: List[str] = []
+    size = 0
+    for piece in pieces:
+        parts.append(piece)
+        size += len(piece)
+        if size >= chunk_bytes:
+            yield "".join(parts).encode()
+            parts.clear()
+            size = 0
+    if parts:
+        yield "".join(parts).encode()
+
+
+def csv_chunks(plan: Plan, chunk_bytes: int = EXPORT_CHUNK_BYTES) -> Iterator[bytes]:
+    """The plan's tasks as CSV, a chunk at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    tasks = plan.tasks
+    # Rows go to the writer in batches; the buffer is checked between batches
+    for start in range(0, len(tasks), CSV_BATCH_ROWS):
+        writer.writerows(
+            (task.id, task.title, task.duration_days, task.owner or "", task.start_date or "", task.end_date or "", ", ".join(task.dependencies))
+            for task in tasks[start:start + CSV_BATCH_ROWS]
+        )
+        if buffer.tell() >= chunk_bytes:
+            yield buffer.getvalue().encode()
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+    yield buffer.getvalue().encode()
+
+
+def report_chunks(plan: Plan) -> Iterator[bytes]:
+    """Plan.to_dict() as JSON (same bytes as serializing it whole), a chunk at a time"""
+    def pieces():
+        head = _dumps({"plan_id": plan.id, "project_name": plan.project_name})
+        yield head[:-1] + ',"tasks":['
+        for index, task in enumerate(plan.tasks):
+            yield ("," if index else "") + _dumps(task.to_dict())
+        tail = _dumps({
+            "start_date": plan.start_date,
+            "end_date": plan.end_date,
+            "calendar": plan.calendar.model_dump() if plan.calendar else None,
+            "created_at": plan.created_at.isoformat(),
+            "session_id": plan.session_id
+        })
+        yield "]," + tail[1:]
+    return _chunked(pieces())
+
+
+def json_array_chunks(items: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """Objects as a JSON array, a chunk at a time"""
+    def pieces():
+        yield "["
+        for index, item in enumerate(items):
+            yield ("," if index else "") + _dumps(item)
+        yield "]"
+    return _chunked(pieces())
+
+
+def gantt_chunks(plan: Plan) -> Iterator[bytes]:
+    """Timeline items (GanttItem fields) as a JSON array, a chunk at a time"""
+    return json_array_chunks(gantt_item(task) for task in plan.tasks)
+
+
+def jsonl_chunks(plan: Plan) -> Iterator[bytes]:
+    """JSON Lines: one task per line, each tagged with the plan id"""
+    return _chunked(_dumps({"plan_id": plan.id, **task.to_dict()}) + "\n" for task in plan.tasks)
+
+
+# iCalendar lines are at most this many octets before folding (RFC 5545 3.1)
+ICS_LINE_OCTETS = 75
+ICS_PRODID = "-//PLAN//Project Planner//EN"
+
+
+def ics_escape(text: str) -> str:
+    """Escape a TEXT value (RFC 5545 3.3.11)"""
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n").replace("\r", "\\n"))
+
+
+def ics_fold(line: str) -> str:
+    """
+    A content line with its CRLF, folded so no physical line exceeds 75
+    octets; folds never split a UTF-8 character.
+    """
+    if len(line) <= ICS_LINE_OCTETS and (line.isascii() or len(line.encode()) <= ICS_LINE_OCTETS):
+        return line + "\r\n"
+    data = line.encode()
+    parts = []
+    start = 0
+    # Continuation lines start with a space, which counts towards their 75 octets
+    limit = ICS_LINE_OCTETS
+    while len(data) - start > limit:
+        end = start + limit
+        # Back up to the start of a character (continuation bytes are 0b10xxxxxx)
+        while data[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(data[start:end].decode())
+        start = end
+        limit = ICS_LINE_OCTETS - 1
+    parts.append(data[start:].decode())
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _ics_date(value: str) -> str:
+    return value.replace("-", "")
+
+
+def ics_chunks(plan: Plan, owner: Optional[str] = None) -> Iterator[bytes]:
+    """
+    The plan as an iCalendar (RFC 5545) file with one all-day VEVENT per
+    scheduled task, optionally only the tasks of one owner (matched by
+    owner_key, so "Unassigned" or "TBD" selects the unassigned tasks). Task
+    end dates are exclusive, as DTEND is.
+    """
+    filtered = owner is not None
+    wanted = owner_key(owner)
+    stamp = plan.created_at.strftime("%Y%m%dT%H%M%SZ")
+
+    def pieces():
+        yield "BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+        yield ics_fold(f"PRODID:{ICS_PRODID}")
+        yield "CALSCALE:GREGORIAN\r\nMETHOD:PUBLISH\r\n"
+        yield ics_fold(f"X-WR-CALNAME:{ics_escape(plan.project_name or '')}")
+        for task in plan.tasks:
+            if not task.start_date or (filtered and owner_key(task.owner) != wanted):
+                continue
+            lines = [
+                "BEGIN:VEVENT",
+                f"UID:{ics_escape(task.id)}-{plan.id}@plan",
+                f"DTSTAMP:{stamp}",
+                f"DTSTART;VALUE=DATE:{_ics_date(task.start_date)}",
+            ]
+            if task.end_date and task.end_date > task.start_date:
+                lines.append(f"DTEND;VALUE=DATE:{_ics_date(task.end_date)}")
+            lines.append(f"SUMMARY:{ics_escape(task.title)}")
+            details = [f"Duration: {task.duration_days} days"]
+            if task.owner:
+                details.append(f"Owner: {task.owner}")
+                lines.append(f"CATEGORIES:{ics_escape(task.owner)}")
+            if task.dependencies:
+                details.append(f"Depends on: {', '.join(task.dependencies)}")
+            lines.append(f"DESCRIPTION:{ics_escape(chr(10).join(details))}")
+            lines.append("END:VEVENT")
+            yield "".join(ics_fold(line) for line in lines)
+        yield "END:VCALENDAR\r\n"
+    return _chunked(pieces())
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = EXPORT_GZIP_LEVEL) -> Iterator[bytes]:
+    """Compress a chunk stream as gzip (deterministic: no timestamp or name in the header)"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+class _Sink(io.RawIOBase):
+    """Write-only, unseekable file that hands written bytes back on drain()"""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def zip_chunks(members: Iterable[Member]) -> Iterator[bytes]:
+    """
+    A zip archive of the members, written as it goes. zipfile writes to
+    an unseekable file with data descriptors, so nothing is held back
+    beyond the chunk being compressed.
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+        for name, mtime, chunks in members:
+            info = zipfile.ZipInfo(name, date_time=max(mtime, datetime(1980, 1, 1)).timetuple()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(info, mode="w", force_zip64=True) as member:
+                for chunk in chunks():
+                    member.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            yield sink.drain()
+    yield sink.drain()
+
+
+def tar_chunks(members: Iterable[Member]) -> Iterator[bytes]:
+    """
+    A tar archive of the members, written as it goes. Tar headers need the
+    member size up front, so each member is rendered twice: once to
+    measure it, once to send it.
+    """
+    written = 0
+    for name, mtime, chunks in members:
+        info = tarfile.TarInfo(name)
+        info.size = sum(len(chunk) for chunk in chunks())
+        # Plan times are naive UTC
+        info.mtime = int(mtime.replace(tzinfo=mtime.tzinfo or timezone.utc).timestamp())
+        info.mode = 0o644
+        header = info.tobuf(format=tarfile.PAX_FORMAT)
+        yield header
+        for chunk in chunks():
+            yield chunk
+        padding = -info.size % tarfile.BLOCKSIZE
+        yield b"\0" * padding
+        written += len(header) + info.size + padding
+    # End-of-archive blocks, then pad to a whole record like tarfile does
+    end = 2 * tarfile.BLOCKSIZE
+    end += -(written + end) % tarfile.RECORDSIZE
+    yield b"\0" * end
@@ -0,0 +1,212 @@
+import os
+from bisect import bisect_left
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from ..records import Plan, PlanTask
+from ..store import BoundedStore
+
+
+# Plans whose Gantt indexes are kept, and for how long
+GANTT_INDEX_PLANS = int(os.getenv("GANTT_INDEX_PLANS", "200"))
+GANTT_INDEX_TTL_SECONDS = float(os.getenv("GANTT_INDEX_TTL_SECONDS", "3600"))
+
+# Aggregated zoom levels; "task" is one item per task
+ZOOM_LEVELS = ("task", "week", "month")
+
+INDEX_OVERHEAD = 500
+INDEX_ITEM_BYTES = 120
+UNASSIGNED = "Unassigned"
+
+
+def _ordinal(value: str) -> int:
+    return date.fromisoformat(value[:10]).toordinal()
+
+
+def _iso(ordinal: int) -> str:
+    return date.fromordinal(ordinal).isoformat()
+
+
+class IntervalIndex:
+    """
+    Static interval index over half-open [start, end) ordinals.
+
+    Items are sorted by start, with a max-end segment tree on top: a query
+    only visits subtrees that can hold an overlapping item and stops at the
+    first start past the window, so it costs O(log n + matches).
+    """
+
+    def __init__(self, intervals: Sequence[Tuple[int, int, Any]]):
+        ordered = sorted(intervals, key=lambda interval: interval[0])
+        self.starts = [interval[0] for interval in ordered]
+        self.ends = [interval[1] for interval in ordered]
+        self.items = [interval[2] for interval in ordered]
+        size = 1
+        while size < len(ordered):
+            size *= 2
+        self._size = size
+        tree = [-1] * (2 * size)
+        tree[size:size + len(ordered)] = self.ends
+        for node in range(size - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self._max_end = tree
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def overlapping(self, start: int, end: int) -> List[Any]:
+        """Items with item.start < end and item.end > start, in start order"""
+        limit = bisect_left(self.starts, end)
+        if not limit:
+            return []
+        tree, size, found = self._max_end, self._size, []
+        # Depth-first over nodes covering [0, limit), left to right
+        stack = [(1, 0, size)]
+        while stack:
+            node, low, high = stack.pop()
+            if low >= limit or tree[node] <= start:
+                continue
+            if node >= size:
+                found.append(low)
+                continue
+            middle = (low + high) // 2
+            stack.append((2 * node + 1, middle, high))
+            stack.append((2 * node, low, middle))
+        return [self.items[position] for position in found]
+
+
+def _period_start(ordinal: int, zoom: str) -> int:
+    day = date.fromordinal(ordinal)
+    if zoom == "week":
+        return ordinal - day.weekday()
+    return day.replace(day=1).toordinal()
+
+
+def _next_period(ordinal: int, zoom: str) -> int:
+    if zoom == "week":
+        return ordinal + 7
+    day = date.fromordinal(ordinal)
+    return (day.replace(year=day.year + 1, month=1) if day.month == 12 else day.replace(month=day.month + 1)).toordinal()
+
+
+class GanttIndex:
+    """
+    Timeline lookups for one plan, built once: an interval index over its
+    scheduled tasks, and per zoom level an index over per-owner bars (one
+    per owner and week or month, spanning that owner's work in the period).
+    """
+
+    def __init__(self, plan: Plan):
+        intervals = []
+        for task in plan.tasks:
+            if task.start_date and task.end_date:
+                start = _ordinal(task.start_date)
+                # Same-day tasks still occupy their day
+                intervals.append((start, max(_ordinal(task.end_date), start + 1), task))
+        self.tasks = IntervalIndex(intervals)
+        self._bars: Dict[str, IntervalIndex] = {}
+
+    def bars(self, zoom: str) -> IntervalIndex:
+        index = self._bars.get(zoom)
+        if index is None:
+            index = self._bars[zoom] = IntervalIndex(self._aggregate(zoom))
+        return index
+
+    def _aggregate(self, zoom: str) -> List[Tuple[int, int, Dict[str, Any]]]:
+        # (owner, period start) -> [first day, end, task count]
+        periods: Dict[Tuple[str, int], List[int]] = {}
+        for start, end, task in zip(self.tasks.starts, self.tasks.ends, self.tasks.items):
+            owner = task.owner or UNASSIGNED
+            period = _period_start(start, zoom)
+            while period < end:
+                following = _next_period(period, zoom)
+                first, last = max(start, period), min(end, following)
+                bar = periods.get((owner, period))
+                if bar is None:
+                    periods[(owner, period)] = [first, last, 1]
+                else:
+                    bar[0] = min(bar[0], first)
+                    bar[1] = max(bar[1], last)
+                    bar[2] += 1
+                period = following
+        return [
+            (first, last, {
+                "id": f"{owner}:{_iso(period)}",
+                "content": f"{count} task{'s' if count != 1 else ''}",
+                "start": _iso(first),
+                "end": _iso(last),
+                "group": owner,
+                "task_count": count,
+            })
+            for (owner, period), (first, last, count) in periods.items()
+        ]
+
+    def approx_bytes(self) -> int:
+        return INDEX_OVERHEAD + INDEX_ITEM_BYTES * (len(self.tasks) + sum(len(bars) for bars in self._bars.values()))
+
+    def items(self, zoom: str, start: Optional[int], end: Optional[int]) -> List[Dict[str, Any]]:
+        """GanttItem dicts overlapping [start, end) (open-ended when None) at a zoom level"""
+        index = self.tasks if zoom == "task" else self.bars(zoom)
+        if start is None and end is None:
+            matches = index.items
+        else:
+            matches = index.overlapping(start if start is not None else -1, end if end is not None else date.max.toordinal() + 1)
+        if zoom != "task":
+            return matches
+        return [gantt_item(task) for task in matches]
+
+
+def gantt_item(task: PlanTask) -> Dict[str, Any]:
+    """A task as GanttItem fields"""
+    return {"id": task.id, "content": task.title, "start": task.start_date, "end": task.end_date, "group": task.owner or UNASSIGNED}
+
+
+def parse_window(zoom: str, start: Optional[str], end: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """Window bounds as ordinals; ValueError for an unknown zoom or bad dates"""
+    if zoom not in ZOOM_LEVELS:
+        raise ValueError(f"zoom must be one of: {', '.join(ZOOM_LEVELS)}")
+    try:
+        start_ordinal = date.fromisoformat(start).toordinal() if start else None
+        end_ordinal = date.fromisoformat(end).toordinal() if end else None
+    except ValueError:
+        raise ValueError("start and end must be dates (YYYY-MM-DD)")
+    if start_ordinal is not None and end_ordinal is not None and end_ordinal <= start_ordinal:
+        raise ValueError("end must be after start")
+    return start_ordinal, end_ordinal
+
+
+def _sizeof(index: GanttIndex) -> int:
+    return index.approx_bytes()
+
+
+class GanttIndexes:
+    """
+    GanttIndex per plan, built on the first windowed or zoomed request and
+    reused afterwards. Keyed by plan id and content hash like PlanBodies.
+    """
+
+    def __init__(self, max_entries: int = GANTT_INDEX_PLANS, ttl_seconds: float = GANTT_INDEX_TTL_SECONDS):
+        self._indexes = BoundedStore("gantt_indexes", max_entries, ttl_seconds, _sizeof)
+        self.hits = 0
+        self.builds = 0
+
+    def window(self, plan: Plan, zoom: str, start: Optional[int], end: Optional[int]) -> List[Dict[str, Any]]:
+        """Items overlapping [start, end) at a zoom level, as returned by parse_window()"""
+        key = f"{plan.id}:{plan.etag}"
+        index = self._indexes.get(key)
+        if index is None:
+            self.builds += 1
+            index = self._indexes[key] = GanttIndex(plan)
+        else:
+            self.hits += 1
+        size = index.approx_bytes()
+        items = index.items(zoom, start, end)
+        # The first request at a zoom level builds its bars
+        if index.approx_bytes() != size:
+            self._indexes.resize(key)
+        return items
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "builds": self.builds, **self._indexes.stats()}
+
+
+gantt_indexes = GanttIndexes()
@@ -0,0 +1,70 @@
+from typing import List, Dict, Optional
+from ..models.schemas import Task
+
+
+class TaskGraph:
+    """
+    Flat, index-based view of a task list.
+    Built once per plan so repeated schedule evaluations (simulation runs,
+    what-if scenarios) only walk integer arrays in topological order.
+    """
+
+    def __init__(self, tasks: List[Task]):
+        self.ids: List[str] = [task.id for task in tasks]
+        self.index: Dict[str, int] = {task_id: i for i, task_id in enumerate(self.ids)}
+        self.titles: List[str] = [task.title for task in tasks]
+        self.owners: List[Optional[str]] = [task.owner for task in tasks]
+        self.durations: List[int] = [task.duration_days for task in tasks]
+
+        # Unknown dependency ids are ignored, same as the scheduler
+        self.preds: List[List[int]] = [
+            [self.index[dep] for dep in task.dependencies if dep in self.index and dep != task.id]
+            for task in tasks
+        ]
+        self.succs: List[List[int]] = [[] for _ in tasks]
+        for i, preds in enumerate(self.preds):
+            for p in preds:
+                self.succs[p].append(i)
+
+        self.order: List[int] = self._topological_order()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _topological_order(self) -> List[int]:
+        """Kahn's algorithm; raises ValueError if the dependencies form a cycle"""
+        indegree = [len(set(preds)) for preds in self.preds]
+        ready = [i for i, deg in enumerate(indegree) if deg == 0]
+        order: List[int] = []
+
+        while ready:
+            i = ready.pop()
+            order.append(i)
+            for s in set(self.succs[i]):
+                indegree[s] -= 1
+                if indegree[s] == 0:
+                    ready.append(s)
+
+        if len(order) != len(self.ids):
+            cyclic = [self.ids[i] for i, deg in enumerate(indegree) if deg > 0]
+            raise ValueError(f"Dependency cycle detected between tasks: {', '.join(cyclic)}")
+
+        return order
+
+    def forward_pass(self, durations: Optional[List[float]] = None) -> List[float]:
+        """
+        Earliest finish offset (in working days from the plan start) for every task.
+        A task starts as soon as its latest dependency finishes.
+        """
+        durations = durations if durations is not None else self.durations
+        finish = [0.0] * len(self.ids)
+        preds = self.preds
+
+        for i in self.order:
+            start = 0.0
+            for p in preds[i]:
+                if finish[p] > start:
+                    start = finish[p]
+            finish[i] = start + durations[i]
+
+        return finish
@@ -0,0 +1,162 @@
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from ..records import Plan, PlanTask, TASK_FIELDS
+from ..store import BoundedStore
+from .pmap import PersistentMap
+
+
+# Versions kept per session; older ones are dropped (their shared tasks live on)
+PLAN_HISTORY_LIMIT = int(os.getenv("PLAN_HISTORY_LIMIT", "50"))
+PLAN_HISTORY_SESSIONS = int(os.getenv("PLAN_HISTORY_SESSIONS", "10000"))
+PLAN_HISTORY_TTL_SECONDS = float(os.getenv("PLAN_HISTORY_TTL_SECONDS", os.getenv("SESSION_TTL_SECONDS", "86400")))
+
+DATE_FIELDS = ("start_date", "end_date")
+VERSION_OVERHEAD = 300
+CHANGED_TASK_BYTES = 600  # New trie path plus task object per changed task
+
+
+def _day_shift(before: Optional[str], after: Optional[str]) -> Optional[int]:
+    if not before or not after:
+        return None
+    return (datetime.strptime(after[:10], "%Y-%m-%d") - datetime.strptime(before[:10], "%Y-%m-%d")).days
+
+
+class PlanVersion:
+    __slots__ = ("version", "plan_id", "created_at", "start_date", "end_date", "tasks")
+
+    def __init__(self, version: int, plan: Plan, tasks: PersistentMap):
+        self.version = version
+        self.plan_id = plan.id
+        self.created_at = plan.created_at
+        self.start_date = plan.start_date
+        self.end_date = plan.end_date
+        self.tasks = tasks
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "plan_id": self.plan_id,
+            "created_at": self.created_at.isoformat(),
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "task_count": len(self.tasks),
+        }
+
+
+class PlanHistory:
+    """
+    Successive plans generated for one session.
+    Each version's tasks are a PersistentMap of id -> PlanTask derived from the
+    previous version: unchanged tasks keep the same PlanTask object (the plan
+    itself is rewired to share it) and the same trie nodes, so a version costs
+    memory in proportion to what changed and diff() only visits changed paths.
+    """
+
+    def __init__(self, session_id: str, limit: int = PLAN_HISTORY_LIMIT):
+        self.session_id = session_id
+        self.limit = limit
+        self.versions: List[PlanVersion] = []
+        self.approx_bytes = 0
+
+    def record(self, plan: Plan) -> PlanVersion:
+        """Add a plan as the next version, sharing unchanged tasks with the previous one"""
+        previous = self.versions[-1].tasks if self.versions else PersistentMap()
+        tasks = previous
+        shared: List[PlanTask] = []
+        seen = set()
+        changed = 0
+        for task in plan.tasks:
+            seen.add(task.id)
+            old = previous.get(task.id)
+            if old is not None and old.astuple() == task.astuple():
+                shared.append(old)
+                continue
+            shared.append(task)
+            tasks = tasks.set(task.id, task)
+            changed += 1
+        for task_id, _ in previous.items():
+            if task_id not in seen:
+                tasks = tasks.delete(task_id)
+                changed += 1
+        plan.tasks = tuple(shared)
+
+        version = PlanVersion(self.versions[-1].version + 1 if self.versions else 1, plan, tasks)
+        self.versions.append(version)
+        self.approx_bytes += VERSION_OVERHEAD + CHANGED_TASK_BYTES * changed
+        if len(self.versions) > self.limit:
+            del self.versions[:len(self.versions) - self.limit]
+        return version
+
+    def version_of(self, plan_id: str) -> Optional[int]:
+        for version in reversed(self.versions):
+            if version.plan_id == plan_id:
+                return version.version
+        return None
+
+    def get(self, version: int) -> Optional[PlanVersion]:
+        # Versions are consecutive, so the position follows from the first kept one
+        if not self.versions:
+            return None
+        i = version - self.versions[0].version
+        return self.versions[i] if 0 <= i < len(self.versions) else None
+
+    def diff(self, old: PlanVersion, new: PlanVersion) -> Dict[str, Any]:
+        """Task-level changes from `old` to `new`"""
+        added, removed, changed = old.tasks.diff(new.tasks)
+        moved = []
+        updated = []
+        for task_id, (before, after) in changed.items():
+            if any(getattr(before, f) != getattr(after, f) for f in DATE_FIELDS):
+                moved.append({
+                    "id": task_id,
+                    "title": after.title,
+                    "old_start_date": before.start_date,
+                    "old_end_date": before.end_date,
+                    "start_date": after.start_date,
+                    "end_date": after.end_date,
+                    "start_shift": _day_shift(before.start_date, after.start_date),
+                    "end_shift": _day_shift(before.end_date, after.end_date),
+                })
+            fields = {
+                name: getattr(after, name)
+                for name in TASK_FIELDS
+                if name not in DATE_FIELDS and getattr(before, name) != getattr(after, name)
+            }
+            if fields:
+                if "dependencies" in fields:
+                    fields["dependencies"] = list(fields["dependencies"])
+                updated.append({"id": task_id, "changes": fields})
+
+        by_id = lambda item: item["id"]
+        return {
+            "session_id": self.session_id,
+            "from_version": old.version,
+            "to_version": new.version,
+            "added": sorted((task.to_dict() for task in added.values()), key=by_id),
+            "removed": sorted((task.to_dict() for task in removed.values()), key=by_id),
+            "moved": sorted(moved, key=by_id),
+            "updated": sorted(updated, key=by_id),
+        }
+
+
+def _sizeof(history: PlanHistory) -> int:
+    return history.approx_bytes
+
+
+_histories = BoundedStore("plan_history", PLAN_HISTORY_SESSIONS, PLAN_HISTORY_TTL_SECONDS, _sizeof)
+
+
+def record_plan_version(session_id: str, plan: Plan) -> PlanVersion:
+    """Append a freshly generated plan to its session's history (call before storing it)"""
+    history = _histories.get(session_id)
+    if history is None:
+        history = PlanHistory(session_id)
+        _histories[session_id] = history
+    version = history.record(plan)
+    _histories.resize(session_id)
+    return version
+
+
+def get_plan_history(session_id: str) -> Optional[PlanHistory]:
+    return _histories.get(session_id)
@@ -0,0 +1,104 @@
+import asyncio
+import hashlib
+import os
+from typing import Awaitable, Callable, Dict, Optional
+from fastapi import HTTPException
+from fastapi.responses import Response
+from pydantic import BaseModel
+from ..store import BoundedStore
+
+
+# Completed responses kept for retries, and for how long
+IDEMPOTENCY_ENTRIES = int(os.getenv("IDEMPOTENCY_ENTRIES", "10000"))
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+ENTRY_OVERHEAD = 300
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "task", "body")
+
+    def __init__(self, fingerprint: bytes):
+        self.fingerprint = fingerprint
+        self.task: Optional[asyncio.Task] = None
+        self.body: Optional[bytes] = None
+
+
+def _sizeof(entry: _Entry) -> int:
+    return ENTRY_OVERHEAD + len(entry.body or b"")
+
+
+class IdempotencyCache:
+    """
+    Responses of requests sent with an Idempotency-Key, keyed by (route,
+    session, key).
+
+    The first request runs as a task owned by the entry, so it finishes
+    even if its client disconnects: the client is expected to retry.
+    Duplicates that arrive while it runs wait for it; later ones get the
+    stored JSON body as is, without touching the session or the LLM.
+    Failed requests are not stored, so retrying them runs them again.
+    """
+
+    def __init__(self, max_entries: int = IDEMPOTENCY_ENTRIES, ttl_seconds: float = IDEMPOTENCY_TTL_SECONDS):
+        self._entries = BoundedStore("idempotency", max_entries, ttl_seconds, _sizeof)
+        self.runs = 0
+        self.waited = 0
+        self.replayed = 0
+
+    async def respond(self, route: str, session_id: Optional[str], key: str, request: BaseModel,
+                      handler: Callable[[], Awaitable[BaseModel]]) -> Response:
+        if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            raise HTTPException(status_code=400, detail=f"Idempotency-Key must be 1-{IDEMPOTENCY_KEY_MAX_LENGTH} characters")
+        cache_key = f"{route}\x00{session_id or ''}\x00{key}"
+        fingerprint = hashlib.sha256(request.model_dump_json().encode()).digest()
+
+        entry = self._entries.get(cache_key)
+        if entry is not None and entry.fingerprint != fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+        if entry is not None and entry.body is not None:
+            self.replayed += 1
+            return self._response(entry.body, replayed=True)
+        if entry is not None:
+            self.waited += 1
+            body = await asyncio.shield(entry.task)
+            return self._response(body, replayed=True)
+
+        entry = _Entry(fingerprint)
+        entry.task = asyncio.create_task(self._run(cache_key, entry, handler))
+        # Its callers may all be gone by the time it fails
+        entry.task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        self._entries[cache_key] = entry
+        self.runs += 1
+        return self._response(await asyncio.shield(entry.task), replayed=False)
+
+    async def _run(self, cache_key: str, entry: _Entry, handler: Callable[[], Awaitable[BaseModel]]) -> bytes:
+        try:
+            entry.body = (await handler()).model_dump_json().encode()
+        except BaseException:
+            if self._entries.get(cache_key) is entry:
+                self._entries.pop(cache_key)
+            raise
+        self._entries.resize(cache_key)
+        return entry.body
+
+    @staticmethod
+    def _response(body: bytes, replayed: bool) -> Response:
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers={"Idempotent-Replayed": "true" if replayed else "false"}
+        )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._entries.bytes,
+            "runs": self.runs,
+            "waited": self.waited,
+            "replayed": self.replayed,
+        }
+
+
+idempotency_cache = IdempotencyCache()
@@ -0,0 +1,344 @@
+import codecs
+import csv
+import json
+import os
+import re
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from pydantic import TypeAdapter, ValidationError
+from ..models.schemas import Task
+from .exporters import CSV_HEADER
+
+
+# Limits on one import request
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(50 * 1024 * 1024)))
+IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", "100000"))
+# Errors listed in a rejected import's response (all are counted)
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "100"))
+
+IMPORT_BATCH_ROWS = 1000
+
+# CSV columns, by export_csv header or Task field name
+CSV_COLUMNS = {
+    **dict(zip((name.casefold() for name in CSV_HEADER), ["id", "title", "duration_days", "owner", "start_date", "end_date", "dependencies"])),
+    **{name: name for name in Task.model_fields},
+}
+CSV_REQUIRED = ("id", "title", "duration_days")
+
+# Row number and the row as parsed
+Row = Tuple[int, Dict[str, Any]]
+
+_validate_batch = TypeAdapter(List[Task]).validate_python
+
+
+class ImportRejected(ValueError):
+    """The import was rejected; errors lists {row, id, field, message} per problem found"""
+
+    def __init__(self, message: str, errors: Optional[List[Dict[str, Any]]] = None, error_count: int = 0):
+        super().__init__(message)
+        self.errors = errors or []
+        self.error_count = error_count or len(self.errors)
+
+
+class ImportTooLarge(ValueError):
+    pass
+
+
+async def _text(chunks: AsyncIterator[bytes], max_bytes: int = IMPORT_MAX_BYTES) -> AsyncIterator[str]:
+    """Decode a byte stream as UTF-8 (a leading BOM is dropped), enforcing max_bytes"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    size = 0
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                raise ImportTooLarge(f"Import body is larger than {max_bytes} bytes")
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise ImportRejected("Import body is not valid UTF-8")
+    if tail:
+        yield tail
+
+
+def _csv_row(header: List[Optional[str]], values: List[str]) -> Dict[str, Any]:
+    row: Dict[str, Any] = {}
+    for field, value in zip(header, values):
+        if field is None:
+            continue
+        value = value.strip()
+        if field == "dependencies":
+            row[field] = [dep.strip() for dep in value.split(",") if dep.strip()] if value else []
+        elif value:
+            row[field] = value
+    return row
+
+
+async def _csv_records(texts: AsyncIterator[str]) -> AsyncIterator[List[str]]:
+    """Whole CSV records, a chunk's worth at a time"""
+    pending = ""
+    async for text in texts:
+        lines = (pending + text).split("\n")
+        pending = lines.pop()
+        # A line end closes a record when the quotes before it are balanced
+        records, record, quotes = [], [], 0
+        for line in lines:
+            record.append(line)
+            quotes += line.count('"')
+            if not quotes % 2:
+                records.append("\n".join(record))
+                record, quotes = [], 0
+        if record:
+            pending = "\n".join(record) + "\n" + pending
+        if records:
+            yield records
+    if pending.strip():
+        yield [pending]
+
+
+async def csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Row]:
+    """
+    Task dicts from a CSV stream whose header uses export_csv's column names
+    (or Task field names); other columns are ignored. Row numbers count the
+    header as row 1, like a spreadsheet. Records are only cut at line ends
+    outside quotes, so quoted fields may hold newlines across chunks.
+    """
+    header: Optional[List[Optional[str]]] = None
+    number = 0
+    yielded = False
+    async for records in _csv_records(_text(chunks)):
+        try:
+            for values in csv.reader(records):
+                number += 1
+                if header is None:
+                    header = [CSV_COLUMNS.get(name.strip().casefold()) for name in values]
+                    missing = [field for field in CSV_REQUIRED if field not in header]
+                    if missing:
+                        raise ImportRejected(f"CSV header has no column for: {', '.join(missing)}")
+                elif any(value.strip() for value in values):
+                    yielded = True
+                    yield number, _csv_row(header, values)
+        except csv.Error as e:
+            raise ImportRejected(f"Invalid CSV at row {number + 1}: {e}")
+    if header is None:
+        raise ImportRejected("CSV is empty")
+    # An empty upload must not replace the session's tasks with none
+    if not yielded:
+        raise ImportRejected("CSV holds no tasks")
+
+
+_SPACE = re.compile(r"[ \t\n\r]*").match
+
+
+class _JSONStream:
+    """
+    Incremental reader of JSON values from text chunks. A value cut off by
+    the end of the buffer is retried only once the buffer has doubled, so
+    a large value is not re-scanned for every chunk.
+    """
+
+    def __init__(self, texts: AsyncIterator[str]):
+        self._texts = texts.__aiter__()
+        self._decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+        # Characters dropped from the front of the buffer so far
+        self.offset = 0
+        self.done = False
+
+    async def _fill(self, size: int) -> bool:
+        """Buffer at least size characters past position; False if the stream ends first"""
+        available = len(self.buffer) - self.position
+        if available >= size:
+            return True
+        parts = [self.buffer[self.position:]]
+        while available < size and not self.done:
+            try:
+                text = await self._texts.__anext__()
+            except StopAsyncIteration:
+                self.done = True
+                break
+            parts.append(text)
+            available += len(text)
+        self.offset += self.position
+        self.buffer = "".join(parts)
+        self.position = 0
+        return available >= size
+
+    async def peek(self) -> str:
+        """The next non-whitespace character ("" at the end)"""
+        while True:
+            self.position = _SPACE(self.buffer, self.position).end()
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not await self._fill(1):
+                return ""
+
+    def skip(self):
+        self.position += 1
+
+    async def value(self) -> Any:
+        await self.peek()
+        wanted = 0
+        while True:
+            await self._fill(wanted)
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError as e:
+                if self.done:
+                    raise ImportRejected(f"Invalid JSON at character {self.offset + e.pos}: {e.msg}")
+                wanted = 2 * (len(self.buffer) - self.position)
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end < len(self.buffer) or self.done or not isinstance(value, (int, float)):
+                self.position = end
+                return value
+            wanted = len(self.buffer) - self.position + 1
+
+
+async def json_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Row]:
+    """
+    Task dicts from a JSON stream: an array of tasks (read an element at a
+    time), JSON Lines as written by the jsonl export, or objects with a
+    "tasks" list such as the report export. Rows are numbered from 1.
+    """
+    stream = _JSONStream(_text(chunks))
+    number = 0
+    while True:
+        first = await stream.peek()
+        if not first:
+            break
+        if first != "[":
+            value = await stream.value()
+            for row in value["tasks"] if isinstance(value, dict) and isinstance(value.get("tasks"), list) else [value]:
+                number += 1
+                yield number, row
+            continue
+        stream.skip()
+        if await stream.peek() == "]":
+            stream.skip()
+            continue
+        while True:
+            number += 1
+            yield number, await stream.value()
+            separator = await stream.peek()
+            stream.skip()
+            if separator == "]":
+                break
+            if separator != ",":
+                raise ImportRejected(f"Invalid JSON at character {stream.offset + stream.position - 1}: expected ',' or ']' after row {number}")
+    if not number:
+        raise ImportRejected("JSON holds no tasks")
+
+
+def _error(row: Optional[int], task_id: Any, field: Optional[str], message: str) -> Dict[str, Any]:
+    return {"row": row, "id": task_id if isinstance(task_id, str) else None, "field": field, "message": message}
+
+
+class TaskImport:
+    """
+    Collects parsed rows, validating them against Task a batch at a time,
+    then resolves dependencies. Rows are only kept while every row so far
+    is valid; after the first error, later rows are validated for their
+    errors alone.
+    """
+
+    def __init__(self, max_rows: int = IMPORT_MAX_ROWS):
+        self.max_rows = max_rows
+        self.tasks: List[Task] = []
+        self.rows: List[int] = []
+        self.errors: List[Dict[str, Any]] = []
+        self.error_count = 0
+        self.count = 0
+        self._batch: List[Row] = []
+
+    def _add_error(self, error: Dict[str, Any]):
+        self.error_count += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append(error)
+
+    def add(self, number: int, row: Any):
+        self.count += 1
+        if self.count > self.max_rows:
+            raise ImportTooLarge(f"At most {self.max_rows} tasks per import")
+        if not isinstance(row, dict):
+            self._add_error(_error(number, None, None, "Expected a task object"))
+            return
+        self._batch.append((number, row))
+        if len(self._batch) >= IMPORT_BATCH_ROWS:
+            self.flush()
+
+    def flush(self):
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+        try:
+            tasks = _validate_batch([row for _, row in batch])
+        except ValidationError as e:
+            for detail in e.errors(include_url=False):
+                number, row = batch[detail["loc"][0]]
+                field = ".".join(str(part) for part in detail["loc"][1:]) or None
+                self._add_error(_error(number, row.get("id"), field, detail["msg"]))
+            return
+        if not self.error_count:
+            self.tasks.extend(tasks)
+            self.rows.extend(number for number, _ in batch)
+
+    def finish(self) -> List[Task]:
+        """
+        The validated tasks with dependencies resolved to task ids. A
+        reference that is not an id may name a task by title (trimmed,
+        case-insensitive) when exactly one task has that title. Cycles are
+        left to the scheduler. Raises ImportRejected listing every problem.
+        """
+        self.flush()
+        if not self.error_count:
+            self._resolve()
+        if self.error_count:
+            raise ImportRejected(f"{self.error_count} problem(s) in the imported tasks", self.errors, self.error_count)
+        return self.tasks
+
+    def _resolve(self):
+        rows: Dict[str, int] = {}
+        for task, number in zip(self.tasks, self.rows):
+            if task.id in rows:
+                self._add_error(_error(number, task.id, "id", f"Duplicate task id (first used in row {rows[task.id]})"))
+            else:
+                rows[task.id] = number
+        titles: Optional[Dict[str, List[str]]] = None
+
+        for task, number in zip(self.tasks, self.rows):
+            dependencies = task.dependencies
+            # Usual case: every reference is another task's id
+            if task.id not in dependencies and all(dep in rows for dep in dependencies) and len(set(dependencies)) == len(dependencies):
+                continue
+            if titles is None:
+                titles = defaultdict(list)
+                for other in self.tasks:
+                    titles[other.title.strip().casefold()].append(other.id)
+            resolved = []
+            for reference in dependencies:
+                if reference in rows:
+                    dep = reference
+                else:
+                    matches = titles.get(reference.strip().casefold(), [])
+                    if len(matches) != 1:
+                        problem = "is ambiguous (several tasks have that title)" if matches else "matches no task id or title"
+                        self._add_error(_error(number, task.id, "dependencies", f"Dependency '{reference}' {problem}"))
+                        continue
+                    dep = matches[0]
+                if dep == task.id:
+                    self._add_error(_error(number, task.id, "dependencies", "Task depends on itself"))
+                elif dep not in resolved:
+                    resolved.append(dep)
+            task.dependencies = resolved
+
+
+async def import_tasks(rows: AsyncIterator[Row], max_rows: int = IMPORT_MAX_ROWS) -> List[Task]:
+    """Validate streamed rows and resolve their dependencies; raises ImportRejected or ImportTooLarge"""
+    result = TaskImport(max_rows)
+    async for number, row in rows:
+        result.add(number, row)
+    return result.finish()
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import httpx
 import json
@@ -8,8 +9,14 @@ class LLMClient:
     """
     Modular LLM client wrapper with OpenAI-compatible interface.
     Supports GROQ, OpenAI, Anthropic, or any provider by changing BASE_URL.
+    Cancelling the awaiting task aborts the HTTP request (the connection is
+    closed, so the provider stops generating); such calls are counted in
+    cancelled_calls.
     """
     
+    # Calls abandoned because the task awaiting them was cancelled (all instances)
+    cancelled_calls = 0
+    
     def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None, timeout: int = 60):
         self.base_url = base_url or os.getenv("LLM_BASE_URL", "https://api.groq.com/openai/v1")
         self.api_key = api_key or os.getenv("LLM_API_KEY")
@@ -57,6 +64,9 @@ class LLMClient:
             raise Exception(f"LLM API call failed: {e.response.status_code} - {error_detail}")
         except httpx.HTTPError as e:
             raise Exception(f"LLM API call failed: {str(e)}")
+        except asyncio.CancelledError:
+            LLMClient.cancelled_calls += 1
+            raise
     
     async def extract_json(self, messages: List[Dict[str, str]], schema_prompt: str, model: str = "openai/gpt-oss-20b", max_retries: int = 2) -> Dict[str, Any]:
         """
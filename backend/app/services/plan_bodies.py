@@ -0,0 +1,55 @@
+import os
+from typing import Callable, Dict
+from ..records import Plan
+from ..store import BoundedStore
+
+
+# Plans whose rendered report/gantt/CSV bodies are kept, and for how long
+PLAN_BODY_ENTRIES = int(os.getenv("PLAN_BODY_ENTRIES", "1000"))
+PLAN_BODY_TTL_SECONDS = float(os.getenv("PLAN_BODY_TTL_SECONDS", "3600"))
+# Larger plans are streamed on every request instead of being kept whole
+PLAN_BODY_MAX_TASKS = int(os.getenv("PLAN_BODY_MAX_TASKS", "5000"))
+
+ENTRY_OVERHEAD = 200
+
+
+def _sizeof(bodies: Dict[str, bytes]) -> int:
+    return ENTRY_OVERHEAD + sum(len(body) for body in bodies.values())
+
+
+class PlanBodies:
+    """
+    Serialized responses per plan. A stored plan never changes, so each
+    representation is rendered once and served as bytes afterwards. Entries
+    are keyed by plan id and content hash, so a different plan stored
+    under the same id is never served an old body.
+    """
+
+    def __init__(self, max_entries: int = PLAN_BODY_ENTRIES, ttl_seconds: float = PLAN_BODY_TTL_SECONDS):
+        self._bodies = BoundedStore("plan_bodies", max_entries, ttl_seconds, _sizeof)
+        self.hits = 0
+        self.misses = 0
+
+    def memoizable(self, plan: Plan) -> bool:
+        return len(plan.tasks) <= PLAN_BODY_MAX_TASKS
+
+    def get(self, plan: Plan, kind: str, render: Callable[[Plan], bytes]) -> bytes:
+        key = f"{plan.id}:{plan.etag}"
+        bodies = self._bodies.get(key)
+        if bodies is None:
+            bodies = {}
+            self._bodies[key] = bodies
+        body = bodies.get(kind)
+        if body is not None:
+            self.hits += 1
+            return body
+        self.misses += 1
+        body = bodies[kind] = render(plan)
+        self._bodies.resize(key)
+        return body
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, **self._bodies.stats()}
+
+
+plan_bodies = PlanBodies()
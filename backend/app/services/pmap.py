@@ -0,0 +1,210 @@
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+
+BITS = 5
+WIDTH = 1 << BITS
+MASK = WIDTH - 1
+# Below this depth the hash bits run out; colliding keys share a bucket leaf
+MAX_DEPTH = 64 // BITS
+
+_EMPTY_SLOTS: Tuple[Any, ...] = (None,) * WIDTH
+
+
+class _Leaf:
+    __slots__ = ("key", "value")
+
+    def __init__(self, key, value):
+        self.key = key
+        self.value = value
+
+
+class _Bucket:
+    """Keys whose hashes are equal in every bit the trie looks at"""
+
+    __slots__ = ("items",)
+
+    def __init__(self, items: Tuple[Tuple[Any, Any], ...]):
+        self.items = items
+
+
+class _Node:
+    __slots__ = ("slots",)
+
+    def __init__(self, slots: Tuple[Any, ...]):
+        self.slots = slots
+
+
+def _slot(h: int, depth: int) -> int:
+    return (h >> (depth * BITS)) & MASK
+
+
+class PersistentMap:
+    """
+    Immutable hash trie (HAMT without bitmap compression).
+    set()/delete() return a new map that shares every untouched node with the
+    old one, so successive versions of a large map cost O(changes * depth)
+    memory. diff() walks two maps together and skips subtrees they share, so
+    it only touches the parts that differ.
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, root: Optional[_Node] = None, size: int = 0):
+        self._root = root or _Node(_EMPTY_SLOTS)
+        self._size = size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        node = self._root
+        for depth in range(MAX_DEPTH + 1):
+            child = node.slots[_slot(h, depth)]
+            if child is None:
+                return default
+            if isinstance(child, _Leaf):
+                return child.value if child.key == key else default
+            if isinstance(child, _Bucket):
+                for k, v in child.items:
+                    if k == key:
+                        return v
+                return default
+            node = child
+        return default
+
+    def set(self, key: Hashable, value: Any) -> "PersistentMap":
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        root, added = self._set(self._root, key, value, h, 0)
+        if root is self._root:
+            return self
+        return PersistentMap(root, self._size + added)
+
+    def _set(self, node: _Node, key, value, h: int, depth: int) -> Tuple[_Node, int]:
+        i = _slot(h, depth)
+        child = node.slots[i]
+        added = 0
+        if child is None:
+            new_child, added = _Leaf(key, value), 1
+        elif isinstance(child, _Leaf):
+            if child.key == key:
+                if child.value is value:
+                    return node, 0
+                new_child = _Leaf(key, value)
+            else:
+                new_child, added = self._split(child, key, value, h, depth + 1), 1
+        elif isinstance(child, _Bucket):
+            items = [(k, v) for k, v in child.items if k != key]
+            added = 1 if len(items) == len(child.items) else 0
+            new_child = _Bucket(tuple(items) + ((key, value),))
+        else:
+            new_child, added = self._set(child, key, value, h, depth + 1)
+            if new_child is child:
+                return node, 0
+        slots = list(node.slots)
+        slots[i] = new_child
+        return _Node(tuple(slots)), added
+
+    def _split(self, leaf: _Leaf, key, value, h: int, depth: int):
+        """Push an existing leaf one level down to make room for a new key"""
+        if depth > MAX_DEPTH:
+            return _Bucket(((leaf.key, leaf.value), (key, value)))
+        other = hash(leaf.key) & 0xFFFFFFFFFFFFFFFF
+        i, j = _slot(other, depth), _slot(h, depth)
+        slots = list(_EMPTY_SLOTS)
+        if i == j:
+            slots[i] = self._split(leaf, key, value, h, depth + 1)
+        else:
+            slots[i] = leaf
+            slots[j] = _Leaf(key, value)
+        return _Node(tuple(slots))
+
+    def delete(self, key: Hashable) -> "PersistentMap":
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        root = self._delete(self._root, key, h, 0)
+        if root is self._root:
+            return self
+        return PersistentMap(root, self._size - 1)
+
+    def _delete(self, node: _Node, key, h: int, depth: int) -> _Node:
+        i = _slot(h, depth)
+        child = node.slots[i]
+        if child is None:
+            return node
+        if isinstance(child, _Leaf):
+            if child.key != key:
+                return node
+            new_child = None
+        elif isinstance(child, _Bucket):
+            items = tuple((k, v) for k, v in child.items if k != key)
+            if len(items) == len(child.items):
+                return node
+            new_child = _Bucket(items) if items else None
+        else:
+            new_child = self._delete(child, key, h, depth + 1)
+            if new_child is child:
+                return node
+            if not any(new_child.slots):
+                new_child = None
+        slots = list(node.slots)
+        slots[i] = new_child
+        return _Node(tuple(slots))
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        yield from _items(self._root)
+
+    def diff(self, other: "PersistentMap") -> Tuple[Dict[Any, Any], Dict[Any, Any], Dict[Any, Tuple[Any, Any]]]:
+        """
+        (added, removed, changed) going from self to other; changed maps
+        key -> (old value, new value). Values are compared by identity, so
+        callers should reuse value objects that did not change.
+        """
+        added: Dict[Any, Any] = {}
+        removed: Dict[Any, Any] = {}
+        changed: Dict[Any, Tuple[Any, Any]] = {}
+        _diff(self._root, other._root, added, removed, changed)
+        return added, removed, changed
+
+
+def _items(child) -> Iterator[Tuple[Any, Any]]:
+    if child is None:
+        return
+    if isinstance(child, _Leaf):
+        yield child.key, child.value
+    elif isinstance(child, _Bucket):
+        yield from child.items
+    else:
+        for slot in child.slots:
+            if slot is not None:
+                yield from _items(slot)
+
+
+def _diff(a, b, added: Dict, removed: Dict, changed: Dict):
+    if a is b:
+        return
+    if isinstance(a, _Node) and isinstance(b, _Node):
+        for x, y in zip(a.slots, b.slots):
+            if x is not y:
+                _diff(x, y, added, removed, changed)
+        return
+    # Shapes differ (leaf vs subtree, or different leaves): compare the few entries directly
+    old = dict(_items(a))
+    new = dict(_items(b))
+    for key, value in new.items():
+        if key not in old:
+            added[key] = value
+        elif old[key] is not value:
+            changed[key] = (old[key], value)
+    for key, value in old.items():
+        if key not in new:
+            removed[key] = value
+
+
+def build_map(pairs: List[Tuple[Hashable, Any]]) -> PersistentMap:
+    result = PersistentMap()
+    for key, value in pairs:
+        result = result.set(key, value)
+    return result
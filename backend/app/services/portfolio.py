@@ -0,0 +1,224 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime
+from typing import List, Dict, Any, Optional, Set, Tuple
+from .calendar import WorkCalendar, get_calendar, working_duration
+from .graph import TaskGraph
+from .scheduler import parse_date
+from ..indexes import owner_key
+
+# Rough retained size of a portfolio, for the store's byte accounting
+PORTFOLIO_OVERHEAD = 1000
+PORTFOLIO_TASK_BYTES = 300
+
+
+class OwnerOccupancy:
+    """
+    Busy intervals per owner as [start, end) date ordinals.
+    Intervals of one owner never overlap, so a single list sorted by start is
+    also sorted by end and a free slot is found with a binary search.
+    """
+
+    def __init__(self):
+        self._starts: Dict[str, List[int]] = {}
+        self._ends: Dict[str, List[int]] = {}
+        self._by_plan: Dict[str, List[Tuple[str, int]]] = {}
+
+    def find_slot(self, owner: str, calendar: WorkCalendar, ready: int, days: int) -> Tuple[int, int]:
+        """
+        Earliest (start, end) ordinals on or after the `ready` ordinal where the
+        owner is free for `days` of their working days.
+        """
+        index = calendar.index_of_ordinal(ready)
+        start, end = calendar.ordinal_at(index), calendar.ordinal_at(index + days)
+        starts = self._starts.get(owner)
+        if not starts or days <= 0:
+            return start, end
+
+        ends = self._ends[owner]
+        i = bisect_right(ends, start)  # First interval still busy at `start`
+        while i < len(starts) and starts[i] < end:
+            index = calendar.index_of_ordinal(ends[i])
+            start, end = calendar.ordinal_at(index), calendar.ordinal_at(index + days)
+            i += 1
+        return start, end
+
+    def add(self, owner: str, s: int, e: int, plan_id: str):
+        if e <= s:
+            return
+        starts = self._starts.setdefault(owner, [])
+        i = bisect_left(starts, s)
+        starts.insert(i, s)
+        self._ends.setdefault(owner, []).insert(i, e)
+        self._by_plan.setdefault(plan_id, []).append((owner, s))
+
+    def remove_plan(self, plan_id: str):
+        for owner, s in self._by_plan.pop(plan_id, []):
+            starts = self._starts[owner]
+            i = bisect_left(starts, s)
+            del starts[i]
+            del self._ends[owner][i]
+
+    def load(self) -> Dict[str, int]:
+        """Number of booked intervals per owner"""
+        return {owner: len(starts) for owner, starts in self._starts.items() if starts}
+
+
+class Portfolio:
+    """
+    A set of plans whose shared owners are levelled together.
+    Higher-priority plans claim owners first. When a plan is added, replaced,
+    reprioritised or removed, only that plan and lower-priority plans linked
+    to it through shared owners are rescheduled; the rest keep their slots
+    in the occupancy index. Handlers run in worker threads, so changes and
+    reads hold `lock`.
+    """
+
+    def __init__(self, portfolio_id: str):
+        self.id = portfolio_id
+        self.lock = threading.Lock()
+        self.occupancy = OwnerOccupancy()
+        self._plans: Dict[str, Any] = {}
+        self._priority: Dict[str, int] = {}
+        self._rank: Dict[str, Tuple[int, int]] = {}
+        self._ranked: List[Tuple[Tuple[int, int], str]] = []
+        self._owners: Dict[str, Set[str]] = {}
+        self._schedules: Dict[str, Dict[str, Any]] = {}
+        self._seq = 0
+        self.created_at = datetime.utcnow()
+
+    def __contains__(self, plan_id: str) -> bool:
+        return plan_id in self._plans
+
+    @property
+    def approx_bytes(self) -> int:
+        return PORTFOLIO_OVERHEAD + PORTFOLIO_TASK_BYTES * sum(len(plan.tasks) for plan in self._plans.values())
+
+    def set_plan(self, plan, priority: int = 0, replaces: Optional[str] = None) -> List[str]:
+        """Add or update a plan (optionally superseding another); returns rescheduled plan ids"""
+        TaskGraph(plan.tasks)  # Reject cyclic plans before touching the index
+        from_rank, owners = self._insert(plan, priority, replaces)
+        return self._reschedule(from_rank, owners)
+
+    def add_plans(self, entries: List[Tuple[Any, int]]) -> List[str]:
+        """Add many (plan, priority) pairs with a single levelling pass"""
+        for plan, _ in entries:
+            TaskGraph(plan.tasks)
+        from_rank, owners = None, set()
+        for plan, priority in entries:
+            rank, plan_owners = self._insert(plan, priority)
+            from_rank = rank if from_rank is None else min(from_rank, rank)
+            owners |= plan_owners
+        return self._reschedule(from_rank, owners) if entries else []
+
+    def _insert(self, plan, priority: int, replaces: Optional[str] = None) -> Tuple[Tuple[int, int], Set[str]]:
+        """Register a plan in the ranking; returns the rank to re-level from and the owners involved"""
+        seed_owners: Set[str] = set()
+        old_ranks = []
+
+        for old_id in {replaces, plan.id} - {None}:
+            if old_id in self._plans:
+                seed_owners |= self._owners[old_id]
+                old_ranks.append(self._rank[old_id])
+                self._detach(old_id)
+
+        if old_ranks:
+            # Keep the insertion order of the plan being replaced
+            seq = min(seq for _, seq in old_ranks)
+        else:
+            self._seq += 1
+            seq = self._seq
+
+        rank = (-priority, seq)
+        self._plans[plan.id] = plan
+        self._priority[plan.id] = priority
+        self._rank[plan.id] = rank
+        self._owners[plan.id] = {key for key in (owner_key(task.owner) for task in plan.tasks) if key}
+        insort(self._ranked, (rank, plan.id))
+
+        return min(old_ranks + [rank]), seed_owners | self._owners[plan.id]
+
+    def remove_plan(self, plan_id: str) -> List[str]:
+        """Drop a plan and release its owners; returns rescheduled plan ids"""
+        rank = self._rank[plan_id]
+        owners = self._owners[plan_id]
+        self._detach(plan_id)
+        return self._reschedule(rank, owners)
+
+    def _detach(self, plan_id: str):
+        self.occupancy.remove_plan(plan_id)
+        self._ranked.remove((self._rank[plan_id], plan_id))
+        for registry in (self._plans, self._priority, self._rank, self._owners, self._schedules):
+            registry.pop(plan_id, None)
+
+    def _reschedule(self, from_rank: Tuple[int, int], owners: Set[str]) -> List[str]:
+        """Re-level every plan ranked at or below from_rank that is linked to `owners`"""
+        affected = []
+        owners = set(owners)
+        for rank, plan_id in self._ranked[bisect_left(self._ranked, (from_rank, "")):]:
+            if self._owners[plan_id] & owners or plan_id not in self._schedules:
+                affected.append(plan_id)
+                owners |= self._owners[plan_id]
+
+        for plan_id in affected:
+            self.occupancy.remove_plan(plan_id)
+        for plan_id in affected:
+            self._schedules[plan_id] = self._level_plan(self._plans[plan_id])
+        return affected
+
+    def _level_plan(self, plan) -> Dict[str, Any]:
+        """Schedule one plan around the owners' existing bookings"""
+        graph = TaskGraph(plan.tasks)
+        requested = parse_date(plan.start_date)
+        start_ordinal = get_calendar(plan.calendar, requested.year).next_working_day(requested).toordinal()
+        calendars: Dict[Optional[str], WorkCalendar] = {}
+        ends: List[int] = [0] * len(graph)
+        tasks: List[Optional[Dict[str, Any]]] = [None] * len(graph)
+
+        def to_date(ordinal: int) -> str:
+            return date.fromordinal(ordinal).strftime("%Y-%m-%d")
+
+        for i in graph.order:
+            task = plan.tasks[i]
+            ready = start_ordinal
+            for p in graph.preds[i]:
+                if ends[p] > ready:
+                    ready = ends[p]
+
+            if task.owner not in calendars:
+                calendars[task.owner] = get_calendar(plan.calendar, requested.year, task.owner)
+            days = working_duration(plan.calendar, task.owner, task.duration_days)
+            key = owner_key(task.owner)
+            if key:
+                start, end = self.occupancy.find_slot(key, calendars[task.owner], ready, days)
+                self.occupancy.add(key, start, end, plan.id)
+            else:
+                start, end = self.occupancy.find_slot(None, calendars[task.owner], ready, days)
+
+            ends[i] = end
+            tasks[i] = {
+                "id": task.id,
+                "title": task.title,
+                "owner": task.owner,
+                "start_date": to_date(start),
+                "end_date": to_date(end),
+            }
+
+        return {
+            "plan_id": plan.id,
+            "project_name": plan.project_name,
+            "start_date": plan.start_date,
+            "end_date": to_date(max(ends)) if ends else plan.start_date,
+            "original_end_date": plan.end_date,
+            "tasks": tasks,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Levelled schedules in priority order"""
+        return {
+            "portfolio_id": self.id,
+            "plans": [
+                dict(self._schedules[plan_id], priority=self._priority[plan_id])
+                for _, plan_id in self._ranked
+            ],
+        }
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+
+# Reply frames queued per WebSocket before the work producing them waits
+WS_SEND_QUEUE = int(os.getenv("WS_SEND_QUEUE", "64"))
+
+
+class Subscriber:
+    """
+    Outgoing side of one WebSocket connection.
+
+    Replies to the connection's own requests go through a bounded queue:
+    when the client reads slowly, send() waits, which slows the work
+    producing them rather than growing memory. Updates pushed from
+    elsewhere never wait: they are kept as one pending entry per session
+    and kind, so a burst of changes becomes a single frame, rendered (by
+    `render`) when the frame is actually sent.
+    """
+
+    def __init__(self, transmit: Callable[[str], Awaitable[None]],
+                 render: Callable[["Subscriber", str, str, Any], Optional[Dict[str, Any]]],
+                 queue_size: int = WS_SEND_QUEUE):
+        self._transmit = transmit
+        self._render = render
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(queue_size)
+        # session id -> {kind: latest payload}, in arrival order
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        # Task version each session's client was last sent
+        self.versions: Dict[str, int] = {}
+        # Sessions with a reply in progress on this connection (the reply carries their changes)
+        self.replying: Dict[str, int] = {}
+        self._wake = asyncio.Event()
+        self.frames = 0
+        self.coalesced = 0
+
+    async def send(self, payload: Dict[str, Any]):
+        """Queue a reply frame, waiting while the queue is full"""
+        await self.queue.put(json.dumps(payload))
+        self._wake.set()
+
+    def try_send(self, payload: Dict[str, Any]) -> bool:
+        """Queue a frame unless the queue is full (for frames that can be skipped)"""
+        try:
+            self.queue.put_nowait(json.dumps(payload))
+        except asyncio.QueueFull:
+            return False
+        self._wake.set()
+        return True
+
+    def push(self, session_id: str, kind: str, payload: Any = None):
+        """Note an update for the client; merges with one not yet sent"""
+        kinds = self.pending.setdefault(session_id, {})
+        if kind in kinds:
+            self.coalesced += 1
+        kinds[kind] = payload
+        self._wake.set()
+
+    async def run(self):
+        """Write frames until cancelled: queued replies first, then pushed updates"""
+        while True:
+            self._wake.clear()
+            if self.queue.empty() and not self.pending:
+                await self._wake.wait()
+            while not self.queue.empty():
+                await self._write(self.queue.get_nowait())
+            if self.pending:
+                session_id = next(iter(self.pending))
+                for kind, payload in self.pending.pop(session_id).items():
+                    frame = self._render(self, session_id, kind, payload)
+                    if frame is not None:
+                        await self._write(json.dumps(frame))
+
+    async def _write(self, text: str):
+        await self._transmit(text)
+        self.frames += 1
+
+
+class PushHub:
+    """Connections subscribed to each session's updates (within this worker)"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+        self.published = 0
+        # Open connections, and pushed updates merged into a later frame on closed ones
+        self.connections = 0
+        self.coalesced = 0
+
+    def subscribe(self, session_id: str, subscriber: Subscriber):
+        self._subscribers.setdefault(session_id, set()).add(subscriber)
+
+    def unsubscribe(self, session_id: str, subscriber: Subscriber):
+        subscribers = self._subscribers.get(session_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[session_id]
+
+    def publish(self, session_id: str, kind: str, payload: Any = None):
+        """Tell every subscriber of the session; costs nothing without subscribers"""
+        subscribers = self._subscribers.get(session_id)
+        if not subscribers:
+            return
+        self.published += 1
+        for subscriber in subscribers:
+            subscriber.push(session_id, kind, payload)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "connections": self.connections,
+            "sessions": len(self._subscribers),
+            "subscriptions": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "published": self.published,
+            "coalesced": self.coalesced,
+        }
+
+
+push_hub = PushHub()
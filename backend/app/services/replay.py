@@ -0,0 +1,174 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Deque, Optional, Set, Tuple
+from ..store import BoundedStore
+from .cancellation import cancellations
+
+
+# Streamed events kept per session for clients that reconnect
+SSE_REPLAY_EVENTS = int(os.getenv("SSE_REPLAY_EVENTS", "512"))
+SSE_REPLAY_BYTES = int(os.getenv("SSE_REPLAY_BYTES", str(512 * 1024)))
+SSE_REPLAY_SESSIONS = int(os.getenv("SSE_REPLAY_SESSIONS", "10000"))
+SSE_REPLAY_TTL_SECONDS = float(os.getenv("SSE_REPLAY_TTL_SECONDS", "600"))
+# A reply nobody has followed for this long is cancelled, along with its LLM call
+SSE_ABANDON_SECONDS = float(os.getenv("SSE_ABANDON_SECONDS", "10"))
+
+STREAM_OVERHEAD = 400
+
+
+class StreamGone(Exception):
+    """The requested event is no longer buffered (or never was)"""
+
+
+class Generation:
+    """One streamed reply; its events may interleave with another reply's in the same session"""
+
+    __slots__ = ("number", "finished", "task", "followers", "abandon")
+
+    def __init__(self, number: int):
+        self.number = number
+        self.finished = False
+        self.task: Optional[asyncio.Task] = None
+        # Open responses following this reply, and the pending cancel once there are none
+        self.followers = 0
+        self.abandon: Optional[asyncio.TimerHandle] = None
+
+
+class SessionStream:
+    """
+    Ring buffer of a session's recent SSE frames.
+
+    Event ids increase across every reply in the session (starting from the
+    clock, so ids are not reissued after a restart). Replies are produced
+    by a background task that publishes here; each HTTP response only
+    follows the buffer, so a client that drops can reconnect with
+    Last-Event-ID and pick up where it stopped, live if the reply is still
+    being generated. A reply left without followers for abandon_after
+    seconds is cancelled instead of running its LLM call to the end.
+    """
+
+    def __init__(self, max_events: int = SSE_REPLAY_EVENTS, max_bytes: int = SSE_REPLAY_BYTES, abandon_after: float = SSE_ABANDON_SECONDS):
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.abandon_after = abandon_after
+        # (event id, generation, frame), ids increasing
+        self.events: Deque[Tuple[int, Generation, bytes]] = deque()
+        self.bytes = 0
+        self.last_id = int(time.time() * 1000)
+        self._generations = 0
+        self._changed = asyncio.Event()
+
+    def start(self) -> Generation:
+        self._generations += 1
+        return Generation(self._generations)
+
+    def run(self, generation: Generation, producer: Awaitable[None]) -> Generation:
+        """Produce a reply in the background; it finishes even if nobody is following"""
+        async def produce():
+            try:
+                await producer
+            finally:
+                self.finish(generation)
+
+        generation.task = asyncio.create_task(produce())
+        # The event loop only keeps weak references to tasks
+        _producers.add(generation.task)
+        generation.task.add_done_callback(_producers.discard)
+        if generation.followers == 0:
+            # Also covers a client that is gone before its response starts
+            self._schedule_abandon(generation)
+        return generation
+
+    def next_id(self) -> int:
+        self.last_id += 1
+        return self.last_id
+
+    def publish(self, generation: Generation, event_id: int, frame: bytes):
+        self.events.append((event_id, generation, frame))
+        self.bytes += len(frame)
+        while len(self.events) > self.max_events or (self.bytes > self.max_bytes and len(self.events) > 1):
+            self.bytes -= len(self.events.popleft()[2])
+        self._wake()
+
+    def finish(self, generation: Generation):
+        generation.finished = True
+        if generation.abandon is not None:
+            generation.abandon.cancel()
+            generation.abandon = None
+        self._wake()
+
+    def _attach(self, generation: Generation):
+        generation.followers += 1
+        if generation.abandon is not None:
+            generation.abandon.cancel()
+            generation.abandon = None
+
+    def _detach(self, generation: Generation):
+        generation.followers -= 1
+        if generation.followers == 0 and not generation.finished and generation.task is not None:
+            self._schedule_abandon(generation)
+
+    def _schedule_abandon(self, generation: Generation):
+        generation.abandon = asyncio.get_running_loop().call_later(self.abandon_after, self._abandon, generation)
+
+    def _abandon(self, generation: Generation):
+        generation.abandon = None
+        if generation.followers == 0 and not generation.finished:
+            cancellations.streams += 1
+            generation.task.cancel()
+
+    def _wake(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def resume(self, last_event_id: int) -> Generation:
+        """The reply that event belongs to; StreamGone if it is not buffered"""
+        if self.events:
+            index = last_event_id - self.events[0][0]
+            if 0 <= index < len(self.events) and self.events[index][0] == last_event_id:
+                return self.events[index][1]
+        raise StreamGone(f"Event {last_event_id} is no longer available")
+
+    async def follow(self, generation: Generation, after_id: int = 0) -> AsyncIterator[bytes]:
+        """Frames of one reply after after_id, then live ones until it finishes"""
+        self._attach(generation)
+        try:
+            while True:
+                changed = self._changed
+                start = max(0, after_id + 1 - self.events[0][0]) if self.events else 0
+                frames = []
+                for i in range(start, len(self.events)):
+                    event_id, owner, frame = self.events[i]
+                    if owner is generation and event_id > after_id:
+                        frames.append(frame)
+                        after_id = event_id
+                if frames:
+                    yield b"".join(frames)
+                elif generation.finished:
+                    return
+                else:
+                    await changed.wait()
+        finally:
+            self._detach(generation)
+
+
+def _sizeof(stream: SessionStream) -> int:
+    return STREAM_OVERHEAD + stream.bytes
+
+
+_producers: Set[asyncio.Task] = set()
+_streams = BoundedStore("sse_replay", SSE_REPLAY_SESSIONS, SSE_REPLAY_TTL_SECONDS, _sizeof)
+
+
+def session_stream(session_id: str) -> SessionStream:
+    stream = _streams.get(session_id)
+    if stream is None:
+        stream = SessionStream()
+        _streams[session_id] = stream
+    return stream
+
+
+def find_stream(session_id: str) -> Optional[SessionStream]:
+    return _streams.get(session_id)
@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Set, Tuple
+from ..models.schemas import Task, Scenario, CalendarSpec
+from .calendar import WorkCalendar, get_calendar, working_duration
+from .graph import TaskGraph
+from .scheduler import parse_date
+
+
+def _parse_day(value: str) -> datetime:
+    return datetime.strptime(value[:10], "%Y-%m-%d")
+
+
+def _owner_blocked_offsets(calendar: Optional[CalendarSpec], base: WorkCalendar, anchor: int, year: int) -> Dict[str, Set[int]]:
+    """
+    Offsets of plan working days on which an owner does not work
+    (time off or a shorter working week), for owners listed in the calendar.
+    """
+    blocked: Dict[str, Set[int]] = {}
+    if not calendar:
+        return blocked
+    for owner in calendar.owners:
+        owner_calendar = get_calendar(calendar, year, owner)
+        blocked[owner] = {
+            k - anchor for k in range(anchor, len(base))
+            if not owner_calendar.is_working_day(base.workday(k))
+        }
+    return blocked
+
+
+def _absence_offsets(scenario: Scenario, base: WorkCalendar, anchor: int, owner_blocked: Dict[str, Set[int]]) -> Dict[str, Set[int]]:
+    """Owner blocked offsets with the scenario's extra absences added"""
+    blocked = {owner: offsets for owner, offsets in owner_blocked.items()}
+    for absence in scenario.absences:
+        first = base.index(_parse_day(absence.start_date)) - anchor
+        # end_date is inclusive: block up to the first working day after it
+        last = base.index(_parse_day(absence.end_date) + timedelta(days=1)) - anchor
+        blocked[absence.owner] = blocked.get(absence.owner, set()) | set(range(first, last))
+    return blocked
+
+
+def _evaluate(graph: TaskGraph, start_offset: int, durations: List[int], blocked: Dict[str, Set[int]]) -> Tuple[List[int], List[int]]:
+    """
+    Schedule one scenario over the shared graph.
+    Returns (start, end) working-day offsets per task, with the same end
+    semantics as schedule_tasks: end = start + duration when nothing blocks.
+    An absent owner's task pauses on blocked days and resumes afterwards.
+    """
+    n = len(graph)
+    starts = [0] * n
+    ends = [0] * n
+    preds = graph.preds
+    owners = graph.owners
+
+    for i in graph.order:
+        ready = start_offset
+        for p in preds[i]:
+            if ends[p] > ready:
+                ready = ends[p]
+
+        owner_blocked = blocked.get(owners[i]) if owners[i] else None
+        if not owner_blocked:
+            starts[i] = ready
+            ends[i] = ready + durations[i]
+            continue
+
+        start = ready
+        while start in owner_blocked:
+            start += 1
+        remaining = durations[i]
+        current = start
+        while remaining > 0:
+            if current not in owner_blocked:
+                remaining -= 1
+            current += 1
+        starts[i] = start
+        ends[i] = current
+
+    return starts, ends
+
+
+def evaluate_scenarios(tasks: List[Task], start_date: str, scenarios: List[Scenario], calendar: Optional[CalendarSpec] = None) -> Dict[str, Any]:
+    """
+    Evaluate what-if scenarios against a base plan.
+    The task graph, the working-day calendar and each owner's blocked days are
+    built once and shared by every scenario; results only list tasks whose
+    dates moved relative to the base.
+    """
+    graph = TaskGraph(tasks)
+
+    base_start = parse_date(start_date)
+    scenario_starts = [parse_date(s.start_date) if s.start_date else base_start for s in scenarios]
+    base = get_calendar(calendar, base_start.year)
+
+    # Offsets count plan working days from the earliest start any scenario asks for
+    anchor = base.index(min([base_start] + scenario_starts))
+    owner_blocked = _owner_blocked_offsets(calendar, base, anchor, base_start.year)
+    base_durations = [working_duration(calendar, owner, d) for owner, d in zip(graph.owners, graph.durations)]
+
+    def to_date(offset: int) -> str:
+        return base.workday(anchor + offset).strftime("%Y-%m-%d")
+
+    base_offset = base.index(base_start) - anchor
+    base_starts, base_ends = _evaluate(graph, base_offset, base_durations, owner_blocked)
+    base_end = max(base_ends, default=base_offset)
+
+    results = []
+    for scenario, scenario_start in zip(scenarios, scenario_starts):
+        durations = list(base_durations)
+        for task_id, delta in scenario.duration_changes.items():
+            if task_id not in graph.index:
+                raise ValueError(f"Scenario '{scenario.name}': unknown task {task_id}")
+            i = graph.index[task_id]
+            durations[i] = working_duration(calendar, graph.owners[i], max(0, graph.durations[i] + delta))
+
+        start_offset = base.index(scenario_start) - anchor
+        starts, ends = _evaluate(graph, start_offset, durations, _absence_offsets(scenario, base, anchor, owner_blocked))
+        end = max(ends, default=start_offset)
+
+        changed = [
+            {
+                "id": graph.ids[i],
+                "start_date": to_date(starts[i]),
+                "end_date": to_date(ends[i]),
+                "start_shift": starts[i] - base_starts[i],
+                "end_shift": ends[i] - base_ends[i],
+            }
+            for i in range(len(graph))
+            if starts[i] != base_starts[i] or ends[i] != base_ends[i]
+        ]
+
+        results.append({
+            "name": scenario.name,
+            "end_date": to_date(end),
+            "end_shift": end - base_end,
+            "changed_tasks": changed,
+        })
+
+    return {
+        "start_date": to_date(base_offset),
+        "end_date": to_date(base_end),
+        "scenarios": results,
+    }
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+from ..models.schemas import CalendarSpec, Task
+
+
+SCHEDULE_CACHE_SIZE = int(os.getenv("SCHEDULE_CACHE_SIZE", "1024"))
+
+# Fields the scheduler overwrites; clients often send back a previous schedule
+SCHEDULER_OUTPUT_FIELDS = {"start_date", "end_date"}
+
+# Omitted optional fields and their explicit defaults must hash the same
+TASK_DEFAULTS = {
+    name: field.get_default(call_default_factory=True)
+    for name, field in Task.model_fields.items()
+    if not field.is_required()
+}
+
+
+def schedule_fingerprint(session_id: str, project_name: str, tasks_data: List[Dict[str, Any]], start_date: str, calendar: Optional[CalendarSpec]) -> str:
+    """
+    Canonical hash of everything that determines a generated plan.
+    Key order and dependency order do not matter; task order does, since
+    the report lists tasks in request order.
+    """
+    tasks = []
+    for task in tasks_data:
+        canonical = {
+            key: value for key, value in {**TASK_DEFAULTS, **task}.items()
+            if key not in SCHEDULER_OUTPUT_FIELDS and value is not None
+        }
+        if isinstance(canonical.get("dependencies"), list):
+            canonical["dependencies"] = sorted(canonical["dependencies"], key=str)
+        tasks.append(canonical)
+
+    document = [session_id, project_name, start_date, calendar.model_dump() if calendar else None, tasks]
+    encoded = json.dumps(document, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class ScheduleCache:
+    """Bounded LRU from schedule fingerprint to the id of the plan it produced"""
+
+    def __init__(self, maxsize: int = SCHEDULE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, fingerprint: str) -> Optional[str]:
+        plan_id = self._entries.get(fingerprint)
+        if plan_id is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(fingerprint)
+        self.hits += 1
+        return plan_id
+
+    def put(self, fingerprint: str, plan_id: str):
+        self._entries[fingerprint] = plan_id
+        self._entries.move_to_end(fingerprint)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, fingerprint: str):
+        """Forget an entry whose plan is no longer stored"""
+        self._entries.pop(fingerprint, None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+schedule_cache = ScheduleCache()
@@ -1,6 +1,8 @@
 from datetime import datetime, timedelta
-from typing import List, Dict
-from ..models.schemas import Task
+from typing import List, Dict, Optional
+from ..models.schemas import Task, CalendarSpec
+from .calendar import WorkCalendar, get_calendar, working_duration
+from .graph import TaskGraph
 
 
 def is_weekend(date: datetime) -> bool:
@@ -21,51 +23,50 @@ def add_business_days(start_date: datetime, days: int) -> datetime:
     return current
 
 
-def schedule_tasks(tasks: List[Task], start_date: str) -> List[Task]:
+def parse_date(value: str) -> datetime:
+    """Parse a YYYY-MM-DD or ISO timestamp date string"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00')) if 'T' in value else datetime.strptime(value, "%Y-%m-%d")
+
+
+def schedule_tasks(tasks: List[Task], start_date: str, calendar: Optional[CalendarSpec] = None) -> List[Task]:
     """
-    Schedule tasks with dependencies, skipping weekends.
+    Schedule tasks with dependencies on working days.
+    Without a calendar only weekends are skipped; with one, holidays, each
+    owner's working week, time off and part-time capacity are applied.
     Returns tasks with start_date and end_date populated.
     """
-    start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00')) if 'T' in start_date else datetime.strptime(start_date, "%Y-%m-%d")
+    requested = parse_date(start_date)
+    base = get_calendar(calendar, requested.year)
     
-    # Skip to next business day if start is weekend
-    while is_weekend(start_dt):
-        start_dt += timedelta(days=1)
+    # Skip to next working day if start is not one
+    start_dt = base.next_working_day(requested)
     
-    # Build dependency map
-    task_map = {task.id: task for task in tasks}
-    task_end_dates: Dict[str, datetime] = {}
+    graph = TaskGraph(tasks)
+    owner_calendars: Dict[Optional[str], WorkCalendar] = {}
+    task_end_dates: List[Optional[datetime]] = [None] * len(tasks)
     
-    def schedule_task(task: Task) -> datetime:
-        """Recursively schedule a task and its dependencies"""
-        if task.id in task_end_dates:
-            return task_end_dates[task.id]
+    # Dependencies always come before their dependents in topological order
+    for i in graph.order:
+        task = tasks[i]
         
         # Find latest end date of dependencies
         latest_dep_end = start_dt
-        for dep_id in task.dependencies:
-            if dep_id in task_map:
-                dep_end = schedule_task(task_map[dep_id])
-                if dep_end > latest_dep_end:
-                    latest_dep_end = dep_end
+        for p in graph.preds[i]:
+            if task_end_dates[p] > latest_dep_end:
+                latest_dep_end = task_end_dates[p]
         
-        # Start after dependencies, skip to next business day if needed
-        task_start = latest_dep_end
-        while is_weekend(task_start):
-            task_start += timedelta(days=1)
+        if task.owner not in owner_calendars:
+            owner_calendars[task.owner] = get_calendar(calendar, requested.year, task.owner)
+        owner_calendar = owner_calendars[task.owner]
         
-        # Calculate end date
-        task_end = add_business_days(task_start, task.duration_days)
+        # Start after dependencies on the owner's next working day
+        task_start = owner_calendar.next_working_day(latest_dep_end)
+        task_end = owner_calendar.add_working_days(task_start, working_duration(calendar, task.owner, task.duration_days))
         
         # Update task
         task.start_date = task_start.strftime("%Y-%m-%d")
         task.end_date = task_end.strftime("%Y-%m-%d")
         
-        task_end_dates[task.id] = task_end
-        return task_end
-    
-    # Schedule all tasks
-    for task in tasks:
-        schedule_task(task)
+        task_end_dates[i] = task_end
     
     return tasks
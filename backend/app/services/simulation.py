@@ -0,0 +1,237 @@
+import math
+import os
+import random
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from operator import add, sub
+from typing import List, Dict, Any, Optional, Tuple
+from ..models.schemas import Task, CalendarSpec
+from .calendar import get_calendar, owner_capacity, working_duration
+from .graph import TaskGraph
+from .scheduler import parse_date
+
+
+# Iterations are evaluated column-wise in blocks of this size to bound memory
+CHUNK_SIZE = 512
+
+# Resolution of the per-task sampling tables; one random byte picks an entry
+QUANTILE_POINTS = 256
+
+# Runs with more task-iterations than this are spread over the process pool
+PARALLEL_THRESHOLD = int(os.getenv("SIMULATION_PARALLEL_THRESHOLD", "500000"))
+MAX_WORKERS = int(os.getenv("SIMULATION_WORKERS", "0")) or (os.cpu_count() or 1)
+
+PERCENTILES = (("p50", 0.50), ("p80", 0.80), ("p95", 0.95))
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Lazily create the shared simulation process pool"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=MAX_WORKERS)
+    return _executor
+
+
+def three_point_estimate(task: Task) -> Tuple[float, float, float]:
+    """
+    Return (optimistic, likely, pessimistic) durations for a task.
+    Missing estimates fall back to duration_days, so plain tasks are deterministic.
+    """
+    likely = task.likely_days if task.likely_days is not None else task.duration_days
+    low = task.optimistic_days if task.optimistic_days is not None else likely
+    high = task.pessimistic_days if task.pessimistic_days is not None else likely
+
+    if low < 0 or not (low <= likely <= high):
+        raise ValueError(f"Task {task.id}: estimates must satisfy 0 <= optimistic <= likely <= pessimistic")
+
+    return float(low), float(likely), float(high)
+
+
+def _triangular_quantiles(low: float, mode: float, high: float) -> List[float]:
+    """
+    Inverse CDF of a triangular distribution at QUANTILE_POINTS evenly spaced
+    probabilities. Sampling then reduces to picking random table entries.
+    """
+    if low == high:
+        return [low]
+    split = (mode - low) / (high - low)
+    k_low = (high - low) * (mode - low)
+    k_high = (high - low) * (high - mode)
+    table = []
+    for k in range(QUANTILE_POINTS):
+        u = (k + 0.5) / QUANTILE_POINTS
+        table.append(low + math.sqrt(u * k_low) if u < split else high - math.sqrt((1.0 - u) * k_high))
+    return table
+
+
+def _column_max(columns: List[List[float]]) -> List[float]:
+    """Element-wise maximum of several sample columns"""
+    result = columns[0]
+    for column in columns[1:]:
+        result = [x if x > y else y for x, y in zip(result, column)]
+    return result
+
+
+def _column_min(columns: List[List[float]]) -> List[float]:
+    """Element-wise minimum of several sample columns"""
+    result = columns[0]
+    for column in columns[1:]:
+        result = [x if x < y else y for x, y in zip(result, column)]
+    return result
+
+
+def _histogram_update(hist: Counter, column: List[float]):
+    """Count samples per whole working day (a finish of 4.2 days lands on day 5)"""
+    values = sorted(column)
+    prev = 0
+    for day in range(math.ceil(values[0]), math.ceil(values[-1]) + 1):
+        pos = bisect_right(values, day)
+        if pos > prev:
+            hist[day] += pos - prev
+            prev = pos
+
+
+def _simulate_chunk(payload: Tuple, iterations: int, seed: int) -> Tuple[List[Counter], Counter, List[int]]:
+    """
+    Run `iterations` samples of the schedule.
+    Returns per-task finish histograms (keyed by whole working days),
+    the project finish histogram and per-task critical path counts.
+    """
+    order, preds, succs, tables = payload
+    rng = random.Random(seed)
+    n = len(tables)
+    sinks = [i for i in range(n) if not succs[i]]
+
+    task_hist = [Counter() for _ in range(n)]
+    project_hist: Counter = Counter()
+    critical = [0] * n
+    is_zero_float = (1e-9).__gt__
+
+    remaining = iterations
+    while remaining > 0:
+        size = min(CHUNK_SIZE, remaining)
+        remaining -= size
+
+        durations = [
+            table * size if len(table) == 1 else list(map(table.__getitem__, rng.randbytes(size)))
+            for table in tables
+        ]
+
+        # Forward pass: earliest finish per task, one column of samples at a time
+        finish: List[Optional[List[float]]] = [None] * n
+        for i in order:
+            p = preds[i]
+            if not p:
+                finish[i] = durations[i]
+            elif len(p) == 1:
+                finish[i] = list(map(add, finish[p[0]], durations[i]))
+            else:
+                start = _column_max([finish[j] for j in p])
+                finish[i] = list(map(add, start, durations[i]))
+
+        project = _column_max([finish[i] for i in sinks])
+
+        # Backward pass: latest finish; zero float means the task was critical
+        latest: List[Optional[List[float]]] = [None] * n
+        for i in reversed(order):
+            s = succs[i]
+            if not s:
+                latest[i] = project
+            elif len(s) == 1:
+                latest[i] = list(map(sub, latest[s[0]], durations[s[0]]))
+            else:
+                latest[i] = _column_min([list(map(sub, latest[j], durations[j])) for j in s])
+
+        for i in range(n):
+            critical[i] += sum(map(is_zero_float, map(sub, latest[i], finish[i])))
+            _histogram_update(task_hist[i], finish[i])
+        _histogram_update(project_hist, project)
+
+    return task_hist, project_hist, critical
+
+
+def _percentile(hist: Counter, q: float) -> int:
+    """Smallest value whose cumulative share of samples reaches q"""
+    total = sum(hist.values())
+    target = q * total
+    seen = 0
+    for value in sorted(hist):
+        seen += hist[value]
+        if seen >= target:
+            return value
+    return max(hist)
+
+
+def simulate_schedule(tasks: List[Task], start_date: str, iterations: int = 10000, seed: Optional[int] = None, calendar: Optional[CalendarSpec] = None) -> Dict[str, Any]:
+    """
+    Monte Carlo schedule-risk simulation.
+    Samples a triangular duration per task from its three-point estimate and
+    reports P50/P80/P95 finish dates per task and for the project, plus each
+    task's criticality index (share of runs in which it was on the critical path).
+    Dates follow the plan calendar; owner capacity stretches durations, while
+    individual time off is left to the deterministic scheduler.
+    """
+    if not tasks:
+        raise ValueError("Plan has no tasks to simulate")
+
+    graph = TaskGraph(tasks)
+    estimates = []
+    for task in tasks:
+        capacity = owner_capacity(calendar, task.owner)
+        estimates.append(tuple(days / capacity for days in three_point_estimate(task)))
+    payload = (graph.order, graph.preds, graph.succs, [_triangular_quantiles(*e) for e in estimates])
+
+    seed = seed if seed is not None else random.randrange(2 ** 32)
+    workers = min(MAX_WORKERS, max(1, iterations // CHUNK_SIZE))
+
+    if workers > 1 and iterations * len(tasks) >= PARALLEL_THRESHOLD:
+        # Split iterations evenly; each worker gets its own derived seed
+        seeder = random.Random(seed)
+        shares = [iterations // workers + (1 if w < iterations % workers else 0) for w in range(workers)]
+        futures = [
+            _get_executor().submit(_simulate_chunk, payload, share, seeder.randrange(2 ** 32))
+            for share in shares
+        ]
+        task_hist = [Counter() for _ in tasks]
+        project_hist: Counter = Counter()
+        critical = [0] * len(tasks)
+        for future in futures:
+            part_tasks, part_project, part_critical = future.result()
+            for i, hist in enumerate(part_tasks):
+                task_hist[i].update(hist)
+            project_hist.update(part_project)
+            critical = list(map(add, critical, part_critical))
+    else:
+        task_hist, project_hist, critical = _simulate_chunk(payload, iterations, seed)
+
+    # Planned (deterministic) finish uses the scheduled duration_days
+    planned_finish = max(graph.forward_pass([working_duration(calendar, task.owner, task.duration_days) for task in tasks]))
+    on_time = sum(count for value, count in project_hist.items() if value <= planned_finish) / iterations
+
+    # Map working-day offsets back to calendar dates
+    requested = parse_date(start_date)
+    days = get_calendar(calendar, requested.year)
+    anchor = days.index(requested)
+
+    def to_date(offset: int) -> str:
+        return days.workday(anchor + offset).strftime("%Y-%m-%d")
+
+    result: Dict[str, Any] = {
+        "iterations": iterations,
+        "planned_end_date": to_date(int(planned_finish)),
+        "on_time_probability": round(on_time, 4),
+    }
+    for name, q in PERCENTILES:
+        result[name] = to_date(_percentile(project_hist, q))
+
+    result["tasks"] = []
+    for i, task in enumerate(tasks):
+        risk = {"id": task.id, "title": task.title, "criticality": round(critical[i] / iterations, 4)}
+        for name, q in PERCENTILES:
+            risk[name] = to_date(_percentile(task_hist[i], q))
+        result["tasks"].append(risk)
+
+    return result
@@ -0,0 +1,72 @@
+import json
+import os
+from itertools import count
+from typing import Any, Callable, Dict, Optional
+
+
+# Longest message event, in bytes of text
+SSE_MAX_FRAME_BYTES = int(os.getenv("SSE_MAX_FRAME_BYTES", "4096"))
+# Reconnect delay advertised to clients (0 leaves the browser default)
+SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", "0"))
+
+
+def encode_data(payload: Dict[str, Any]) -> bytes:
+    """The data: line of an event, with the blank line that ends it"""
+    return b"data: " + json.dumps(payload).encode() + b"\n\n"
+
+
+# Constant events are encoded once
+DONE_DATA = encode_data({"type": "done"})
+
+
+class SSEWriter:
+    """
+    Encodes one chat reply as Server-Sent Events.
+
+    A reply's text is sent as a few {"type": "message"} events of up to
+    max_bytes each instead of one per character.
+
+    With with_ids every frame carries an increasing `id:` (from next_id, or
+    counting from 1) so a client can say where it stopped; retry_ms adds a
+    `retry:` field to the first frame. on_frame sees every frame with its id
+    as it is produced, for callers that buffer events individually.
+    """
+
+    def __init__(self, max_bytes: int = SSE_MAX_FRAME_BYTES, with_ids: bool = False, retry_ms: int = SSE_RETRY_MS,
+                 next_id: Optional[Callable[[], int]] = None, on_frame: Optional[Callable[[Optional[int], bytes], None]] = None):
+        self.max_bytes = max_bytes
+        self.with_ids = with_ids
+        self._next_id = next_id or count(1).__next__
+        self._on_frame = on_frame
+        self._retry = f"retry: {retry_ms}\n".encode() if retry_ms else b""
+        self.frames = 0
+        self.bytes = 0
+
+    def _frame(self, data: bytes) -> bytes:
+        head = self._retry
+        self._retry = b""
+        event_id = None
+        if self.with_ids:
+            event_id = self._next_id()
+            head += f"id: {event_id}\n".encode()
+        frame = head + data if head else data
+        self.frames += 1
+        self.bytes += len(frame)
+        if self._on_frame:
+            self._on_frame(event_id, frame)
+        return frame
+
+    def message(self, text: str) -> bytes:
+        """A complete message, in as few frames as max_bytes allows"""
+        frames = []
+        # Split on characters; max_bytes counts UTF-8 bytes, so multi-byte text gives smaller pieces
+        step = max(1, self.max_bytes // 4) if not text.isascii() else self.max_bytes
+        for start in range(0, len(text), step):
+            frames.append(self._frame(encode_data({"type": "message", "content": text[start:start + step]})))
+        return b"".join(frames)
+
+    def event(self, payload: Dict[str, Any]) -> bytes:
+        return self._frame(encode_data(payload))
+
+    def done(self) -> bytes:
+        return self._frame(DONE_DATA)
@@ -0,0 +1,98 @@
+from typing import Any, Dict, List, Tuple
+from pydantic import ValidationError
+from ..models.schemas import Task
+from ..records import Session
+from .parser import is_ready_for_timeline
+
+
+class InvalidTaskUpdate(ValueError):
+    """An update would leave a task that is not a valid Task"""
+
+
+class SyncConflict(Exception):
+    """A patch touches tasks that changed after its base version"""
+
+    def __init__(self, message: str, version: int, task_ids: List[str]):
+        super().__init__(message)
+        self.version = version
+        self.task_ids = task_ids
+
+
+class TaskSync:
+    """
+    Changes to one session's task table, read from its TaskVersions.
+
+    Every change to session.entities["tasks"] (chat extraction, LLM
+    modification or a client patch) goes through update_entities, which
+    bumps the version once and records the version that last changed each
+    task; deleted ids are kept as tombstones. The versions are stored with
+    the entities, so any worker can answer changes(since) for a version
+    another worker issued.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    @property
+    def version(self) -> int:
+        return self.session.task_versions.version
+
+    def changes(self, since: int) -> Dict[str, Any]:
+        """Tasks changed and ids deleted after `since`, or everything (full=True) if that history is gone"""
+        versions = self.session.task_versions
+        tasks = [task for task in self.session.entities.get("tasks") or [] if task.get("id")]
+        if since > versions.version or since < versions.horizon:
+            return {"version": versions.version, "full": True, "tasks": tasks, "deleted": []}
+        return {
+            "version": versions.version,
+            "full": False,
+            "tasks": [task for task in tasks if versions.changed_since(task["id"], since)],
+            "deleted": [task_id for task_id, version in versions.tombstones.items() if version > since],
+        }
+
+    def apply(self, base_version: int, add: List[Dict[str, Any]], update: List[Dict[str, Any]], delete: List[str]) -> int:
+        """
+        Apply a client patch made against base_version.
+        Edits to tasks nobody else touched since then merge; touching a task
+        that changed after base_version raises SyncConflict, and an update
+        that leaves a task invalid raises InvalidTaskUpdate.
+        """
+        session, versions = self.session, self.session.task_versions
+        if base_version > versions.version:
+            raise SyncConflict("Base version is ahead of the server; resync with changes?since=0", versions.version, [])
+
+        edited = [task["id"] for task in update] + list(delete)
+        added = [task["id"] for task in add]
+        # Changed by someone else since base_version, or added under an id that is taken
+        conflicts = {task_id for task_id in edited + added if versions.changed_since(task_id, base_version)}
+        conflicts.update(task_id for task_id in added if task_id in versions.tasks)
+        if conflicts:
+            raise SyncConflict("Tasks changed since the base version or ids already taken", versions.version, sorted(conflicts))
+        missing = sorted({task_id for task_id in edited if task_id not in versions.tasks})
+        if missing:
+            raise KeyError(f"Unknown task ids: {', '.join(missing)}")
+
+        updates = {task["id"]: task for task in update}
+        deleted = set(delete)
+        tasks = []
+        for task in session.entities.get("tasks") or []:
+            if task.get("id") in deleted:
+                continue
+            if task.get("id") in updates:
+                task = {**task, **updates[task["id"]]}
+                # Explicit nulls for required fields would otherwise be stored
+                try:
+                    Task.model_validate(task)
+                except ValidationError as e:
+                    problems = "; ".join(f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors())
+                    raise InvalidTaskUpdate(f"Task {task['id']}: {problems}")
+            tasks.append(task)
+        tasks.extend(add)
+        session.update_entities({**session.entities, "tasks": tasks, "ready_for_timeline": is_ready_for_timeline(tasks)})
+        return versions.version
+
+
+def task_sync(session: Session) -> Tuple[TaskSync, int]:
+    """The session's sync view and its current task version"""
+    sync = TaskSync(session)
+    return sync, sync.version
@@ -1,90 +1,168 @@
+import asyncio
+import base64
+import binascii
+import json
+import os
 import uuid
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
+from .backends import StorageBackend, create_backend
+from .records import Session, Plan
+from .store import BoundedStore
 
 
-class Session:
-    """In-memory session storage for MVP"""
-    
-    def __init__(self, session_id: str):
-        self.id = session_id
-        self.messages: List[Dict[str, str]] = []
-        self.entities: Dict = {"project_name": None, "tasks": []}
-        self.created_at = datetime.utcnow()
-    
-    def append_message(self, text: str, role: str = "user"):
-        """Add a message to the session"""
-        self.messages.append({"role": role, "content": text})
-    
-    def update_entities(self, entities: Dict):
-        """Update extracted entities"""
-        self.entities = entities
-    
-    def to_dict(self):
-        """Convert session to dictionary"""
-        return {
-            "id": self.id,
-            "messages": self.messages,
-            "entities": self.entities,
-            "created_at": self.created_at.isoformat()
-        }
-
-
-class Plan:
-    """Stored plan/report"""
-    
-    def __init__(self, plan_id: str, project_name: str, tasks: List, start_date: str, end_date: str):
-        self.id = plan_id
-        self.project_name = project_name
-        self.tasks = tasks
-        self.start_date = start_date
-        self.end_date = end_date
-        self.created_at = datetime.utcnow()
-    
-    def to_dict(self):
-        """Convert plan to dictionary"""
-        return {
-            "plan_id": self.id,
-            "project_name": self.project_name,
-            "tasks": [task.dict() if hasattr(task, 'dict') else task for task in self.tasks],
-            "start_date": self.start_date,
-            "end_date": self.end_date,
-            "created_at": self.created_at.isoformat()
-        }
+STORE_SWEEP_INTERVAL = float(os.getenv("STORE_SWEEP_INTERVAL", "60"))
+# Portfolios hold live levelling state, so they stay in this worker's memory
+PORTFOLIO_MAX_ENTRIES = int(os.getenv("PORTFOLIO_MAX_ENTRIES", "1000"))
+PORTFOLIO_TTL_SECONDS = float(os.getenv("PORTFOLIO_TTL_SECONDS", "86400"))
 
-
-# In-memory storage (replace with Redis/DB for production)
-_sessions: Dict[str, Session] = {}
-_plans: Dict[str, Plan] = {}
+# Sessions and plans go through the configured backend (STORAGE_BACKEND)
+_backend: StorageBackend = create_backend()
+_portfolios = BoundedStore(
+    "portfolios", PORTFOLIO_MAX_ENTRIES, PORTFOLIO_TTL_SECONDS, lambda portfolio: portfolio.approx_bytes,
+    # Shares the memory backend's byte budget when there is one
+    getattr(_backend, "budget", None)
+)
 
 
 def get_session(session_id: Optional[str] = None) -> Session:
     """Get or create a session"""
-    if session_id and session_id in _sessions:
-        return _sessions[session_id]
+    if session_id:
+        session = _backend.load_session(session_id)
+        if session is not None:
+            return session
     
     new_id = session_id or str(uuid.uuid4())
     session = Session(new_id)
-    _sessions[new_id] = session
+    _backend.add_session(session)
     return session
 
 
+def find_session(session_id: str) -> Optional[Session]:
+    """Retrieve a session by ID without creating it"""
+    return _backend.load_session(session_id)
+
+
 def store_plan(plan: Plan) -> str:
     """Store a plan and return its ID"""
-    _plans[plan.id] = plan
+    # Hashed now, while the plan is at hand, rather than on the first conditional GET
+    plan.etag
+    _backend.save_plan(plan)
     return plan.id
 
 
 def get_plan(plan_id: str) -> Optional[Plan]:
     """Retrieve a plan by ID"""
-    return _plans.get(plan_id)
+    return _backend.load_plan(plan_id)
+
+
+def store_portfolio(portfolio) -> str:
+    """Store (or re-measure, after a change) a portfolio and return its ID"""
+    _portfolios[portfolio.id] = portfolio
+    return portfolio.id
+
+
+def get_portfolio(portfolio_id: str):
+    """Retrieve a portfolio by ID"""
+    return _portfolios.get(portfolio_id)
 
 
 def list_sessions() -> List[str]:
     """List all session IDs"""
-    return list(_sessions.keys())
+    return _backend.session_ids()
 
 
 def list_plans() -> List[str]:
     """List all plan IDs"""
-    return list(_plans.keys())
+    return _backend.plan_ids()
+
+
+def count_sessions() -> int:
+    """Number of stored sessions"""
+    return _backend.count_sessions()
+
+
+def count_plans() -> int:
+    """Number of stored plans"""
+    return _backend.count_plans()
+
+
+def _encode_cursor(scope: List[str], key: tuple) -> str:
+    raw = json.dumps([*scope, list(key)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+# Types of the sort key elements in each listing's cursor
+_SESSION_KEY = (str, str)  # created_at, session id
+_PLAN_KEY = (str, str)  # created_at, plan id
+_PROJECT_KEY = (str, str, str)  # project name (casefolded), created_at, plan id
+_OWNER_KEY = (str, str, int)  # plan created_at, plan id, task position
+
+
+def _decode_cursor(cursor: Optional[str], scope: List[str], shape: Tuple[type, ...]) -> Optional[tuple]:
+    """Key a cursor continues from; ValueError if it is malformed or from another listing"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        decoded = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(decoded, list) or decoded[:-1] != scope or not isinstance(decoded[-1], list):
+        raise ValueError("Cursor does not belong to this listing")
+    key = tuple(decoded[-1])
+    if len(key) != len(shape) or not all(type(value) is kind for value, kind in zip(key, shape)):
+        raise ValueError("Invalid cursor")
+    return key
+
+
+def _page(rows: List[Tuple[tuple, Dict[str, Any]]], limit: int, scope: List[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """rows holds up to limit + 1 entries; the extra one only says whether there is a next page"""
+    items = [item for _, item in rows[:limit]]
+    next_cursor = _encode_cursor(scope, rows[limit - 1][0]) if len(rows) > limit else None
+    return items, next_cursor
+
+
+def page_sessions(cursor: Optional[str], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Sessions newest first, with the cursor of the next page (None on the last one)"""
+    scope = ["sessions"]
+    return _page(_backend.page_sessions(_decode_cursor(cursor, scope, _SESSION_KEY), limit + 1), limit, scope)
+
+
+def page_plans(cursor: Optional[str], limit: int, session_id: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Plan summaries newest first, optionally only those generated for one session"""
+    scope = ["plans", session_id or ""]
+    return _page(_backend.page_plans(_decode_cursor(cursor, scope, _PLAN_KEY), limit + 1, session_id), limit, scope)
+
+
+def page_projects(prefix: str, cursor: Optional[str], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Plan summaries whose project name starts with prefix, in name order"""
+    scope = ["projects", prefix.strip().casefold()]
+    return _page(_backend.page_projects(prefix, _decode_cursor(cursor, scope, _PROJECT_KEY), limit + 1), limit, scope)
+
+
+def page_owner_tasks(owner: str, cursor: Optional[str], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """An owner's tasks across plans, newest plan first"""
+    scope = ["owner", owner.strip().casefold()]
+    return _page(_backend.page_owner_tasks(owner, _decode_cursor(cursor, scope, _OWNER_KEY), limit + 1), limit, scope)
+
+
+def sweep_expired() -> int:
+    """Evict idle sessions and plans; returns the number evicted"""
+    return _backend.sweep()
+
+
+async def run_sweeper(interval: float = STORE_SWEEP_INTERVAL):
+    """Background task that periodically drops idle entries"""
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(sweep_expired)
+
+
+def store_stats() -> Dict[str, Any]:
+    """Backend counters: live entries, bytes, evictions or pending writes"""
+    return {**_backend.stats(), "portfolios": _portfolios.stats()}
+
+
+def close_storage():
+    """Flush pending writes (called on app shutdown)"""
+    _backend.close()
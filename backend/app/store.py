@@ -0,0 +1,189 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+class MemoryBudget:
+    """
+    Global byte cap shared by several stores.
+    When the total goes over the limit, the least recently used entry across
+    all registered stores is evicted until it fits again.
+    """
+
+    def __init__(self, limit_bytes: int):
+        self.limit_bytes = limit_bytes
+        self._stores: List["BoundedStore"] = []
+
+    def register(self, store: "BoundedStore"):
+        self._stores.append(store)
+
+    @property
+    def used_bytes(self) -> int:
+        return sum(store.bytes for store in self._stores)
+
+    def reclaim(self):
+        while self.used_bytes > self.limit_bytes:
+            candidates = [store for store in self._stores if len(store)]
+            if not candidates:
+                return
+            oldest = min(candidates, key=lambda store: store.oldest_access())
+            oldest.evict_oldest("memory")
+
+    def stats(self) -> Dict[str, int]:
+        return {"used_bytes": self.used_bytes, "limit_bytes": self.limit_bytes}
+
+
+class BoundedStore:
+    """
+    Thread-safe dict-like store with LRU and idle-TTL eviction.
+    Every entry carries an approximate size so the store (and an optional
+    shared MemoryBudget) can cap memory; sizes are refreshed with resize()
+    when a value grows in place.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        ttl_seconds: float,
+        sizeof: Callable[[Any], int],
+        budget: Optional[MemoryBudget] = None,
+        on_evict: Optional[Callable[[str, Any], None]] = None,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._sizeof = sizeof
+        self._budget = budget
+        self._on_evict = on_evict
+        self._lock = threading.RLock()
+        # key -> [value, size, last_access]; order is least recently used first
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+        self.bytes = 0
+        self.evictions: Dict[str, int] = {"lru": 0, "ttl": 0, "memory": 0}
+        if budget:
+            budget.register(self)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            if self._expired(entry, time.monotonic()):
+                self._evict(key, "ttl")
+                return False
+            return True
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        self.put(key, value)
+
+    def keys(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries.keys()))
+
+    def values(self) -> List[Any]:
+        """All values, without touching recency"""
+        with self._lock:
+            return [entry[0] for entry in self._entries.values()]
+
+    def _expired(self, entry: list, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - entry[2] > self.ttl_seconds
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a value and mark it as recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            now = time.monotonic()
+            if self._expired(entry, now):
+                self._evict(key, "ttl")
+                return default
+            entry[2] = now
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, value: Any):
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries[key][1]
+            size = self._sizeof(value)
+            self._entries[key] = [value, size, time.monotonic()]
+            self._entries.move_to_end(key)
+            self.bytes += size
+            while len(self._entries) > self.max_entries:
+                self.evict_oldest("lru")
+        if self._budget:
+            self._budget.reclaim()
+
+    def resize(self, key: str):
+        """Re-measure an entry after its value changed in place"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            size = self._sizeof(entry[0])
+            self.bytes += size - entry[1]
+            entry[1] = size
+        if self._budget:
+            self._budget.reclaim()
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            self.bytes -= entry[1]
+            return entry[0]
+
+    def oldest_access(self) -> float:
+        with self._lock:
+            if not self._entries:
+                return float("inf")
+            return self._entries[next(iter(self._entries))][2]
+
+    def evict_oldest(self, reason: str):
+        with self._lock:
+            if self._entries:
+                self._evict(next(iter(self._entries)), reason)
+
+    def _evict(self, key: str, reason: str):
+        entry = self._entries.pop(key)
+        self.bytes -= entry[1]
+        self.evictions[reason] += 1
+        if self._on_evict:
+            self._on_evict(key, entry[0])
+
+    def sweep(self) -> int:
+        """Evict idle entries; they sit at the LRU end, so this stops at the first live one"""
+        if self.ttl_seconds <= 0:
+            return 0
+        evicted = 0
+        now = time.monotonic()
+        with self._lock:
+            while self._entries:
+                key = next(iter(self._entries))
+                if not self._expired(self._entries[key], now):
+                    break
+                self._evict(key, "ttl")
+                evicted += 1
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "live_entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "evictions": dict(self.evictions),
+        }
@@ -0,0 +1,101 @@
+"""
+Event-loop latency while large plans are being scheduled.
+
+Fires several large /api/generate_report calls while a prober hits
+/api/health every few milliseconds, then reports probe latency (measured
+from when each probe was due) for each dispatch mode: inline, thread pool
+and process pool.
+
+Run from the backend directory:
+    python -m benchmarks.bench_dispatch --tasks 5000 --plans 4
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import httpx
+
+from app.main import app
+from app.services import dispatch
+
+
+def make_tasks(count: int, seed: int = 0):
+    rnd = random.Random(seed)
+    owners = ["Alice", "Bob", "Carol", "Dan", "Eve"]
+    return [
+        {
+            "id": f"task_{i}",
+            "title": f"Task {i}",
+            "duration_days": rnd.randint(1, 10),
+            "owner": rnd.choice(owners),
+            "dependencies": [f"task_{j}" for j in rnd.sample(range(i), min(i, 2))],
+        }
+        for i in range(count)
+    ]
+
+
+async def run_mode(mode: str, tasks, plans: int, probe_interval: float):
+    dispatch.shutdown_executor()
+    if mode == "inline":
+        dispatch.INLINE_MAX_TASKS = 10 ** 9
+    else:
+        dispatch.INLINE_MAX_TASKS = 200
+        dispatch.EXECUTOR_KIND = mode
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up the pool so worker start-up is not measured
+        await client.post("/api/generate_report", json={"session_id": "bench", "start_date": "2025-01-06", "tasks": tasks[:300]})
+
+        latencies = []
+        done = asyncio.Event()
+
+        async def probe():
+            # Latency is measured from when the probe was due, so time spent
+            # waiting for a blocked event loop counts against it
+            while not done.is_set():
+                due = time.perf_counter() + probe_interval
+                await asyncio.sleep(probe_interval)
+                await client.get("/api/health")
+                latencies.append((time.perf_counter() - due) * 1000)
+
+        async def generate():
+            response = await client.post(
+                "/api/generate_report",
+                json={"session_id": "bench", "start_date": "2025-01-06", "tasks": tasks},
+                timeout=None,
+            )
+            response.raise_for_status()
+
+        prober = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(generate() for _ in range(plans)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+    print(
+        f"{mode:8s} large plans done in {elapsed:6.2f}s | probes={len(latencies):4d} "
+        f"p50={statistics.median(latencies):7.1f}ms p95={p95:7.1f}ms max={latencies[-1]:7.1f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=5000, help="tasks per large plan")
+    parser.add_argument("--plans", type=int, default=4, help="concurrent large plans")
+    parser.add_argument("--probe-ms", type=float, default=5.0, help="pause between latency probes")
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.tasks)
+    for mode in ("inline", "thread", "process"):
+        await run_mode(mode, tasks, args.plans, args.probe_ms / 1000)
+    dispatch.shutdown_executor()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""
+Peak memory and throughput of plan exports.
+
+"before" renders the CSV the previous way (the whole file in an
+io.StringIO, then encoded for the Response); the other modes drain the
+streaming exporters in app/services/exporters.py the way StreamingResponse
+does ("ics-owner" exports one owner's tasks). Each mode runs in its own
+process on a plan of --tasks tasks, and "peak" is the growth of the
+process's peak RSS while exporting (Linux: VmHWM is reset after the plan
+is built).
+
+Run from the backend directory:
+    python -m benchmarks.bench_export --tasks 100000
+"""
+import argparse
+import csv
+import io
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from app.records import Plan
+from app.services.exporters import csv_chunks, report_chunks, jsonl_chunks, ics_chunks, gzip_chunks, zip_chunks, tar_chunks
+
+MODES = ["before", "csv", "csv-gzip", "jsonl", "ics", "ics-owner", "zip", "tar.gz"]
+
+
+def build_plan(tasks: int) -> Plan:
+    owners = ["Alice", "Bob", "Carol", "Dan", "Eve"]
+    return Plan("bench", "Bench", [
+        {
+            "id": f"t{i}",
+            "title": f"Task number {i}, with a comma",
+            "duration_days": 1 + i % 5,
+            "owner": owners[i % len(owners)],
+            "dependencies": [f"t{i - 1}"] if i else [],
+            "start_date": "2025-01-06",
+            "end_date": "2025-01-10",
+        }
+        for i in range(tasks)
+    ], "2025-01-06", "2025-12-31")
+
+
+def legacy_csv(plan: Plan):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(["Task ID", "Title", "Duration (days)", "Owner", "Start Date", "End Date", "Dependencies"])
+    for task in plan.tasks:
+        writer.writerow([task.id, task.title, task.duration_days, task.owner or "", task.start_date or "", task.end_date or "", ", ".join(task.dependencies)])
+    csv_content = output.getvalue()
+    output.close()
+    # Response encodes the str body
+    yield csv_content.encode()
+
+
+def members(plan: Plan):
+    yield "plan.csv", plan.created_at, lambda: csv_chunks(plan)
+    yield "plan.json", plan.created_at, lambda: report_chunks(plan)
+
+
+def chunks_for(mode: str, plan: Plan):
+    if mode == "before":
+        return legacy_csv(plan)
+    if mode == "csv":
+        return csv_chunks(plan)
+    if mode == "csv-gzip":
+        return gzip_chunks(csv_chunks(plan))
+    if mode == "jsonl":
+        return jsonl_chunks(plan)
+    if mode == "ics":
+        return ics_chunks(plan)
+    if mode == "ics-owner":
+        # One owner in five
+        return ics_chunks(plan, owner="alice")
+    if mode == "zip":
+        return zip_chunks(members(plan))
+    return gzip_chunks(tar_chunks(members(plan)))
+
+
+def _status_kb(field: str) -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+
+def run_mode(mode: str, tasks: int):
+    plan = build_plan(tasks)
+    try:
+        # Reset the peak RSS mark so only the export counts
+        with open("/proc/self/clear_refs", "w") as refs:
+            refs.write("5")
+        baseline = _status_kb("VmRSS:")
+        peak = lambda: _status_kb("VmHWM:")
+    except OSError:
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    size = 0
+    start = time.perf_counter()
+    for chunk in chunks_for(mode, plan):
+        size += len(chunk)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"mode": mode, "bytes": size, "seconds": elapsed, "peak_kb": peak() - baseline}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--mode", choices=MODES)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.tasks)
+        return
+
+    print(f"{args.tasks}-task plan")
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_export", "--tasks", str(args.tasks), "--mode", mode],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output)
+        rows_per_second = args.tasks / result["seconds"]
+        print(f"  {mode:9s} {result['bytes'] / 1e6:7.1f} MB  {result['seconds'] * 1e3:7.0f} ms  "
+              f"{rows_per_second / 1e3:6.0f}k tasks/s  peak +{result['peak_kb'] / 1024:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
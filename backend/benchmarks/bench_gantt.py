@@ -0,0 +1,86 @@
+"""
+Gantt data for a large plan: the full item list against windowed and
+zoomed requests answered from the plan's GanttIndex.
+
+"full" renders every task as GanttItem JSON (what /api/gantt_data returns
+without parameters); "week window" and "month window" render the tasks
+overlapping one week or month at a time across the plan; "week bars" and
+"month bars" the per-owner aggregates of the whole plan. Index builds are
+timed separately, since they happen once per plan.
+
+Run from the backend directory:
+    python -m benchmarks.bench_gantt --tasks 100000
+"""
+import argparse
+import random
+import time
+from datetime import date
+
+from app.records import Plan
+from app.services.exporters import gantt_chunks, json_array_chunks
+from app.services.gantt import GanttIndexes, GanttIndex
+
+PLAN_DAYS = 730
+
+
+def build_plan(tasks: int) -> Plan:
+    random.seed(0)
+    owners = [f"Owner {i}" for i in range(20)]
+    first = date(2025, 1, 6).toordinal()
+    items = []
+    for i in range(tasks):
+        start = first + random.randrange(PLAN_DAYS)
+        days = 1 + random.randrange(15)
+        items.append({
+            "id": f"t{i}",
+            "title": f"Task number {i}",
+            "duration_days": days,
+            "owner": owners[i % len(owners)],
+            "dependencies": [],
+            "start_date": date.fromordinal(start).isoformat(),
+            "end_date": date.fromordinal(start + days).isoformat(),
+        })
+    return Plan("bench", "Bench", items, "2025-01-06", date.fromordinal(first + PLAN_DAYS + 15).isoformat())
+
+
+def timed(run, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = run()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def body(chunks) -> int:
+    return sum(len(chunk) for chunk in chunks)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=100000)
+    args = parser.parse_args()
+
+    plan = build_plan(args.tasks)
+    first = date(2025, 1, 6).toordinal()
+    print(f"{args.tasks}-task plan over {PLAN_DAYS} days")
+
+    seconds, size = timed(lambda: body(gantt_chunks(plan)), 3)
+    print(f"  full          {seconds * 1e3:8.1f} ms  {size / 1e6:7.2f} MB")
+
+    for zoom in ("task", "week", "month"):
+        seconds, _ = timed(lambda: GanttIndex(plan).items(zoom, None, None))
+        print(f"  build {zoom:7s} {seconds * 1e3:8.1f} ms")
+
+    indexes = GanttIndexes()
+    for zoom in ("week", "month"):
+        indexes.window(plan, zoom, None, None)
+    for label, days in (("week window", 7), ("month window", 30)):
+        windows = [(start, start + days) for start in range(first, first + PLAN_DAYS, days)]
+        seconds, size = timed(lambda: sum(body(json_array_chunks(indexes.window(plan, "task", *window))) for window in windows))
+        print(f"  {label:13s} {seconds / len(windows) * 1e3:8.2f} ms  {size / len(windows) / 1e3:7.1f} KB  (mean of {len(windows)})")
+    for zoom in ("week", "month"):
+        seconds, size = timed(lambda: body(json_array_chunks(indexes.window(plan, zoom, None, None))), 3)
+        print(f"  {zoom} bars     {seconds * 1e3:8.2f} ms  {size / 1e3:7.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
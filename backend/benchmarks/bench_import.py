@@ -0,0 +1,110 @@
+"""
+Row throughput of plan imports.
+
+Renders a plan of --tasks tasks with the CSV and JSON Lines exporters,
+then times each import stage on that body fed in 64 KB chunks: parsing
+alone; parsing plus validation against Task, one row at a time (for
+comparison) and a batch at a time (as imports do); the same plus
+dependency resolution; and the whole POST /api/import/csv and
+/api/import/json through the app, including scheduling and storing the
+plan.
+
+Run from the backend directory:
+    python -m benchmarks.bench_import --tasks 100000
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from pydantic import ValidationError
+
+from app.main import app
+from app.models.schemas import Task
+from app.records import Plan
+from app.services.exporters import csv_chunks, jsonl_chunks
+from app.services.importers import csv_rows, json_rows, import_tasks, TaskImport
+
+CHUNK_BYTES = 64 * 1024
+
+
+def build_plan(tasks: int) -> Plan:
+    owners = ["Alice", "Bob", "Carol", "Dan", "Eve"]
+    return Plan("bench", "Bench", [
+        {
+            "id": f"t{i}",
+            "title": f"Task number {i}, with a comma",
+            "duration_days": 1 + i % 5,
+            "owner": owners[i % len(owners)],
+            # A chain per owner, so scheduling stays linear
+            "dependencies": [f"t{i - len(owners)}"] if i >= len(owners) else [],
+            "start_date": "2025-01-06",
+            "end_date": "2025-01-10",
+        }
+        for i in range(tasks)
+    ], "2025-01-06", "2025-12-31")
+
+
+async def chunks(body: bytes):
+    for start in range(0, len(body), CHUNK_BYTES):
+        yield body[start:start + CHUNK_BYTES]
+
+
+async def parse_only(parse, body: bytes) -> int:
+    count = 0
+    async for _ in parse(chunks(body)):
+        count += 1
+    return count
+
+
+async def validate_per_row(parse, body: bytes) -> int:
+    tasks, errors = [], []
+    async for number, row in parse(chunks(body)):
+        try:
+            tasks.append(Task.model_validate(row))
+        except ValidationError as e:
+            errors.append((number, e))
+    return len(tasks)
+
+
+async def validate_batched(parse, body: bytes) -> int:
+    result = TaskImport()
+    async for number, row in parse(chunks(body)):
+        result.add(number, row)
+    result.flush()
+    return len(result.tasks)
+
+
+async def timed(run) -> float:
+    start = time.perf_counter()
+    await run()
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=100000)
+    args = parser.parse_args()
+
+    plan = build_plan(args.tasks)
+    bodies = {"csv": (b"".join(csv_chunks(plan)), csv_rows), "json": (b"".join(jsonl_chunks(plan)), json_rows)}
+    print(f"{args.tasks}-task plan")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, (body, parse) in bodies.items():
+            print(f"  {name} ({len(body) / 1e6:.1f} MB)")
+            stages = [
+                ("parse", lambda: parse_only(parse, body)),
+                ("+ validate per row", lambda: validate_per_row(parse, body)),
+                ("+ validate batched", lambda: validate_batched(parse, body)),
+                ("+ resolve deps", lambda: import_tasks(parse(chunks(body)))),
+                ("POST (scheduled)", lambda: client.post(f"/api/import/{name}?start_date=2025-01-06", content=chunks(body))),
+            ]
+            for label, run in stages:
+                seconds = await timed(run)
+                print(f"    {label:20s} {seconds * 1e3:7.0f} ms  {args.tasks / seconds / 1e3:6.0f}k rows/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+"""
+Memory per session and per stored task, measured with tracemalloc.
+
+"before" rebuilds the previous shapes (messages as a list of dicts, plans
+holding pydantic Task objects); "after" uses the slotted records in
+app/records.py. Sessions hold --messages chat messages; plans hold
+--tasks-per-plan tasks shared among a handful of owners.
+
+Run from the backend directory:
+    python -m benchmarks.bench_memory --sessions 20000 --plans 2000
+"""
+import argparse
+import gc
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+from app.models.schemas import Task
+from app.records import Session, Plan
+
+OWNERS = ["Alice", "Bob", "Carol", "Dan", "Eve"]
+
+
+class LegacySession:
+    def __init__(self, session_id: str):
+        self.id = session_id
+        self.messages = []
+        self.entities = {"project_name": None, "tasks": []}
+        self.created_at = datetime.utcnow()
+
+    def append_message(self, text: str, role: str = "user"):
+        self.messages.append({"role": role, "content": text})
+
+
+class LegacyPlan:
+    def __init__(self, plan_id, project_name, tasks, start_date, end_date):
+        self.id = plan_id
+        self.project_name = project_name
+        self.tasks = tasks
+        self.start_date = start_date
+        self.end_date = end_date
+        self.calendar = None
+        self.created_at = datetime.utcnow()
+
+
+def make_task(plan: int, k: int) -> Task:
+    # Dates and owners come from parsing/scheduling, so they are fresh strings per task
+    start = date(2025, 1, 6) + timedelta(days=k % 60)
+    return Task(
+        id=f"task_{k}",
+        title=f"Task {k} of plan {plan}",
+        duration_days=3,
+        owner="".join(OWNERS[k % len(OWNERS)]),
+        dependencies=[f"task_{k - 1}"] if k else [],
+        start_date=start.isoformat(),
+        end_date=(start + timedelta(days=3)).isoformat(),
+    )
+
+
+def measure(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    keep = build()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del keep
+    return used
+
+
+def build_sessions(cls, count: int, messages: int):
+    sessions = []
+    for i in range(count):
+        session = cls(f"session-{i}")
+        for k in range(messages):
+            session.append_message(f"Message {k} in session {i}", "user" if k % 2 == 0 else "assistant")
+        sessions.append(session)
+    return sessions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=20_000)
+    parser.add_argument("--messages", type=int, default=6)
+    parser.add_argument("--plans", type=int, default=2_000)
+    parser.add_argument("--tasks-per-plan", type=int, default=50)
+    args = parser.parse_args()
+
+    # Message text is the same size either way; report it so overhead is visible
+    text_bytes = measure(lambda: [f"Message {k} in session {i}" for i in range(args.sessions) for k in range(args.messages)])
+
+    legacy_sessions = measure(lambda: build_sessions(LegacySession, args.sessions, args.messages))
+    compact_sessions = measure(lambda: build_sessions(Session, args.sessions, args.messages))
+    print(f"sessions ({args.messages} messages, {text_bytes / args.sessions:.0f} B of text each):")
+    print(f"  before {legacy_sessions / args.sessions:8.0f} B/session")
+    print(f"  after  {compact_sessions / args.sessions:8.0f} B/session")
+
+    task_lists = [[make_task(p, k) for k in range(args.tasks_per_plan)] for p in range(args.plans)]
+    total_tasks = args.plans * args.tasks_per_plan
+    legacy_plans = measure(lambda: [
+        LegacyPlan(f"plan-{p}", f"Project {p}", [task.model_copy() for task in tasks], "2025-01-06", "2025-04-01")
+        for p, tasks in enumerate(task_lists)
+    ])
+    compact_plans = measure(lambda: [
+        Plan(f"plan-{p}", f"Project {p}", tasks, "2025-01-06", "2025-04-01")
+        for p, tasks in enumerate(task_lists)
+    ])
+    print(f"plans ({args.tasks_per_plan} tasks each):")
+    print(f"  before {legacy_plans / total_tasks:8.0f} B/task")
+    print(f"  after  {compact_plans / total_tasks:8.0f} B/task")
+
+
+if __name__ == "__main__":
+    main()
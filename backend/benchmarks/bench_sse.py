@@ -0,0 +1,98 @@
+"""
+Frames, bytes and CPU per /api/chat/stream response.
+
+"before" frames the reply the previous way (one JSON event per character);
+"after" uses SSEWriter. Both are timed encoding alone and through the app
+over ASGI (httpx ASGITransport), with the LLM step replaced by a canned
+reply of --chars characters so only framing and delivery are measured.
+
+Run from the backend directory:
+    python -m benchmarks.bench_sse --chars 500 --responses 500
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from app.main import app
+from app.routers import chat
+from app.services.sse import SSEWriter
+
+
+def legacy_frames(message: str, entities: dict):
+    for char in message:
+        yield f"data: {json.dumps({'type': 'message', 'content': char})}\n\n"
+    yield f"data: {json.dumps({'type': 'entities', 'data': entities, 'session_id': 's'})}\n\n"
+    yield f"data: {json.dumps({'type': 'done'})}\n\n"
+
+
+def coalesced_frames(message: str, entities: dict):
+    writer = SSEWriter()
+    yield writer.message(message)
+    yield writer.event({"type": "entities", "data": entities, "session_id": "s"})
+    yield writer.done()
+
+
+def encode_only(frames, message: str, entities: dict, responses: int):
+    count = size = 0
+    start = time.process_time()
+    for _ in range(responses):
+        for frame in frames(message, entities):
+            count += 1
+            size += len(frame)
+    return count / responses, size / responses, (time.process_time() - start) / responses
+
+
+async def over_asgi(asgi_app, path: str, responses: int):
+    transport = httpx.ASGITransport(app=asgi_app)
+    count = size = 0
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.process_time()
+        for i in range(responses):
+            async with client.stream("POST", path, json={"session_id": f"bench-{i}", "text": "plan"}) as response:
+                async for chunk in response.aiter_raw():
+                    size += len(chunk)
+                    count += chunk.count(b"data: ")
+        cpu = time.process_time() - start
+    return count / responses, size / responses, cpu / responses
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chars", type=int, default=500)
+    parser.add_argument("--responses", type=int, default=500)
+    args = parser.parse_args()
+
+    message = ("Here is your plan with the tasks you described. " * (args.chars // 48 + 1))[:args.chars]
+    entities = {"project_name": "Bench", "tasks": [{"id": f"t{i}", "title": f"Task {i}", "duration_days": 2} for i in range(10)]}
+
+    async def canned_extract(session_id):
+        return {"message": message}, entities
+    chat._extract = canned_extract
+
+    print(f"{args.chars}-character reply, {args.responses} responses")
+    for name, frames in (("before", legacy_frames), ("after", coalesced_frames)):
+        count, size, cpu = encode_only(frames, message, entities, args.responses)
+        print(f"  encode {name:6s} {count:7.1f} frames  {size:8.0f} B  {cpu * 1e6:8.1f} us CPU")
+
+    # The previous endpoint, reduced to its framing, next to the real one
+    legacy_app = FastAPI()
+
+    @legacy_app.post("/legacy")
+    async def legacy_stream():
+        async def generate():
+            for frame in legacy_frames(message, entities):
+                yield frame
+        return StreamingResponse(generate(), media_type="text/event-stream")
+
+    for name, asgi_app, path in (("before", legacy_app, "/legacy"), ("after", app, "/api/chat/stream")):
+        count, size, cpu = asyncio.run(over_asgi(asgi_app, path, args.responses))
+        print(f"  asgi   {name:6s} {count:7.1f} frames  {size:8.0f} B  {cpu * 1e6:8.1f} us CPU")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Per-operation latency of the storage backends with a large store.
+
+Fills a backend with --plans small plans (and --sessions sessions), then
+times get_plan, store_plan, get_session and append_message on random keys.
+store_plan is timed including the commit, so it reflects a durable write.
+The page_* rows time one 20-item listing page continuing from a random
+plan, which should not depend on the store size.
+
+Run from the backend directory:
+    python -m benchmarks.bench_storage --backend sqlite --plans 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+
+from app.backends import MemoryBackend
+from app.backends.sqlite import SQLiteBackend
+from app.models.schemas import Task
+from app.records import Session, Plan
+
+
+def make_plan(i: int) -> Plan:
+    tasks = [
+        Task(id=f"t{k}", title=f"Task {k}", duration_days=2, owner="Alice",
+             dependencies=[f"t{k - 1}"] if k else [], start_date="2025-01-06", end_date="2025-01-08")
+        for k in range(3)
+    ]
+    return Plan(f"plan-{i}", f"Project {i}", tasks, "2025-01-06", "2025-01-10")
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+    return f"p50 {pick(0.5):.3f}ms  p99 {pick(0.99):.3f}ms  mean {statistics.mean(samples) * 1000:.3f}ms"
+
+
+def timed(fn, count):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="sqlite")
+    parser.add_argument("--plans", type=int, default=1_000_000)
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--path", default=None, help="SQLite file (default: a temporary file)")
+    args = parser.parse_args()
+
+    if args.backend == "sqlite":
+        path = args.path or os.path.join(tempfile.mkdtemp(), "bench.db")
+        backend = SQLiteBackend(path, batch_size=5000)
+    else:
+        backend = MemoryBackend()
+        backend.plans.max_entries = backend.sessions.max_entries = 10 ** 9
+        backend.budget.limit_bytes = 10 ** 12
+
+    # Plans are identical apart from their ids, so fill with one template
+    template = make_plan(0)
+    start = time.perf_counter()
+    for i in range(args.plans):
+        template.id = f"plan-{i}"
+        backend.save_plan(template if args.backend == "sqlite" else make_plan(i))
+    session_ids = []
+    for i in range(args.sessions):
+        session = Session(str(uuid.uuid4()))
+        backend.add_session(session)
+        for k in range(6):
+            session.append_message(f"message {k} " * 10, "user" if k % 2 == 0 else "assistant")
+        session_ids.append(session.id)
+    if args.backend == "sqlite":
+        backend.flush()
+    print(f"{args.backend}: loaded {args.plans} plans and {args.sessions} sessions in {time.perf_counter() - start:.1f}s")
+
+    rnd = random.Random(0)
+    results = {
+        "get_plan": timed(lambda: backend.load_plan(f"plan-{rnd.randrange(args.plans)}"), args.ops),
+        "get_session": timed(lambda: backend.load_session(rnd.choice(session_ids)), args.ops),
+    }
+
+    # Cursors continuing from random plans, resolved up front so only the page is timed
+    cursors = []
+    for _ in range(args.ops):
+        plan = backend.load_plan(f"plan-{rnd.randrange(args.plans)}")
+        cursors.append((plan.created_at.isoformat(), plan.id))
+    pages = iter(cursors * 3)
+    results["page_plans"] = timed(lambda: backend.page_plans(next(pages), 20), args.ops)
+    results["page_owner_tasks"] = timed(lambda: backend.page_owner_tasks("alice", (*next(pages), 0), 20), args.ops)
+    results["page_projects"] = timed(lambda: backend.page_projects("project 1", None, 20), args.ops)
+
+    counter = iter(range(args.plans, args.plans + args.ops))
+
+    def store_plan():
+        plan = make_plan(next(counter))
+        backend.save_plan(plan)
+        if args.backend == "sqlite":
+            backend.flush()
+
+    def append_message():
+        session = backend.load_session(rnd.choice(session_ids))
+        session.append_message("one more message")
+        if args.backend == "sqlite":
+            backend.flush()
+
+    results["store_plan"] = timed(store_plan, args.ops)
+    results["get_session+append_message"] = timed(append_message, args.ops)
+
+    for name, samples in results.items():
+        print(f"  {name:28s} {percentiles(samples)}")
+    backend.close()
+
+
+if __name__ == "__main__":
+    main()
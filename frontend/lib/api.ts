@@ -48,6 +48,8 @@ export interface GanttItem {
   start: string;
   end: string;
   group: string;
+  // Aggregated bars (zoom "week" or "month") only
+  task_count?: number;
 }
 
 export async function postChat(
@@ -105,12 +107,19 @@ export async function postChatStream(
       throw new Error("No response body");
     }
 
+    // Events can span reads (message text arrives in multi-character frames),
+    // so keep the unfinished tail until its blank-line terminator arrives
+    let buffered = '';
+
     while (true) {
       const { done, value } = await reader.read();
       if (done) break;
 
-      const chunk = decoder.decode(value, { stream: true });
-      const lines = chunk.split('\n');
+      buffered += decoder.decode(value, { stream: true });
+      const end = buffered.lastIndexOf('\n\n');
+      if (end === -1) continue;
+      const lines = buffered.slice(0, end).split('\n');
+      buffered = buffered.slice(end + 2);
 
       for (const line of lines) {
         if (line.startsWith('data: ')) {
@@ -168,8 +177,51 @@ export async function generateReport(
   return res.json();
 }
 
-export async function getGanttData(planId: string): Promise<GanttItem[]> {
-  const res = await fetch(`${API_BASE}/api/gantt_data/${planId}`);
+export interface ImportResponse extends GenerateReportResponse {
+  session_id: string;
+  imported: number;
+}
+
+export async function importPlan(
+  file: File,
+  sessionId?: string | null,
+  startDate?: string
+): Promise<ImportResponse> {
+  const format = file.name.toLowerCase().endsWith(".csv") ? "csv" : "json";
+  const params = new URLSearchParams();
+  if (sessionId) params.set("session_id", sessionId);
+  if (startDate) params.set("start_date", startDate);
+  const query = params.toString();
+  const res = await fetch(`${API_BASE}/api/import/${format}${query ? `?${query}` : ""}`, {
+    method: "POST",
+    headers: { "Content-Type": format === "csv" ? "text/csv" : "application/json" },
+    body: file,
+  });
+
+  if (!res.ok) {
+    const error = await res.json().catch(() => ({ detail: "Import failed" }));
+    // Row problems come as { message, errors: [{ row, field, message }] }
+    const detail = error.detail;
+    if (detail && typeof detail === "object") {
+      const rows = (detail.errors || []).slice(0, 5).map((e: any) => `row ${e.row ?? "?"}: ${e.message}`);
+      throw new Error([detail.message, ...rows].join("\n"));
+    }
+    throw new Error(detail || "Import failed");
+  }
+
+  return res.json();
+}
+
+export async function getGanttData(
+  planId: string,
+  window?: { start?: string; end?: string; zoom?: "task" | "week" | "month" }
+): Promise<GanttItem[]> {
+  const params = new URLSearchParams();
+  if (window?.start) params.set("start", window.start);
+  if (window?.end) params.set("end", window.end);
+  if (window?.zoom) params.set("zoom", window.zoom);
+  const query = params.toString();
+  const res = await fetch(`${API_BASE}/api/gantt_data/${planId}${query ? `?${query}` : ""}`);
 
   if (!res.ok) {
     throw new Error("Failed to fetch Gantt data");